@@ -92,6 +92,11 @@ with col2:
         "Visualiza o **funil de atendimento**, acompanhando o caminho do usuário desde o início da sessão até a resolução."
     )
 
+    st.page_link("pages/10_Memória.py", label="🧠 Memória do Servidor", icon="📦")
+    st.markdown(
+        "Acompanha a **memória do servidor**: caches, sessões ativas e possíveis vazamentos entre recarregamentos da base."
+    )
+
 st.divider()
 
 # ==========================================================
@@ -0,0 +1,203 @@
+"""Teste de carga da API local (`pages/utils/api.py`).
+
+Sobe a API num processo próprio sobre a base atual (ou usa uma já no ar,
+com `--url`) e dispara consultas de vários clientes simultâneos, cada um com
+a sua conexão keep-alive. As URLs misturam agregações diárias e por
+dimensão com filtros de mês e de bot, funis e a projeção, em JSON e em Arrow.
+
+São medidas três fases:
+
+- **fria**: cada URL distinta uma vez (consulta ao backend);
+- **cache**: as mesmas URLs em laço durante `--seconds` (corpo do cache LRU);
+- **304**: idem, reenviando o ETag recebido (`If-None-Match`).
+
+Para cada fase: requisições por segundo e latências p50/p95/p99. Sai com
+código 1 se houver erros ou se o p95 das fases com cache passar do orçamento.
+
+Uso (a partir da raiz do repositório, depois do prewarm):
+
+    python -m benchmarks.api_load
+    python -m benchmarks.api_load --clients 32 --seconds 20
+    python -m benchmarks.api_load --url http://localhost:8000
+"""
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.data_loader import ROOT
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port):
+    """Inicia a API num processo novo e espera ela responder."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "pages.utils.api", "--port", str(port)],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 600
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("a API não respondeu")
+
+
+def get(conn, path, etag=None):
+    headers = {"Accept-Encoding": "gzip"}
+    if etag:
+        headers["If-None-Match"] = etag
+    conn.request("GET", path, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    return response.status, response.getheader("ETag"), len(body)
+
+
+def scenario(conn, forecast=True):
+    """URLs da carga, montadas a partir das opções de filtro da base."""
+    conn.request("GET", "/v1/indexes")
+    indexes = json.loads(conn.getresponse().read())["data"]
+
+    paths = ["/v1/aggregate?by=date&rates=retention_rate,human_request_rate"]
+    for month in pd.period_range(*indexes["date_range"], freq="M")[-6:]:
+        for bot in [None, *indexes["options"]["bot"]]:
+            params = {
+                "start": month.start_time.date(),
+                "end": month.end_time.date(),
+            }
+            if bot:
+                params["bot"] = bot
+            query = urlencode(params)
+            paths += [
+                f"/v1/aggregate?by=date&rates=retention_rate&{query}",
+                f"/v1/aggregate?by=topic&rates=efficiency_score&{query}",
+                f"/v1/aggregate?by=tech&by=font&format=arrow&{query}",
+                f"/v1/funnel?by=tech&{query}",
+            ]
+    if forecast:
+        paths.append("/v1/forecast")
+    return paths
+
+
+def run_phase(host, port, paths, clients, seconds=None, etags=None):
+    """Executa uma fase e retorna (latências em ms, status, duração)."""
+    latencies, statuses = [], []
+    lock = threading.Lock()
+    deadline = None if seconds is None else time.monotonic() + seconds
+
+    def client(index):
+        conn = http.client.HTTPConnection(host, port, timeout=600)
+        rng = random.Random(index)
+        local, codes = [], []
+        # fase fria: as URLs são divididas entre os clientes, uma vez cada
+        work = paths[index::clients] if deadline is None else None
+        while True:
+            if work is not None:
+                if not work:
+                    break
+                path = work.pop()
+            elif time.monotonic() >= deadline:
+                break
+            else:
+                path = rng.choice(paths)
+            start = time.perf_counter()
+            try:
+                status, etag, _ = get(conn, path, etags.get(path) if etags else None)
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=600)
+                status, etag = 0, None
+            local.append((time.perf_counter() - start) * 1000)
+            codes.append(status)
+            if etags is not None and etag and status == 200:
+                etags[path] = etag
+        with lock:
+            latencies.extend(local)
+            statuses.extend(codes)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies), statuses, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="API já em execução (senão, sobe uma)")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--budget-ms", type=float, default=50, help="p95 com cache")
+    parser.add_argument("--no-forecast", action="store_true")
+    args = parser.parse_args()
+
+    proc = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        proc = start_server(port)
+    try:
+        paths = scenario(
+            http.client.HTTPConnection(host, port), forecast=not args.no_forecast
+        )
+        etags = {}
+        phases = [
+            ("fria", run_phase(host, port, paths, args.clients, etags=etags)),
+            ("cache", run_phase(host, port, paths, args.clients, args.seconds)),
+            ("304", run_phase(host, port, paths, args.clients, args.seconds, etags)),
+        ]
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    print(f"{len(paths)} URLs distintas, {args.clients} clientes")
+    print(f"    {'fase':<6} {'req':>8} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    errors, slow = 0, []
+    for name, (latencies, statuses, elapsed) in phases:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(
+            f"    {name:<6} {len(latencies):>8,} {len(latencies) / elapsed:>9,.0f} "
+            f"{p50:>6.1f} ms {p95:>6.1f} ms {p99:>6.1f} ms"
+        )
+        errors += sum(status not in (200, 304) for status in statuses)
+        if name != "fria" and p95 > args.budget_ms:
+            slow.append(name)
+
+    if errors:
+        print(f"\n❌ {errors} respostas com erro")
+        sys.exit(1)
+    if slow:
+        print(f"\n❌ p95 acima de {args.budget_ms:,.0f} ms na fase {', '.join(slow)}")
+        sys.exit(1)
+    print(f"\n✅ Sem erros; p95 com cache abaixo de {args.budget_ms:,.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
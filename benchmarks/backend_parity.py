@@ -0,0 +1,169 @@
+"""Paridade e tempo entre os backends de consulta (pandas x DuckDB x Polars).
+
+Gera uma base sintética, grava as partições usadas pelo DuckDB e pelo Polars e
+compara o resultado de cada combinação de filtros × agrupamentos com o
+backend pandas, que serve de referência. Sai com código 1 se algum
+resultado divergir.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.backend_parity
+    python -m benchmarks.backend_parity --rows 2000000 --backends duckdb
+"""
+
+import argparse
+import itertools
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.synthetic import synthetic_frame
+from pages.utils.dataset import write_dataset
+from pages.utils.query import RATES, DuckDBBackend, Filters, PandasBackend
+
+FILTER_CASES = {
+    "sem filtro": Filters(),
+    "agosto/2025": Filters(start_date="2025-08-01", end_date="2025-08-31"),
+    "um dia": Filters(start_date="2025-03-10", end_date="2025-03-10"),
+    "bot + tech": Filters(bot=("Bot Stone",), tech=("Tech B",)),
+    "canal + tópicos": Filters(
+        start_date="2024-06-01",
+        end_date="2025-01-31",
+        font=("Chat A", "Chat C"),
+        topic=("Pix", "Conta"),
+    ),
+    "assunto inexistente": Filters(subject=("Nada",)),
+    "fora da base": Filters(start_date="2030-01-01", end_date="2030-01-31"),
+}
+
+GROUPINGS = [
+    [],
+    ["date"],
+    ["topic"],
+    ["bot"],
+    ["tech"],
+    ["font"],
+    ["topic", "subject"],
+    ["date", "topic"],
+    ["bot", "tech", "font"],
+]
+# agrupamentos repetidos mantendo as chaves nulas como grupo próprio
+NULL_GROUPINGS = [["topic"], ["topic", "subject"], ["bot", "tech", "font", "topic"]]
+
+
+def _normalize(df, by):
+    """Padroniza tipos e ordena para comparar resultados dos dois backends."""
+    df = df.copy()
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].astype("datetime64[ns]")
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype("float64")
+        else:
+            # categorias viram NaN e o DuckDB devolve None: padroniza em None
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+    return df.sort_values(by).reset_index(drop=True) if by else df.reset_index(drop=True)
+
+
+def compare(reference, candidate):
+    """Compara todos os casos entre dois backends e retorna as divergências."""
+    failures = []
+    timings = {reference.name: 0.0, candidate.name: 0.0}
+
+    groupings = [(by, True) for by in GROUPINGS] + [
+        (by, False) for by in NULL_GROUPINGS
+    ]
+    for (label, filters), (by, dropna) in itertools.product(
+        FILTER_CASES.items(), groupings
+    ):
+        results = {}
+        for backend in (reference, candidate):
+            start = time.perf_counter()
+            results[backend.name] = backend.aggregate(
+                filters, by=by, rates=RATES, dropna=dropna
+            )
+            timings[backend.name] += time.perf_counter() - start
+        try:
+            pd.testing.assert_frame_equal(
+                _normalize(results[reference.name], by),
+                _normalize(results[candidate.name], by),
+                check_exact=False,
+            )
+        except AssertionError as error:
+            failures.append(
+                f"{candidate.name} — {label} / by={by} dropna={dropna}: {error}"
+            )
+
+    columns = list(reference.filter(Filters()).columns)
+    for label, filters in FILTER_CASES.items():
+        expected = _normalize(reference.filter(filters), columns)
+        streamed = pa.concat_tables(candidate.iter_batches(filters, batch_size=50_000))
+        for mode, rows in [
+            ("linhas", candidate.filter(filters)),
+            ("lotes", streamed.to_pandas()),
+        ]:
+            try:
+                pd.testing.assert_frame_equal(
+                    expected, _normalize(rows[columns], columns)
+                )
+            except AssertionError as error:
+                failures.append(f"{candidate.name} — {label} / {mode}: {error}")
+
+    for dim, options in reference.indexes()["options"].items():
+        if options != candidate.indexes()["options"][dim]:
+            failures.append(f"{candidate.name} — opções de {dim} divergem")
+
+    return failures, timings
+
+
+def make_backend(name, dataset_dir):
+    if name == "duckdb":
+        return DuckDBBackend(dataset_dir)
+    if name == "polars":
+        from pages.utils.polars_backend import PolarsBackend
+
+        return PolarsBackend(dataset_dir)
+    raise ValueError(f"Backend desconhecido: {name!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument(
+        "--backends",
+        default="duckdb,polars",
+        help="backends comparados com o pandas, separados por vírgula",
+    )
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    n_cases = len(FILTER_CASES) * (len(GROUPINGS) + len(NULL_GROUPINGS))
+    print(f"{args.rows:,} linhas, {n_cases} agregações por backend")
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset_dir = Path(tmp) / "dataset"
+        write_dataset(df, dataset_dir)
+
+        reference = PandasBackend(df)
+        for name in args.backends.split(","):
+            backend_failures, timings = compare(
+                reference, make_backend(name, dataset_dir)
+            )
+            failures += backend_failures
+            print("    " + "   ".join(f"{n} {s:7.3f} s" for n, s in timings.items()))
+
+    if failures:
+        print(f"\n❌ {len(failures)} divergência(s):")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n✅ Backends equivalentes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Memória da exportação em lotes, para seleções de tamanhos diferentes.
+
+Para cada tamanho e formato, um processo novo monta uma base sintética,
+exporta todas as linhas com `write_export(backend.iter_batches(...))` e mede,
+amostrando o RSS durante a gravação, quanto a exportação somou ao processo.
+Com a gravação em lotes esse acréscimo depende do tamanho do lote, não da
+seleção; como comparação, também é medida a exportação ingênua (`to_csv` /
+`to_parquet` do DataFrame filtrado inteiro).
+
+Sai com código 1 se o acréscimo da exportação em lotes crescer com a base.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.export_memory
+    python -m benchmarks.export_memory --rows 1e6,8e6 --backend duckdb
+"""
+
+import argparse
+import ctypes
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# folga para ruído do alocador entre tamanhos (MB)
+TOLERANCE_MB = 64
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def _release_free_memory():
+    """Devolve ao sistema a memória já liberada, para o RSS inicial ser justo."""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def _peak_during(func):
+    """Executa `func` e retorna o maior RSS observado acima do inicial (MB)."""
+    _release_free_memory()
+    baseline = peak = _rss_mb()
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, _rss_mb())
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    try:
+        func()
+    finally:
+        done.set()
+        sampler.join()
+    return max(peak, _rss_mb()) - baseline
+
+
+def child(rows, fmt, backend_name, naive):
+    """Mede uma exportação num processo limpo e imprime o resultado em JSON."""
+    from benchmarks.synthetic import synthetic_frame
+    from pages.utils.dataset import write_dataset
+    from pages.utils.export import write_export
+    from pages.utils.query import DuckDBBackend, Filters, PandasBackend
+
+    df = synthetic_frame(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        if backend_name == "pandas":
+            backend = PandasBackend(df)
+        else:
+            write_dataset(df, Path(tmp) / "dataset")
+            del df
+            if backend_name == "duckdb":
+                backend = DuckDBBackend(Path(tmp) / "dataset")
+            else:
+                from pages.utils.polars_backend import PolarsBackend
+
+                backend = PolarsBackend(Path(tmp) / "dataset")
+
+        out = Path(tmp) / f"export.{fmt}"
+        filters = Filters()
+        if naive:
+
+            def run():
+                selected = backend.filter(filters)
+                if fmt == "csv":
+                    selected.to_csv(out, index=False)
+                else:
+                    selected.to_parquet(out, index=False)
+        else:
+
+            def run():
+                write_export(backend.iter_batches(filters), out, fmt)
+
+        start = time.perf_counter()
+        extra_mb = _peak_during(run)
+        print(
+            json.dumps(
+                {
+                    "extra_mb": extra_mb,
+                    "seconds": time.perf_counter() - start,
+                    "file_mb": out.stat().st_size / 1e6,
+                }
+            )
+        )
+
+
+def measure(rows, fmt, backend_name, naive=False):
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.export_memory",
+        "--child",
+        f"{rows},{fmt},{backend_name},{int(naive)}",
+    ]
+    output = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows",
+        type=lambda value: [int(float(v)) for v in value.split(",")],
+        default=[1_000_000, 4_000_000],
+    )
+    parser.add_argument(
+        "--backend", choices=["pandas", "duckdb", "polars"], default="pandas"
+    )
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        rows, fmt, backend_name, naive = args.child.split(",")
+        child(int(rows), fmt, backend_name, naive == "1")
+        return
+
+    print(f"backend {args.backend}: memória somada pela exportação (pico de RSS)")
+    print(
+        f"    {'linhas':>12} {'formato':>8} {'em lotes':>10} "
+        f"{'ingênua':>10} {'arquivo':>10}"
+    )
+    growth = []
+    for fmt in ("csv", "parquet"):
+        streamed = []
+        for rows in args.rows:
+            result = measure(rows, fmt, args.backend)
+            naive = measure(rows, fmt, args.backend, naive=True)
+            streamed.append(result["extra_mb"])
+            print(
+                f"    {rows:>12,} {fmt:>8} {result['extra_mb']:>7,.0f} MB "
+                f"{naive['extra_mb']:>7,.0f} MB {result['file_mb']:>7,.0f} MB"
+            )
+        if streamed[-1] > streamed[0] + TOLERANCE_MB:
+            growth.append(fmt)
+
+    if growth:
+        print(f"\n❌ Memória da exportação cresce com a base ({', '.join(growth)})")
+        sys.exit(1)
+    print("\n✅ Memória da exportação estável entre os tamanhos")
+
+
+if __name__ == "__main__":
+    main()
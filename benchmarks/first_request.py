@@ -0,0 +1,74 @@
+"""Latência do primeiro acesso a uma página: servidor frio vs. pré-aquecido.
+
+Cada medição roda num processo novo (como um container recém-iniciado) e
+executa a página com o `AppTest` do Streamlit, cada uma num `CACHE_DIR`
+temporário (a `.cache/` do projeto fica intacta):
+
+- **frio**: com o cache vazio, o primeiro acesso lê a planilha e ajusta os
+  modelos;
+- **quente**: depois do `python -m pages.utils.prewarm`.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.first_request
+    python -m benchmarks.first_request --page "pages/3_Projeção_Fim_2025.py"
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from pages.utils.data_loader import ROOT
+
+DEFAULT_PAGES = ["pages/4_Visão_Geral.py", "pages/3_Projeção_Fim_2025.py"]
+
+_RUN_PAGE = """
+import time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+AppTest.from_file({page!r}, default_timeout=600).run()
+print(time.perf_counter() - start)
+"""
+
+
+def first_request_seconds(page, env):
+    """Executa a página num processo novo e retorna a duração da primeira execução."""
+    proc = subprocess.run(
+        [sys.executable, "-c", _RUN_PAGE.format(page=page)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page", action="append", help="página a medir")
+    args = parser.parse_args()
+
+    print(f"{'página':<40} {'frio':>9} {'quente':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, page in enumerate(args.page or DEFAULT_PAGES):
+            cold_env = {**os.environ, "CACHE_DIR": str(Path(tmp) / f"{i}-frio")}
+            cold = first_request_seconds(page, cold_env)
+
+            warm_env = {**os.environ, "CACHE_DIR": str(Path(tmp) / f"{i}-quente")}
+            subprocess.run(
+                [sys.executable, "-m", "pages.utils.prewarm"],
+                cwd=ROOT,
+                env=warm_env,
+                capture_output=True,
+                check=True,
+            )
+            warm = first_request_seconds(page, warm_env)
+            print(f"{page:<40} {cold:>8.2f}s {warm:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Latência de cada interação: rerun da página inteira vs. só do fragmento.
+
+Sobe o Streamlit sobre uma base sintética (como `page_load.py`, depois do
+prewarm) e, em cada página, troca cada widget que fica dentro de uma seção
+em fragmento (`timing.fragment`): a média móvel das páginas 4, 5, 6 e 9 e os
+controles do funil por segmento. Cada troca é medida, até o fim do rerun,
+de duas formas:
+
+- **página**: o estado novo vai sem `fragment_id` e o script inteiro roda,
+  como antes das seções virarem fragmentos (filtros, consultas e todos os
+  gráficos);
+- **fragmento**: com o `fragment_id` do widget, como o navegador envia
+  agora: só a seção roda, com os dados do último rerun da página.
+
+A troca de um filtro da barra lateral, que continua rodando a página
+inteira, aparece como referência. Nas páginas 5 e 6, a série por tópico e
+por assunto só existe com algum selecionado: os três primeiros são
+escolhidos antes da medição. Cada número é a mediana de `--repeat` trocas.
+
+Sai com código 1 se houver erros nas páginas ou se algum rerun parcial for
+mais lento que o da página inteira (com `--tolerance`, padrão 10%, de folga
+para o ruído: na Visão Geral, os dois gráficos são quase todo o rerun).
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.fragment_reruns
+    python -m benchmarks.fragment_reruns --rows 5e6 --repeat 10
+"""
+
+import argparse
+import asyncio
+import random
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.page_load import Session, free_port, server_env, start_server
+from pages.utils.data_loader import ROOT
+
+# filtros da barra lateral que fazem aparecer as seções por tópico/assunto
+SELECT_FIRST = {"Tópico": 3, "Assunto": 3}
+FILTER_DATES = "Selecione o intervalo"
+
+
+def find(client, widget, label):
+    """Id atual do widget: ele muda junto com as opções (no funil, por exemplo)."""
+    return next(
+        widget_id
+        for widget_id, (kind, proto, _) in client.widgets.items()
+        if (kind, proto.label) == (widget, label)
+    )
+
+
+async def measure(client, widget, label, fragment_id, repeat):
+    """Mediana (ms) de `repeat` trocas do widget; levanta em caso de erro."""
+    times = []
+    for _ in range(repeat):
+        widget_id = find(client, widget, label)
+        proto = client.widgets[widget_id][1]
+        client.states[widget_id] = client.new_state(widget_id, widget, proto)
+        ms, error = await client.rerun(fragment_id)
+        if error:
+            raise RuntimeError(error)
+        times.append(ms)
+    return float(np.median(times))
+
+
+async def open_with_selection(client, page):
+    """Abre a página e escolhe os primeiros tópicos/assuntos da barra lateral."""
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    await client.open_page(page)
+    for widget_id, (widget, proto) in client.filters.items():
+        if widget == "multiselect" and proto.label in SELECT_FIRST:
+            state = WidgetState(id=widget_id)
+            state.string_array_value.data.extend(
+                proto.options[: SELECT_FIRST[proto.label]]
+            )
+            client.states[widget_id] = state
+    ms, error = await client.rerun()
+    if error:
+        raise RuntimeError(error)
+
+
+async def run(port, pages, repeat, seed):
+    """Mede cada widget de fragmento de cada página; retorna as linhas."""
+    client = Session(port, random.Random(seed))
+    await client.connect()
+    rows = []
+    names = [name for name in client.pages if any(p in name for p in pages)]
+    for page in names:
+        await open_with_selection(client, page)
+        sections = [
+            (widget, proto.label, fragment_id)
+            for widget, proto, fragment_id in client.widgets.values()
+            if fragment_id
+        ]
+        if not sections:
+            continue
+        # referência: o intervalo de datas da barra lateral (a página inteira)
+        full = await measure(client, "date_input", FILTER_DATES, "", repeat)
+        rows.append((page, "filtro da barra lateral", full, None))
+
+        for widget, label, fragment_id in sections:
+            # cada widget parte do estado da página recém-aberta
+            await open_with_selection(client, page)
+            full = await measure(client, widget, label, "", repeat)
+            partial = await measure(client, widget, label, fragment_id, repeat)
+            rows.append((page, f"{label} ({widget})", full, partial))
+    await client.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=lambda v: int(float(v)), default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5, help="trocas por medida")
+    parser.add_argument(
+        "--page", action="append", help="trecho do nome da página (repetível)"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from benchmarks.page_load import warm_up
+    from benchmarks.synthetic import synthetic_raw_frame
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp) / "sintetico.parquet"
+        synthetic_raw_frame(args.rows, seed=args.seed).to_parquet(data_path)
+        env = server_env(Path(tmp) / "cache", data_path)
+        print(f"Prewarm da base sintética ({args.rows:,} linhas)...")
+        subprocess.run(
+            [sys.executable, "-m", "pages.utils.prewarm"], cwd=ROOT, env=env, check=True
+        )
+
+        port = free_port()
+        proc = start_server(env, port)
+        try:
+            asyncio.run(warm_up(port))
+            try:
+                rows = asyncio.run(
+                    run(port, args.page or [""], args.repeat, args.seed)
+                )
+            except RuntimeError as error:
+                print(f"\n❌ Erro nas páginas: {error}")
+                sys.exit(1)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    print(f"\nMediana de {args.repeat} trocas por interação")
+    print(f"    {'página':<30} {'interação':<34} {'página':>9} {'fragmento':>10}")
+    for page, interaction, full, partial in rows:
+        partial_text = f"{partial:>7.0f} ms" if partial is not None else f"{'—':>10}"
+        print(
+            f"    {page:<30} {interaction[:34]:<34} {full:>6.0f} ms {partial_text}"
+            + (f" ({full / partial:.1f}x)" if partial else "")
+        )
+
+    limit = 1 + args.tolerance
+    slower = [row for row in rows if row[3] is not None and row[3] > row[2] * limit]
+    if slower:
+        page, interaction, full, partial = slower[0]
+        print(
+            f"\n❌ {page} · {interaction}: fragmento ({partial:.0f} ms) mais "
+            f"lento que a página inteira ({full:.0f} ms)"
+        )
+        sys.exit(1)
+    print("\n✅ Nenhum rerun parcial mais lento que o da página inteira")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Perfil de tempo de import do app e de cada página (`python -X importtime`).
+
+Cada script roda uma vez, como no primeiro acesso a ele, num processo Python
+limpo com `-X importtime` (`AppTest.from_file(...).run()`): entram os imports
+do topo e também os adiados (`plotly_express()`, `sarimax()`, ...) que a
+primeira execução dispara, além do tempo total dessa execução. O custo é
+agrupado por pacote raiz. O que o interpretador e o próprio Streamlit
+carregam para rodar um script vazio é descontado, então o número reflete
+apenas o que o script adiciona.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.import_time                  # perfil de todas as páginas
+    python -m benchmarks.import_time --check          # falha se a home estourar o orçamento
+    python -m benchmarks.import_time --budget-ms 900 --check
+    python -m benchmarks.import_time --check --page-budget-ms 3000
+
+O modo `--check` sai com código 1 se a primeira execução de `app.py`
+ultrapassar o orçamento, carregar algum módulo proibido (pandas,
+plotly.express, statsmodels) ou falhar, servindo como verificação de
+regressão no CI ou antes de publicar no Space. Com `--page-budget-ms`, o
+mesmo orçamento de imports vale para cada página.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HOME_PAGE = ROOT / "app.py"
+PAGES_DIR = ROOT / "pages"
+
+# Orçamento padrão da página inicial, em milissegundos
+DEFAULT_BUDGET_MS = float(os.environ.get("HOME_IMPORT_BUDGET_MS", 1500))
+
+# Módulos que a página inicial nunca deve carregar. O Streamlit já importa
+# `plotly.graph_objects` para registrar o tema, então só o express entra aqui.
+FORBIDDEN_ON_HOME = ("pandas", "plotly.express", "statsmodels")
+
+
+# primeira execução de um script, como o Streamlit faz no primeiro acesso
+RUN_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+app = AppTest.{source}
+start = time.perf_counter()
+app.run()
+print(json.dumps({{
+    "run_ms": (time.perf_counter() - start) * 1000,
+    "errors": [str(e.value) for e in app.exception],
+}}))
+"""
+
+
+def _run_importtime(source):
+    """Roda um script com -X importtime.
+
+    Retorna ([(módulo, self_us, cumulativo_us)], {run_ms, errors}).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUN_SCRIPT.format(source=source)],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        # o AppTest roda o script noutra thread: imports simultâneos de duas
+        # threads se aninham na mesma pilha e podem dar tempo próprio negativo
+        self_us = max(int(self_us), 0)
+        entries.append((name.strip(), self_us, int(cumulative_us)))
+    return entries, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _baseline():
+    """Módulos carregados para rodar um script vazio (Python + Streamlit)."""
+    entries, _ = _run_importtime('from_string("pass", default_timeout=60)')
+    return {name for name, *_ in entries}
+
+
+def profile_script(script_path, baseline=None, timeout=300):
+    """Mede os imports da primeira execução de um script, descontando a base.
+
+    Retorna (total_ms, {pacote_raiz: ms}, {módulos carregados}, execução), com
+    `execução` = {run_ms, errors}.
+    """
+    baseline = _baseline() if baseline is None else baseline
+    source = f"from_file({str(script_path)!r}, default_timeout={timeout})"
+    entries, run = _run_importtime(source)
+    entries = [entry for entry in entries if entry[0] not in baseline]
+
+    by_package = defaultdict(float)
+    for name, self_us, _ in entries:
+        by_package[name.split(".")[0]] += self_us / 1000
+
+    total_ms = sum(self_us for _, self_us, _ in entries) / 1000
+    modules = {name for name, *_ in entries}
+    return total_ms, dict(by_package), modules, run
+
+
+def page_scripts():
+    """Lista `app.py` seguido das páginas em ordem."""
+    return [HOME_PAGE, *sorted(PAGES_DIR.glob("*.py"))]
+
+
+def print_report(script_path, total_ms, by_package, run, top=8):
+    print(
+        f"\n{script_path.relative_to(ROOT)} — imports {total_ms:,.0f} ms "
+        f"(primeira execução: {run['run_ms']:,.0f} ms)"
+    )
+    ranking = sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+    for package, ms in ranking[:top]:
+        print(f"    {package:<28} {ms:>9,.1f} ms")
+
+
+def check_budget(script_path, budget_ms, forbidden=(), baseline=None):
+    """Verifica o orçamento de imports de um script. Retorna True se estiver dentro."""
+    total_ms, by_package, modules, run = profile_script(script_path, baseline)
+    print_report(script_path, total_ms, by_package, run)
+    name = script_path.relative_to(ROOT)
+
+    ok = True
+    if run["errors"]:
+        print(f"❌ {name}: erro na execução: {run['errors'][0]}")
+        ok = False
+    loaded = [
+        module_name
+        for module_name in forbidden
+        if any(
+            module == module_name or module.startswith(module_name + ".")
+            for module in modules
+        )
+    ]
+    if loaded:
+        print(f"❌ {name} carrega módulos pesados: {', '.join(loaded)}")
+        ok = False
+    if total_ms > budget_ms:
+        print(f"❌ Imports de {name}: {total_ms:,.0f} ms > {budget_ms:,.0f} ms")
+        ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="verifica o orçamento da página inicial (e das páginas, se pedido)",
+    )
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument(
+        "--page-budget-ms",
+        type=float,
+        default=None,
+        help="orçamento de imports da primeira execução de cada página",
+    )
+    args = parser.parse_args()
+
+    baseline = _baseline()
+    if args.check:
+        ok = check_budget(HOME_PAGE, args.budget_ms, FORBIDDEN_ON_HOME, baseline)
+        if args.page_budget_ms is not None:
+            for script in page_scripts()[1:]:
+                ok &= check_budget(script, args.page_budget_ms, baseline=baseline)
+        if ok:
+            print("\n✅ Imports da primeira execução dentro do orçamento")
+        sys.exit(0 if ok else 1)
+
+    for script in page_scripts():
+        total_ms, by_package, _, run = profile_script(script, baseline)
+        print_report(script, total_ms, by_package, run)
+        if run["errors"]:
+            print(f"    erro: {run['errors'][0]}")
+
+
+if __name__ == "__main__":
+    main()
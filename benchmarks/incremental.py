@@ -0,0 +1,161 @@
+"""Troca de um valor num filtro de múltipla escolha: consulta inteira vs. parciais.
+
+Gera uma base sintética (com uma fração de tópicos e assuntos nulos, para
+exercitar `dropna`) e, para cada consulta das páginas 4, 5, 6 e 9 (série
+diária, série por tópico ou assunto, resumo por tópico, cubo do funil e
+total), simula `--steps` interações: a cada passo um tópico (ou assunto)
+sorteado entra ou sai da seleção, com um bot e os últimos meses filtrados.
+Cada passo é respondido por `incremental_aggregate` e comparado com
+`PandasBackend.aggregate` sobre a base inteira.
+
+O primeiro passo de cada consulta monta as parciais e fica fora da mediana
+do modo incremental. Sai com código 1 se algum resultado divergir (valores,
+tipos, ordem das linhas) ou se o p95 do modo incremental passar de
+`--limit-ms` (padrão 50 ms).
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.incremental
+    python -m benchmarks.incremental --rows 1e7 --steps 50
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_frame
+from pages.utils.incremental import incremental_aggregate
+from pages.utils.query import RATES, Filters, PandasBackend
+from pages.utils.summaries import TOPIC_RATES
+
+# nome → (dimensão trocada, argumentos de `aggregate`)
+QUERIES = {
+    "série diária (4)": ("topic", dict(by=["date"], rates=TOPIC_RATES)),
+    "série por tópico (5)": (
+        "topic",
+        dict(by=["date", "topic"], measures=["sessions_total"]),
+    ),
+    "série por assunto (6)": (
+        "subject",
+        dict(by=["date", "subject"], measures=["sessions_total"]),
+    ),
+    "resumo por tópico (5)": ("topic", dict(by=["topic"], rates=TOPIC_RATES)),
+    "tópico × assunto (6)": ("subject", dict(by=["topic", "subject"], rates=RATES)),
+    "cubo do funil (9)": (
+        "topic",
+        dict(by=["bot", "tech", "font", "topic"], dropna=False),
+    ),
+    "total": ("topic", dict(rates=RATES)),
+}
+
+
+def timed_call(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def walk(options, steps, rng):
+    """Seleções sucessivas: cada uma difere da anterior por um valor."""
+    selected = set(rng.sample(options, 3))
+    for _ in range(steps):
+        value = rng.choice(options)
+        if value in selected and len(selected) > 1:
+            selected.discard(value)
+        else:
+            selected.add(value)
+        yield tuple(sorted(selected))
+
+
+def run_query(backend, base, dim, kwargs, steps, rng):
+    """Retorna (ms inteira, ms incremental, ms das parciais, divergência)."""
+    options = sorted(backend.df[dim].dropna().unique().tolist())
+    full_ms, incremental_ms, build_ms = [], [], None
+    # a seleção de partida, como na abertura da página
+    previous = Filters(**{**base, dim: tuple(sorted(options[:2]))})
+    incremental_aggregate(backend, previous, **kwargs)
+    for selection in walk(options, steps, rng):
+        filters = Filters(**{**base, dim: selection})
+        expected, ms = timed_call(backend.aggregate, filters, **kwargs)
+        full_ms.append(ms)
+        result, ms = timed_call(incremental_aggregate, backend, filters, **kwargs)
+        if build_ms is None:
+            build_ms = ms
+        else:
+            incremental_ms.append(ms)
+        try:
+            pd.testing.assert_frame_equal(result, expected, check_exact=True)
+        except AssertionError as error:
+            return full_ms, incremental_ms, build_ms, f"{selection}: {error}"
+    return full_ms, incremental_ms, build_ms, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=lambda v: int(float(v)), default=2_000_000)
+    parser.add_argument("--steps", type=int, default=30, help="trocas por consulta")
+    parser.add_argument("--null-fraction", type=float, default=0.02)
+    parser.add_argument("--limit-ms", type=float, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Gerando base sintética ({args.rows:,} linhas)...")
+    df = synthetic_frame(args.rows, seed=args.seed)
+    nulls = np.random.default_rng(args.seed)
+    for dim in ("topic", "subject"):
+        df.loc[nulls.random(len(df)) < args.null_fraction, dim] = np.nan
+    backend = PandasBackend(df)
+    # a geração habilita o modo incremental, como nos backends das páginas
+    backend.generation = "benchmark"
+
+    end = df["date"].max()
+    base = dict(
+        start_date=(end - pd.DateOffset(months=6)).date(),
+        end_date=end.date(),
+        bot=(df["bot"].dropna().iloc[0],),
+    )
+    rng = random.Random(args.seed)
+    rows, failures = [], []
+    for name, (dim, kwargs) in QUERIES.items():
+        full, incremental, build, error = run_query(
+            backend, base, dim, kwargs, args.steps, rng
+        )
+        rows.append((name, full, incremental, build))
+        if error:
+            failures.append(f"{name}: resultado divergente em {error}")
+        elif np.percentile(incremental, 95) > args.limit_ms:
+            failures.append(
+                f"{name}: p95 incremental de {np.percentile(incremental, 95):.1f} ms"
+                f", acima de {args.limit_ms:.0f} ms"
+            )
+
+    print(f"\nMediana de {args.steps} trocas de um valor por consulta")
+    print(
+        f"    {'consulta':<24} {'inteira':>9} {'parciais':>9} "
+        f"{'incremental':>12} {'p95':>8}"
+    )
+    for name, full, incremental, build in rows:
+        if not incremental:
+            continue
+        print(
+            f"    {name:<24} {np.median(full):>6.1f} ms {build:>6.1f} ms "
+            f"{np.median(incremental):>9.1f} ms "
+            f"{np.percentile(incremental, 95):>5.1f} ms "
+            f"({np.median(full) / np.median(incremental):.0f}x)"
+        )
+
+    if failures:
+        print(f"\n❌ {failures[0]}")
+        sys.exit(1)
+    print(
+        f"\n✅ Resultados idênticos à consulta inteira, p95 abaixo de "
+        f"{args.limit_ms:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
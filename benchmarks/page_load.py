@@ -0,0 +1,401 @@
+"""Carga de sessões simultâneas nas páginas do Streamlit.
+
+Sobe um `streamlit run app.py` de verdade sobre uma base sintética (num
+`CACHE_DIR` temporário, depois do prewarm) e conecta N clientes pelo mesmo
+websocket que o navegador usa. Cada sessão repete: abre uma página sorteada
+e troca `--clicks` vezes um filtro da barra lateral (multiselect, intervalo
+de datas ou média móvel), esperando o fim de cada rerun.
+
+Para cada número de sessões simultâneas são medidos:
+
+- latência dos reruns (p50/p95/p99), do envio do estado ao `script_finished`;
+- reruns por segundo e erros (exceções na página);
+- CPU do servidor (núcleos usados em média) e RSS de pico, também por sessão
+  (acréscimo sobre o servidor ocioso dividido pelo número de sessões; inclui
+  a memória temporária das consultas em andamento, que domina com poucas
+  sessões).
+
+`--json` grava o resultado (com a latência de cada página) para comparar
+execuções; sai com código 1 se houver erros ou se o p95 passar de
+`--max-p95-ms` em algum nível.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.page_load
+    python -m benchmarks.page_load --sessions 1,8,32 --seconds 30 --rows 2e6
+    python -m benchmarks.page_load --page Funil --json page_load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+from pages.utils.data_loader import ROOT
+
+SIDEBAR = 1  # primeiro índice do delta_path dos elementos da barra lateral
+FILTER_WIDGETS = ("multiselect", "date_input", "checkbox")
+WIDGETS = (*FILTER_WIDGETS, "selectbox")
+
+
+# ==========================================================
+# SERVIDOR
+# ==========================================================
+def server_env(cache_dir, data_path):
+    return {
+        **os.environ,
+        "CACHE_DIR": str(cache_dir),
+        "DATA_PATH": str(data_path),
+        # a base sintética não muda: nada de recarregamento no meio da medição
+        "RELOAD_INTERVAL": "0",
+        "STREAMLIT_BROWSER_GATHER_USAGE_STATS": "false",
+    }
+
+
+def start_server(env, port):
+    """Inicia o Streamlit e espera o health check responder."""
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "streamlit",
+            "run",
+            "app.py",
+            f"--server.port={port}",
+            "--server.headless=true",
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health")
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("o Streamlit não respondeu")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ProcessMonitor:
+    """CPU acumulada e RSS de pico de um processo, lidos de /proc."""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.peak_mb = 0.0
+        self._done = threading.Event()
+        self._thread = None
+
+    def cpu_seconds(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        # utime e stime (campos 14 e 15 do stat), em ticks do relógio
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def rss_mb(self):
+        with open(f"/proc/{self.pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+    def start(self):
+        self.peak_mb = self.rss_mb()
+        self._done.clear()
+
+        def sample():
+            while not self._done.wait(0.05):
+                self.peak_mb = max(self.peak_mb, self.rss_mb())
+
+        self._thread = threading.Thread(target=sample, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._done.set()
+        self._thread.join()
+        return self.peak_mb
+
+
+# ==========================================================
+# CLIENTE (O MESMO PROTOCOLO DO NAVEGADOR)
+# ==========================================================
+class Session:
+    """Uma aba do navegador: websocket, página atual e estado dos widgets.
+
+    `filters` guarda os filtros da barra lateral; `widgets`, todos os widgets
+    da página, com o fragmento a que pertencem ("" fora de fragmentos).
+    `query_string` é a parte da URL depois do `?`.
+    """
+
+    def __init__(self, port, rng, query_string=""):
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.rng = rng
+        self.query_string = query_string
+        self.ws = None
+        self.pages = {}
+        self.page_hash = ""
+        self.filters = {}
+        self.widgets = {}
+        self.states = {}
+
+    async def connect(self):
+        from tornado.websocket import websocket_connect
+
+        self.ws = await websocket_connect(self.url, subprotocols=["streamlit"])
+        await self.rerun()
+
+    async def rerun(self, fragment_id=""):
+        """Envia o estado atual e espera o fim do rerun; retorna (ms, erro).
+
+        Com `fragment_id`, só o fragmento roda, como quando o navegador envia
+        a mudança de um widget de dentro dele.
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page_hash
+        msg.rerun_script.query_string = self.query_string
+        msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        start = time.perf_counter()
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+
+        error, filters, widgets = None, {}, {}
+        while True:
+            data = await self.ws.read_message()
+            if data is None:
+                raise ConnectionError("websocket fechado pelo servidor")
+            fwd = ForwardMsg()
+            fwd.ParseFromString(data)
+            kind = fwd.WhichOneof("type")
+            if kind == "navigation":
+                self.pages = {
+                    page.page_name: page.page_script_hash
+                    for page in fwd.navigation.app_pages
+                }
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                widget = element.WhichOneof("type")
+                if widget == "exception":
+                    error = element.exception.message
+                elif widget in WIDGETS:
+                    proto = getattr(element, widget)
+                    widgets[proto.id] = (widget, proto, fwd.delta.fragment_id)
+                    sidebar = fwd.metadata.delta_path[0] == SIDEBAR
+                    if widget in FILTER_WIDGETS and sidebar:
+                        filters[proto.id] = (widget, proto)
+            elif kind == "script_finished":
+                break
+        # um rerun parcial só reenvia os widgets do fragmento
+        if fragment_id:
+            self.widgets.update(widgets)
+        else:
+            self.filters, self.widgets = filters, widgets
+        return (time.perf_counter() - start) * 1000, error
+
+    async def open_page(self, name):
+        self.page_hash, self.states = self.pages[name], {}
+        return await self.rerun()
+
+    async def click(self):
+        """Troca um filtro sorteado da barra lateral e espera o rerun."""
+        if not self.filters:
+            return await self.rerun()
+        widget_id, (widget, proto) = self.rng.choice(list(self.filters.items()))
+        self.states[widget_id] = self.new_state(widget_id, widget, proto)
+        return await self.rerun()
+
+    def new_state(self, widget_id, widget, proto):
+        """Um valor novo, sorteado, para o widget."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        state = WidgetState(id=widget_id)
+        if widget == "multiselect":
+            k = self.rng.randint(0, len(proto.options))
+            picked = self.rng.sample(list(proto.options), k)
+            state.string_array_value.data.extend(picked)
+        elif widget == "date_input":
+            days = np.arange(
+                np.datetime64(proto.min.replace("/", "-")),
+                np.datetime64(proto.max.replace("/", "-")) + 1,
+            )
+            picked = sorted(self.rng.sample(range(len(days)), 2))
+            state.string_array_value.data.extend(
+                str(days[i]).replace("-", "/") for i in picked
+            )
+        elif widget == "selectbox":
+            state.string_value = self.rng.choice(list(proto.options))
+        else:
+            previous = self.states.get(widget_id)
+            state.bool_value = not (previous.bool_value if previous else proto.default)
+        return state
+
+    async def close(self):
+        self.ws.close()
+
+
+async def warm_up(port):
+    """Abre cada página uma vez, para os imports não entrarem na medição."""
+    client = Session(port, random.Random(0))
+    await client.connect()
+    for page in client.pages:
+        await client.open_page(page)
+    await client.close()
+
+
+async def run_level(port, pages, sessions, seconds, clicks, seed):
+    """N sessões simultâneas durante `seconds`; retorna as medições."""
+    clients = [Session(port, random.Random(seed + i)) for i in range(sessions)]
+    await asyncio.gather(*(client.connect() for client in clients))
+    page_names = [name for name in clients[0].pages if any(p in name for p in pages)]
+    samples = []
+    deadline = time.monotonic() + seconds
+
+    async def drive(client):
+        while time.monotonic() < deadline:
+            page = client.rng.choice(page_names)
+            ms, error = await client.open_page(page)
+            samples.append((page, "abrir", ms, error))
+            for _ in range(clicks):
+                if time.monotonic() >= deadline:
+                    break
+                ms, error = await client.click()
+                samples.append((page, "filtro", ms, error))
+
+    await asyncio.gather(*(drive(client) for client in clients))
+    await asyncio.gather(*(client.close() for client in clients))
+    return samples
+
+
+# ==========================================================
+# RELATÓRIO
+# ==========================================================
+def percentiles(values):
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) if values else (np.nan,) * 3
+    return {"p50_ms": p50, "p95_ms": p95, "p99_ms": p99}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sessions",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=[1, 4, 8],
+    )
+    parser.add_argument("--seconds", type=float, default=15, help="por nível")
+    parser.add_argument("--clicks", type=int, default=3, help="filtros por página")
+    parser.add_argument("--rows", type=lambda v: int(float(v)), default=1_000_000)
+    parser.add_argument(
+        "--page", action="append", help="trecho do nome da página (repetível)"
+    )
+    parser.add_argument("--max-p95-ms", type=float, default=None)
+    parser.add_argument("--json", type=Path, help="grava o resultado neste arquivo")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from benchmarks.synthetic import synthetic_raw_frame
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp) / "sintetico.parquet"
+        synthetic_raw_frame(args.rows, seed=args.seed).to_parquet(data_path)
+        env = server_env(Path(tmp) / "cache", data_path)
+        print(f"Prewarm da base sintética ({args.rows:,} linhas)...")
+        subprocess.run(
+            [sys.executable, "-m", "pages.utils.prewarm"], cwd=ROOT, env=env, check=True
+        )
+
+        port = free_port()
+        proc = start_server(env, port)
+        monitor = ProcessMonitor(proc.pid)
+        try:
+            # uma visita a cada página carrega os módulos antes da medição
+            asyncio.run(warm_up(port))
+            idle_mb = monitor.rss_mb()
+            levels = []
+            for sessions in args.sessions:
+                cpu_start, wall_start = monitor.cpu_seconds(), time.perf_counter()
+                monitor.start()
+                samples = asyncio.run(
+                    run_level(
+                        port,
+                        args.page or [""],
+                        sessions,
+                        args.seconds,
+                        args.clicks,
+                        args.seed,
+                    )
+                )
+                peak_mb = monitor.stop()
+                wall = time.perf_counter() - wall_start
+                levels.append(
+                    {
+                        "sessions": sessions,
+                        "reruns": len(samples),
+                        "reruns_per_s": len(samples) / wall,
+                        "errors": [s[3] for s in samples if s[3]][:5],
+                        "error_count": sum(1 for s in samples if s[3]),
+                        "cpu_cores": (monitor.cpu_seconds() - cpu_start) / wall,
+                        "peak_rss_mb": peak_mb,
+                        "rss_per_session_mb": (peak_mb - idle_mb) / sessions,
+                        **percentiles([s[2] for s in samples]),
+                        "pages": {
+                            page: percentiles([s[2] for s in samples if s[0] == page])
+                            for page in sorted({s[0] for s in samples})
+                        },
+                    }
+                )
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    print(f"\nServidor ocioso: {idle_mb:,.0f} MB")
+    print(
+        f"    {'sessões':>7} {'reruns':>7} {'/s':>6} {'p50':>9} {'p95':>9} "
+        f"{'p99':>9} {'CPU':>6} {'RSS':>8} {'RSS/sessão':>11} {'erros':>6}"
+    )
+    for level in levels:
+        print(
+            f"    {level['sessions']:>7} {level['reruns']:>7} "
+            f"{level['reruns_per_s']:>6.1f} {level['p50_ms']:>6.0f} ms "
+            f"{level['p95_ms']:>6.0f} ms {level['p99_ms']:>6.0f} ms "
+            f"{level['cpu_cores']:>6.2f} {level['peak_rss_mb']:>5.0f} MB "
+            f"{level['rss_per_session_mb']:>8.1f} MB {level['error_count']:>6}"
+        )
+
+    if args.json:
+        result = {"rows": args.rows, "idle_rss_mb": idle_mb, "levels": levels}
+        args.json.write_text(json.dumps(result, indent=2, default=float))
+        print(f"\nResultado em {args.json}")
+
+    failed = [level for level in levels if level["error_count"]]
+    if failed:
+        print(f"\n❌ Erros nas páginas: {failed[0]['errors'][0]}")
+        sys.exit(1)
+    if args.max_p95_ms is not None:
+        slow = [lvl["sessions"] for lvl in levels if lvl["p95_ms"] > args.max_p95_ms]
+        if slow:
+            print(f"\n❌ p95 acima de {args.max_p95_ms:,.0f} ms com {slow} sessões")
+            sys.exit(1)
+    print("\n✅ Reruns sem erros em todos os níveis")
+
+
+if __name__ == "__main__":
+    main()
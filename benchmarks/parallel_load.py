@@ -0,0 +1,101 @@
+"""Vazão do loader com várias exportações: leitura serial x pool de processos.
+
+Gera exportações sintéticas no esquema original (uma por marca e mês, como
+as que recebemos) e mede `load_data` sobre 1, 2, 4, ... arquivos, lendo em
+série (`workers=1`) e com um processo por arquivo, em linhas/s. Também
+confere que os dois caminhos produzem a mesma base.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.parallel_load
+    python -m benchmarks.parallel_load --format csv --files 1,4,16 --rows-per-file 200000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_raw_frame
+from pages.utils.data_loader import load_data
+
+
+def write_exports(directory, n_files, rows_per_file, fmt):
+    """Grava `n_files` exportações, alternando a marca e avançando o mês."""
+    paths = []
+    for i in range(n_files):
+        month = pd.Period("2024-01", freq="M") + i // 2
+        raw = synthetic_raw_frame(
+            rows_per_file,
+            start=month.start_time,
+            end=month.end_time.normalize(),
+            seed=i,
+        )
+        raw["chatbot"] = ["bot_a", "bot_b"][i % 2]
+        path = directory / f"export_{month}_{i % 2}.{fmt}"
+        if fmt == "xlsx":
+            raw.to_excel(path, index=False)
+        elif fmt == "csv":
+            raw.to_csv(path, index=False)
+        else:
+            raw.to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--format", choices=["xlsx", "csv", "parquet"], default="xlsx")
+    parser.add_argument(
+        "--files",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=[1, 2, 4, 8],
+    )
+    parser.add_argument("--rows-per-file", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(
+        f"{args.format}, {args.rows_per_file:,} linhas por arquivo, "
+        f"{os.cpu_count()} núcleos"
+    )
+    print(f"    {'arquivos':>8} {'serial':>14} {'paralelo':>14} {'ganho':>7}")
+
+    mismatches = []
+    with tempfile.TemporaryDirectory() as tmp:
+        exports = write_exports(
+            Path(tmp), max(args.files), args.rows_per_file, args.format
+        )
+        for n_files in args.files:
+            source = Path(tmp) / f"n{n_files}"
+            source.mkdir()
+            for path in exports[:n_files]:
+                (source / path.name).symlink_to(path)
+
+            timings, results = {}, {}
+            for mode, workers in [("serial", 1), ("paralelo", n_files)]:
+                start = time.perf_counter()
+                results[mode] = load_data(source, workers=workers)
+                timings[mode] = time.perf_counter() - start
+
+            rows = len(results["serial"])
+            if not results["serial"].equals(results["paralelo"]):
+                mismatches.append(n_files)
+            print(
+                f"    {n_files:>8} "
+                f"{rows / timings['serial']:>10,.0f} l/s "
+                f"{rows / timings['paralelo']:>10,.0f} l/s "
+                f"{timings['serial'] / timings['paralelo']:>6.1f}x"
+            )
+
+    if mismatches:
+        print(f"\n❌ Resultados divergentes com {mismatches} arquivos")
+        sys.exit(1)
+    print("\n✅ Leitura serial e paralela equivalentes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Exportações parciais do mesmo dia: a ingestão soma os segmentos.
+
+Num `CACHE_DIR` e num `INGEST_DIR` temporários, sobre uma base sintética,
+ingere (pela linha de comando, como em produção) três CSVs do dia seguinte
+ao fim da base:
+
+1. as linhas de um bot;
+2. as linhas do outro bot, no mesmo dia (agora até a marca d'água);
+3. uma correção de parte das linhas do primeiro bot (um tópico, com as
+   medidas dobradas).
+
+A base resultante deve ter, para o dia, as linhas dos dois bots, com as do
+tópico corrigido substituídas: as mesmas linhas, soma diária e estatísticas
+de qualidade no snapshot gravado pela ingestão e no reconstruído do zero a
+partir dos incrementos. Sai com código 1 se algo divergir.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.partial_exports
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+KEY = ["date", "bot", "tech", "font", "topic", "subject"]
+MEASURE_COLUMNS = [
+    "sessoes_total",
+    "sessoes_retidas",
+    "sessoes_com_pedido_de_atendimento",
+]
+
+
+def ingest(path, env):
+    from pages.utils.data_loader import ROOT
+
+    subprocess.run(
+        [sys.executable, "-m", "pages.utils.ingest", "--no-prewarm", str(path)],
+        cwd=ROOT,
+        env=env,
+        check=True,
+    )
+
+
+def canonical(df):
+    """Dimensões como texto (nulos como None), em ordem pela chave."""
+    dims = df[KEY[1:]].astype(object)
+    df = df.assign(**dims.where(dims.notna(), None))
+    return df.sort_values(KEY, na_position="last", ignore_index=True)
+
+
+def day_rows(snapshot, day):
+    df = snapshot["df"]
+    return canonical(df[df["date"].eq(day)])
+
+
+def check(snapshot, expected, day, label):
+    """Lista de divergências entre o snapshot e as linhas esperadas do dia."""
+    from pages.utils.data_loader import MEASURES
+
+    problems = []
+    rows = day_rows(snapshot, day)
+    try:
+        pd.testing.assert_frame_equal(
+            rows[KEY + MEASURES], expected[KEY + MEASURES], check_dtype=False
+        )
+    except AssertionError as error:
+        problems.append(f"{label}: linhas do dia divergem ({error})")
+    daily = snapshot["daily"].loc[day, MEASURES]
+    if not daily.equals(expected[MEASURES].sum()):
+        problems.append(f"{label}: soma diária {daily.to_dict()} diverge")
+    quality = snapshot["quality"]
+    quality = quality[quality["date"].eq(day)]
+    if quality["rows"].sum() != len(expected) or set(quality["bot"]) != set(
+        expected["bot"]
+    ):
+        problems.append(f"{label}: estatísticas de qualidade do dia divergem")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=lambda v: int(float(v)), default=200_000)
+    parser.add_argument("--day-rows", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # antes de importar `pages`: os caminhos são lidos na importação
+        os.environ["CACHE_DIR"] = str(tmp / "cache")
+        os.environ["INGEST_DIR"] = str(tmp / "ingest")
+        os.environ["DATA_PATH"] = str(tmp / "base.parquet")
+        env = dict(os.environ)
+
+        from benchmarks.synthetic import synthetic_raw_frame
+        from pages.utils.data_loader import (
+            build_snapshot,
+            load_snapshot,
+            normalize,
+            read_snapshot,
+        )
+
+        synthetic_raw_frame(args.rows, end="2025-09-30", seed=args.seed).to_parquet(
+            tmp / "base.parquet"
+        )
+        load_snapshot()
+
+        day = pd.Timestamp("2025-10-01")
+        raw = synthetic_raw_frame(
+            args.day_rows, start=day, end=day, seed=args.seed + 1
+        )
+        # uma linha por chave: cada arquivo é uma exportação agregada
+        columns = list(raw.columns.drop(MEASURE_COLUMNS))
+        raw = raw.groupby(columns, as_index=False)[MEASURE_COLUMNS].sum()
+        first_bot = raw["chatbot"].iloc[0]
+        first = raw[raw["chatbot"].eq(first_bot)]
+        second = raw[raw["chatbot"].ne(first_bot)]
+        topic = first["topico_da_sessao"].iloc[0]
+        correction = first[first["topico_da_sessao"].eq(topic)].copy()
+        correction[MEASURE_COLUMNS] *= 2
+
+        for name, frame in [("a", first), ("b", second), ("a_fix", correction)]:
+            frame.to_csv(tmp / f"{name}.csv", index=False)
+            ingest(tmp / f"{name}.csv", env)
+
+        kept = first[first["topico_da_sessao"].ne(topic)]
+        expected = canonical(normalize(pd.concat([kept, second, correction])))
+
+        problems = check(read_snapshot(), expected, day, "ingestão")
+        problems += check(build_snapshot(), expected, day, "reconstrução")
+
+    print(
+        f"Dia {day.date()}: {len(first)} linhas de {first_bot}, {len(second)} "
+        f"do outro bot, {len(correction)} corrigidas"
+    )
+    if problems:
+        print(f"\n❌ {problems[0]}")
+        sys.exit(1)
+    print("\n✅ As exportações parciais do mesmo dia se somaram")
+
+
+if __name__ == "__main__":
+    main()
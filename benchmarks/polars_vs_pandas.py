@@ -0,0 +1,123 @@
+"""Benchmark do loader e das agregações: pandas x Polars.
+
+Para cada tamanho, gera uma exportação sintética (esquema original), grava em
+Parquet e mede:
+
+- **loader**: leitura + normalização (`normalize` x `normalize_polars`);
+- **agregações**: totais diários, por tópico, por assunto e por
+  bot/tech/fonte, com e sem filtro de data (últimos 30 dias).
+
+O pandas agrega o DataFrame em memória; o Polars agrega com plano
+preguiçoso sobre a base particionada por mês, lendo só as partições do
+intervalo. Nos dois casos o resultado final é um DataFrame pandas.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.polars_vs_pandas                       # 1M, 10M e 50M linhas
+    python -m benchmarks.polars_vs_pandas --rows 1000000 --json resultados.json
+
+Atenção: com 50M linhas o caminho pandas precisa de dezenas de GB de RAM.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import polars as pl
+
+from benchmarks.synthetic import synthetic_raw_frame
+from pages.utils.data_loader import normalize
+from pages.utils.dataset import write_dataset
+from pages.utils.polars_backend import PolarsBackend, normalize_polars
+from pages.utils.query import RATES, Filters, PandasBackend
+
+DEFAULT_ROWS = [1_000_000, 10_000_000, 50_000_000]
+
+AGGREGATIONS = {
+    "diário": ["date"],
+    "por tópico": ["topic"],
+    "por assunto": ["topic", "subject"],
+    "por bot": ["bot"],
+    "por tech": ["tech"],
+    "por fonte": ["font"],
+}
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(n_rows, tmp_dir):
+    """Executa o benchmark para um tamanho e retorna {etapa: {engine: segundos}}."""
+    raw_path = tmp_dir / f"raw-{n_rows}.parquet"
+    synthetic_raw_frame(n_rows).to_parquet(raw_path, index=False)
+
+    results = {}
+    pandas_s, df = _timed(lambda: normalize(pd.read_parquet(raw_path)))
+    polars_s, normalized = _timed(
+        lambda: normalize_polars(pl.scan_parquet(raw_path)).collect()
+    )
+    results["loader"] = {"pandas": pandas_s, "polars": polars_s}
+
+    del normalized
+
+    dataset_dir = tmp_dir / f"dataset-{n_rows}"
+    write_dataset(df, dataset_dir)
+    backends = {
+        "pandas": PandasBackend(df),
+        "polars": PolarsBackend(dataset_dir),
+    }
+    last_day = df["date"].max()
+    filter_cases = {
+        "": Filters(),
+        " (30 dias)": Filters(
+            start_date=last_day - pd.Timedelta(days=29), end_date=last_day
+        ),
+    }
+    for (label, by), (suffix, filters) in (
+        (agg, case) for agg in AGGREGATIONS.items() for case in filter_cases.items()
+    ):
+        results[label + suffix] = {
+            name: _timed(lambda: backend.aggregate(filters, by=by, rates=RATES))[0]
+            for name, backend in backends.items()
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows",
+        type=lambda value: [int(float(v)) for v in value.split(",")],
+        default=DEFAULT_ROWS,
+        help="tamanhos separados por vírgula (ex.: 1e6,1e7)",
+    )
+    parser.add_argument("--json", type=Path, help="grava os resultados em JSON")
+    args = parser.parse_args()
+
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            results = run(n_rows, Path(tmp))
+            report[n_rows] = results
+
+            print(f"\n{n_rows:,} linhas")
+            print(f"    {'etapa':<26} {'pandas':>9} {'polars':>9} {'ganho':>7}")
+            for stage, timing in results.items():
+                speedup = timing["pandas"] / timing["polars"]
+                print(
+                    f"    {stage:<26} {timing['pandas']:>8.3f}s "
+                    f"{timing['polars']:>8.3f}s {speedup:>6.1f}x"
+                )
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Tempo da linha do tempo de qualidade e da detecção de anomalias.
+
+Gera uma base sintética, estraga de propósito um dia de um segmento (tópicos
+apagados e linhas duplicadas), calcula o perfil uma vez, como na ingestão, e
+mede sobre todo o histórico:
+
+- `quality_timeline`: as métricas diárias da página 8;
+- `flag_anomalies`: z-scores robustos e limites de controle de todos os dias
+  e segmentos.
+
+A primeira chamada inclui a importação do SciPy (uma vez por processo); o
+orçamento vale para as seguintes, feitas a cada rerun da página. Sai com
+código 1 se as duas etapas juntas passarem do orçamento ou se o dia estragado
+não for sinalizado.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.quality_timeline
+    python -m benchmarks.quality_timeline --rows 10000000 --budget-ms 500
+"""
+
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_frame
+from pages.utils.quality import flag_anomalies, profile, quality_timeline
+
+BAD_DAY = pd.Timestamp("2025-03-14")
+
+
+def spoil_day(df):
+    """Apaga os tópicos e duplica as linhas de um dia de um segmento."""
+    first = df.iloc[0]
+    segment = (
+        df["date"].eq(BAD_DAY)
+        & df["bot"].eq(first["bot"])
+        & df["tech"].eq(first["tech"])
+        & df["font"].eq(first["font"])
+    )
+    df = df.copy()
+    df.loc[segment, "topic"] = None
+    return pd.concat([df, df[segment]], ignore_index=True), first
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=lambda v: int(float(v)), default=5_000_000)
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    args = parser.parse_args()
+
+    df, segment = spoil_day(synthetic_frame(args.rows))
+
+    start = time.perf_counter()
+    _, _, stats = profile(df)
+    profile_s = time.perf_counter() - start
+
+    timings = []
+    for _ in range(2):
+        start = time.perf_counter()
+        timeline = quality_timeline(stats)
+        anomalies = flag_anomalies(stats)
+        timings.append((time.perf_counter() - start) * 1000)
+    cold_ms, elapsed_ms = timings
+
+    print(f"{len(df):,} linhas, {len(stats):,} grupos dia × segmento")
+    print(f"    perfil (uma vez por ingestão)   {profile_s:8.2f} s")
+    print(f"    linha do tempo + anomalias      {elapsed_ms:8.1f} ms")
+    print(f"      (1ª chamada, com imports)     {cold_ms:8.1f} ms")
+    print(f"    {len(timeline)} dias, {len(anomalies)} sinalizações")
+
+    hits = anomalies[
+        anomalies["date"].eq(BAD_DAY)
+        & anomalies["bot"].eq(segment["bot"])
+        & anomalies["tech"].eq(segment["tech"])
+        & anomalies["font"].eq(segment["font"])
+    ]
+    if not {"topic_completeness", "duplicate_rate"} <= set(hits["metric"]):
+        print(f"\n❌ Dia estragado ({BAD_DAY.date()}) não sinalizado")
+        sys.exit(1)
+    if elapsed_ms > args.budget_ms:
+        print(f"\n❌ {elapsed_ms:,.0f} ms > orçamento de {args.budget_ms:,.0f} ms")
+        sys.exit(1)
+    print(f"\n✅ Dia estragado sinalizado, dentro do orçamento ({args.budget_ms:,.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
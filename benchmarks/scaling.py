@@ -0,0 +1,397 @@
+"""Suíte de escala: o caminho de cada página medido de 10 mil a 50 milhões de linhas.
+
+Para cada tamanho, grava uma exportação sintética (`write_synthetic`, com
+sazonalidade semanal e anual) e mede, num processo próprio:
+
+- **carga**: `load_data`, o perfil de qualidade e a montagem do snapshot
+  (ordenação, índices e rollup diário), como em `build_snapshot`;
+- **barra lateral**: as opções dos filtros e o recorte das linhas com o
+  filtro padrão (base inteira) e com um clique típico (30 dias, um bot);
+- **páginas**: as consultas de cada página (2, 4, 5, 6, 7, 8 e 9) nos dois
+  filtros e a montagem dos gráficos com os builders de `charts.py`, incluindo
+  a serialização (`fig.to_json()`) que o `st.plotly_chart` faz;
+- **projeção**: os três ajustes de `forecast_with_fourier` da página 3
+  (`build_projection`); o custo depende do número de dias, não de linhas.
+
+O resultado sai no terminal e, com `--json`, num arquivo com os metadados da
+máquina. Com `--baseline`, compara com um JSON anterior e sai com código 1 se
+alguma etapa ficar mais lenta que a tolerância:
+
+    python -m benchmarks.scaling --rows 1e4,1e6 --json scaling.json
+    python -m benchmarks.scaling --rows 1e4,1e6 --baseline scaling.json
+    python -m benchmarks.scaling --backend duckdb --cardinality topic=50
+
+Atenção: com 50M linhas o caminho pandas precisa de dezenas de GB de RAM; se
+o processo de um tamanho morrer, o tamanho é marcado como falho e a suíte
+segue para o próximo.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import write_synthetic
+from pages.utils.data_loader import ROOT, build_indexes, daily_rollup, load_data
+from pages.utils.query import RATES, Filters
+
+DEFAULT_ROWS = [10_000, 1_000_000, 50_000_000]
+ROWS_PER_FILE = 5_000_000
+# etapas baratas são repetidas e fica o melhor tempo (menos ruído)
+REPEAT = 3
+# variações abaixo disso são ruído, mesmo acima da tolerância relativa
+MIN_REGRESSION_S = 0.01
+
+RETENTION = ["retention_rate", "human_request_rate"]
+TECH_COLUMNS = ("bot", "tech", "font")
+
+
+# ==========================================================
+# CONSULTAS E GRÁFICOS DE CADA PÁGINA
+# ==========================================================
+def page_2(backend, filters):
+    from pages.utils.funnel import funnel_cube, rollup
+
+    return {
+        "daily": backend.aggregate(filters, by=["date"], rates=RETENTION),
+        "topics": backend.aggregate(filters, by=["topic"], rates=RETENTION),
+        **page_7(backend, filters),
+        "funnel": rollup(funnel_cube(backend, filters)),
+    }
+
+
+def page_4(backend, filters):
+    return {"daily": backend.aggregate(filters, by=["date"], rates=RETENTION)}
+
+
+def page_5(backend, filters):
+    return {
+        "topics": backend.aggregate(filters, by=["topic"], rates=RETENTION),
+        "time": backend.aggregate(
+            filters, by=["date", "topic"], measures=["sessions_total"]
+        ),
+    }
+
+
+def page_6(backend, filters):
+    return {
+        "subjects": backend.aggregate(filters, by=["topic", "subject"], rates=RATES),
+        "time": backend.aggregate(
+            filters, by=["date", "subject"], measures=["sessions_total"]
+        ),
+    }
+
+
+def page_7(backend, filters):
+    return {
+        col: backend.aggregate(filters, by=[col], rates=RATES) for col in TECH_COLUMNS
+    }
+
+
+def page_8(backend, filters, quality):
+    from pages.utils.quality import flag_anomalies, quality_timeline, select
+
+    return {
+        "timeline": quality_timeline(select(quality, filters)),
+        "anomalies": select(flag_anomalies(quality), filters),
+    }
+
+
+def page_9(backend, filters):
+    from pages.utils.funnel import FUNNEL_DIMENSIONS, daily_funnel, funnel_cube, rollup
+
+    cube = funnel_cube(backend, filters)
+    return {
+        "funnel": rollup(cube),
+        "segments": rollup(cube, FUNNEL_DIMENSIONS),
+        "daily": daily_funnel(backend, filters),
+    }
+
+
+def funnel_figure(frames):
+    from pages.utils.charts import funnel_chart
+
+    funnel = frames["funnel"].iloc[0]
+    return funnel_chart(
+        funnel["sessions_total"],
+        funnel["session_retained"],
+        funnel["loss_count"],
+        title="Funil",
+    )
+
+
+def charts_2(frames):
+    from pages.utils.charts import topic_retention_chart
+
+    return [topic_retention_chart(frames["topics"]), funnel_figure(frames)]
+
+
+def charts_4(frames):
+    from pages.utils.charts import daily_sessions_chart, retention_rate_chart
+
+    return [
+        daily_sessions_chart(frames["daily"], enable_smoothing=True),
+        retention_rate_chart(frames["daily"], enable_smoothing=True),
+    ]
+
+
+def charts_7(frames):
+    from pages.utils.charts import (
+        efficiency_bar_chart,
+        performance_chart,
+        performance_frame,
+    )
+
+    return [
+        *(efficiency_bar_chart(frames[col], col, col, col) for col in TECH_COLUMNS),
+        performance_chart(performance_frame(*(frames[col] for col in TECH_COLUMNS))),
+    ]
+
+
+def charts_9(frames):
+    from pages.utils.charts import funnel_rates_chart
+
+    return [funnel_figure(frames), funnel_rates_chart(frames["daily"])]
+
+
+# página → (consultas, gráficos); as páginas 5, 6 e 8 montam os gráficos
+# direto com plotly express, fora dos builders compartilhados
+PAGES = {
+    "2": (page_2, charts_2),
+    "4": (page_4, charts_4),
+    "5": (page_5, None),
+    "6": (page_6, None),
+    "7": (page_7, charts_7),
+    "8": (page_8, None),
+    "9": (page_9, charts_9),
+}
+
+
+# ==========================================================
+# EXECUÇÃO DE UM TAMANHO
+# ==========================================================
+def _timed(func, repeat=1):
+    """Melhor tempo de `repeat` execuções e o resultado da última."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def make_backend(name, df, indexes, dataset_dir):
+    if name == "pandas":
+        from pages.utils.query import PandasBackend
+
+        return PandasBackend(df, indexes)
+    from pages.utils.dataset import write_dataset
+
+    write_dataset(df, dataset_dir)
+    if name == "duckdb":
+        from pages.utils.query import DuckDBBackend
+
+        return DuckDBBackend(dataset_dir)
+    from pages.utils.polars_backend import PolarsBackend
+
+    return PolarsBackend(dataset_dir)
+
+
+def run(n_rows, tmp_dir, backend_name="pandas", cardinalities=None, forecast=True):
+    """Executa a suíte para um tamanho e retorna {etapa: segundos}."""
+    from pages.utils.forecast import build_projection, daily_series
+    from pages.utils.quality import profile
+
+    source = tmp_dir / f"fonte-{n_rows}"
+    source.mkdir()
+    write_synthetic(source, n_rows, ROWS_PER_FILE, cardinalities=cardinalities)
+
+    results = {}
+    results["load_data"], df = _timed(lambda: load_data(source))
+    results["perfil de qualidade"], (df, _, quality) = _timed(lambda: profile(df))
+
+    def assemble():
+        ordered = df.sort_values("date", kind="stable", ignore_index=True)
+        return ordered, build_indexes(ordered), daily_rollup(ordered)
+
+    results["snapshot (índices e diário)"], (df, indexes, daily) = _timed(assemble)
+    results["backend"], backend = _timed(
+        lambda: make_backend(backend_name, df, indexes, tmp_dir / f"dataset-{n_rows}")
+    )
+
+    last_day = indexes["date_range"][1]
+    filter_cases = {
+        "": Filters(),
+        " (30 dias, 1 bot)": Filters(
+            start_date=last_day - pd.Timedelta(days=29),
+            end_date=last_day,
+            bot=(indexes["options"]["bot"][0],),
+        ),
+    }
+    results["barra lateral · opções"], _ = _timed(backend.indexes, REPEAT)
+    for suffix, filters in filter_cases.items():
+        results["barra lateral · recorte" + suffix], _ = _timed(
+            lambda: backend.filter(filters), REPEAT
+        )
+
+    for page, (queries, charts) in PAGES.items():
+        args = (quality,) if page == "8" else ()
+        for suffix, filters in filter_cases.items():
+            seconds, frames = _timed(lambda: queries(backend, filters, *args), REPEAT)
+            results[f"página {page} · consultas{suffix}"] = seconds
+        # gráficos com o filtro do último caso, o de uma interação típica
+        if charts is not None:
+            results[f"página {page} · gráficos"], _ = _timed(
+                lambda: [fig.to_json() for fig in charts(frames)], REPEAT
+            )
+
+    if forecast:
+        results["página 3 · projeção"], _ = _timed(
+            lambda: build_projection(daily_series(daily))
+        )
+    # pico de memória do processo que mediu este tamanho (kB no Linux)
+    results["pico de memória (MB)"] = (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    )
+    return results
+
+
+def run_isolated(n_rows, **kwargs):
+    """Roda um tamanho num processo novo: memória limpa e pico de RSS próprio."""
+    # "spawn", como nos outros pools do projeto
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            return pool.submit(run, n_rows, Path(tmp), **kwargs).result()
+
+
+# ==========================================================
+# RELATÓRIO
+# ==========================================================
+def metadata(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "backend": args.backend,
+        "cardinalities": args.cardinality,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """Etapas mais lentas que no `baseline` além da tolerância."""
+    slower = []
+    for n_rows, stages in results.items():
+        for stage, seconds in stages.items():
+            before = baseline.get(n_rows, {}).get(stage)
+            if before is None or stage.startswith("pico"):
+                continue
+            limit = max(before * (1 + tolerance), before + MIN_REGRESSION_S)
+            if seconds > limit:
+                slower.append((n_rows, stage, before, seconds))
+    return slower
+
+
+def parse_cardinalities(values):
+    cardinalities = {}
+    for value in values:
+        dim, _, count = value.partition("=")
+        cardinalities[dim] = int(count)
+    return cardinalities
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows",
+        type=lambda value: [int(float(v)) for v in value.split(",")],
+        default=DEFAULT_ROWS,
+        help="tamanhos separados por vírgula (ex.: 1e4,1e6)",
+    )
+    parser.add_argument(
+        "--backend", choices=["pandas", "duckdb", "polars"], default="pandas"
+    )
+    parser.add_argument(
+        "--cardinality",
+        action="append",
+        default=[],
+        metavar="DIM=N",
+        help="valores distintos de uma dimensão (ex.: topic=50); repetível",
+    )
+    parser.add_argument("--no-forecast", action="store_true")
+    parser.add_argument("--json", type=Path, help="grava os resultados em JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON anterior para comparar")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.3, help="piora aceita (0.3 = 30%%)"
+    )
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+
+    results, failed = {}, []
+    for n_rows in args.rows:
+        print(f"\n{n_rows:,} linhas ({args.backend})", flush=True)
+        try:
+            stages = run_isolated(
+                n_rows,
+                backend_name=args.backend,
+                cardinalities=parse_cardinalities(args.cardinality),
+                forecast=not args.no_forecast,
+            )
+        except BrokenProcessPool:
+            print("    ❌ o processo morreu (memória insuficiente?)")
+            failed.append(n_rows)
+            continue
+        results[str(n_rows)] = stages
+
+        before = baseline.get(str(n_rows), {})
+        print(f"    {'etapa':<40} {'atual':>10} {'baseline':>10}")
+        for stage, value in stages.items():
+            unit = "" if stage.startswith("pico") else "s"
+            previous = f"{before[stage]:>9.3f}{unit}" if stage in before else ""
+            print(f"    {stage:<40} {value:>9.3f}{unit} {previous:>10}")
+
+    if args.json:
+        report = {"meta": metadata(args), "results": results}
+        args.json.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+    slower = regressions(results, baseline, args.tolerance)
+    for n_rows, stage, before, seconds in slower:
+        print(f"    {int(n_rows):,} · {stage}: {before:.3f}s → {seconds:.3f}s")
+    if failed or slower:
+        print(
+            f"\n❌ {len(slower)} regressões acima de {args.tolerance:.0%}"
+            + (f"; falharam: {', '.join(f'{n:,}' for n in failed)}" if failed else "")
+        )
+        sys.exit(1)
+    print("\n✅ Suíte concluída" + (" sem regressões" if baseline else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Memória total de N workers: snapshot em pickle vs. Arrow mapeado.
+
+Grava uma exportação sintética, roda o prewarm uma vez para cada formato do
+snapshot (`SNAPSHOT_STORE=pickle` e `arrow`, cada um no seu `CACHE_DIR`
+temporário) e sobe 1, 4 e 8 processos worker. Cada worker importa o
+Streamlit, carrega o snapshot com `load_snapshot`, monta o backend pandas e
+agrega a base por cada dimensão (o que percorre todas as colunas, como as
+páginas). Com todos prontos, são somados, de /proc/<pid>/smaps_rollup:
+
+- o RSS, que conta em cada processo as páginas compartilhadas;
+- o PSS, que as divide entre os processos: é a memória que os workers
+  realmente ocupam juntos.
+
+Sai com código 1 se, no Arrow, cada worker adicional não custar menos PSS
+que no pickle.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.shared_memory
+    python -m benchmarks.shared_memory --rows 2e6 --workers 1,2,4
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import write_synthetic
+from pages.utils.data_loader import ROOT
+from pages.utils.memory import shared_memory
+
+STORES = ("pickle", "arrow")
+MB = 1024**2
+
+
+def worker():
+    """Carrega o snapshot, toca a base inteira e espera o fim da medição."""
+    import streamlit  # noqa: F401  (o servidor de verdade também o carrega)
+
+    from pages.utils.data_loader import DIMENSIONS, load_snapshot
+    from pages.utils.query import Filters, PandasBackend
+
+    start = time.perf_counter()
+    snapshot = load_snapshot()
+    load_s = time.perf_counter() - start
+    backend = PandasBackend(snapshot["df"], snapshot["indexes"])
+    for dim in DIMENSIONS:
+        backend.aggregate(Filters(), by=("date", dim))
+    print(json.dumps({"load_s": load_s}), flush=True)
+    # o processo pai mede a memória e então fecha o stdin
+    sys.stdin.read()
+
+
+def store_env(tmp, store):
+    return {
+        **os.environ,
+        "CACHE_DIR": str(tmp / store),
+        "DATA_PATH": str(tmp / "exports"),
+        "SNAPSHOT_STORE": store,
+        "PREWARM_FORECAST": "0",
+    }
+
+
+def measure(env, n_workers):
+    """Sobe `n_workers` workers e soma a memória deles quando todos estão prontos."""
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.shared_memory", "--worker"],
+            cwd=ROOT,
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        for _ in range(n_workers)
+    ]
+    try:
+        loads = [json.loads(proc.stdout.readline())["load_s"] for proc in procs]
+        usage = [shared_memory(proc.pid) for proc in procs]
+    finally:
+        for proc in procs:
+            proc.stdin.close()
+            proc.wait()
+    return {
+        "rss_mb": sum(u["rss"] for u in usage) / MB,
+        "pss_mb": sum(u["pss"] for u in usage) / MB,
+        "load_s": sum(loads) / len(loads),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows", type=lambda value: int(float(value)), default=5_000_000
+    )
+    parser.add_argument(
+        "--workers",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=[1, 4, 8],
+    )
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker()
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "exports").mkdir()
+        write_synthetic(tmp / "exports", args.rows)
+
+        print(f"{args.rows:,} linhas; memória somada de todos os workers")
+        print(
+            f"    {'snapshot':<8} {'workers':>7} {'RSS':>10} {'PSS':>10} "
+            f"{'carga':>8}"
+        )
+        per_worker = {}
+        for store in STORES:
+            env = store_env(tmp, store)
+            subprocess.run(
+                [sys.executable, "-m", "pages.utils.prewarm", "--no-forecast"],
+                cwd=ROOT,
+                env=env,
+                capture_output=True,
+                check=True,
+            )
+            results = {}
+            for n_workers in args.workers:
+                result = results[n_workers] = measure(env, n_workers)
+                print(
+                    f"    {store:<8} {n_workers:>7} {result['rss_mb']:>7,.0f} MB "
+                    f"{result['pss_mb']:>7,.0f} MB {result['load_s']:>7.2f}s"
+                )
+            lo, hi = min(args.workers), max(args.workers)
+            per_worker[store] = (
+                (results[hi]["pss_mb"] - results[lo]["pss_mb"]) / (hi - lo)
+                if hi > lo
+                else results[hi]["pss_mb"]
+            )
+
+    print(
+        "\nPSS por worker adicional: "
+        + ", ".join(f"{store} {mb:,.0f} MB" for store, mb in per_worker.items())
+    )
+    if per_worker["arrow"] >= per_worker["pickle"]:
+        print("❌ O snapshot mapeado não reduz a memória por worker")
+        sys.exit(1)
+    print("✅ Workers compartilham as páginas do snapshot Arrow")
+
+
+if __name__ == "__main__":
+    main()
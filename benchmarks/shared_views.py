@@ -0,0 +1,159 @@
+"""Uma visão popular aberta por várias sessões: calculada uma vez por geração.
+
+Sobe o Streamlit sobre uma base sintética (como `page_load.py`, depois do
+prewarm) e, para cada página, abre `--sessions` sessões novas, uma depois da
+outra, na mesma URL: um bot, uma tecnologia e os últimos 30 dias, como um
+favorito enviado a vários analistas. Metade das sessões usa a URL com dois
+bots numa ordem e a outra metade na ordem inversa, que os filtros devem
+levar à mesma forma canônica. Para cada sessão são medidos o primeiro rerun
+e as entradas novas no cache de resultados (`.cache/results.sqlite`).
+
+Sai com código 1 se houver erros nas páginas, se os filtros da URL não
+chegarem aos widgets ou se alguma sessão depois da primeira gravar entradas
+novas no cache (isto é, recalcular a visão).
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.shared_views
+    python -m benchmarks.shared_views --rows 5e6 --sessions 8
+"""
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import urlencode
+
+from benchmarks.page_load import Session, free_port, server_env, start_server
+from pages.utils.data_loader import ROOT
+
+PAGES = ("Visão Geral", "Tópicos", "Comparação", "Funil")
+
+
+def cache_entries(path):
+    if not path.exists():
+        return 0
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+async def view_queries(port):
+    """As duas URLs da visão (bots em ordens diferentes), a partir das opções."""
+    client = Session(port, random.Random(0))
+    await client.connect()
+    await client.open_page(next(name for name in client.pages if "Visão" in name))
+    options = {proto.label: proto for _, proto in client.filters.values()}
+    await client.close()
+
+    end = date.fromisoformat(options["Selecione o intervalo"].max.replace("/", "-"))
+    bots = list(options["Bot"].options)[:2]
+    params = [
+        ("start", (end - timedelta(days=29)).isoformat()),
+        ("tech", options["Tech"].options[-1]),
+    ]
+    return [
+        urlencode([("bot", bot) for bot in order] + params)
+        for order in (bots, bots[::-1])
+    ]
+
+
+async def open_view(port, page, query_string):
+    """Uma sessão nova na URL; retorna (ms, erro, bots selecionados)."""
+    client = Session(port, random.Random(0), query_string=query_string)
+    await client.connect()
+    ms, error = await client.open_page(page)
+    selected = [
+        list(proto.default)
+        for widget, proto in client.filters.values()
+        if widget == "multiselect" and proto.label == "Bot"
+    ]
+    await client.close()
+    return ms, error, selected[0] if selected else []
+
+
+async def run(port, sessions, results_path):
+    """Abre a visão em cada página; retorna as linhas e as falhas."""
+    queries = await view_queries(port)
+    client = Session(port, random.Random(0))
+    await client.connect()
+    pages = [name for name in client.pages if any(p in name for p in PAGES)]
+    await client.close()
+
+    rows, failures = [], []
+    for page in pages:
+        for session in range(sessions):
+            before = cache_entries(results_path)
+            ms, error, selected = await open_view(port, page, queries[session % 2])
+            added = cache_entries(results_path) - before
+            rows.append((page, session, ms, added))
+            if error:
+                failures.append(f"{page}: {error}")
+            elif len(selected) != 2:
+                failures.append(f"{page}: os bots da URL não foram aplicados")
+            elif session and added:
+                failures.append(
+                    f"{page}: a sessão {session + 1} recalculou a visão "
+                    f"({added} entradas novas)"
+                )
+    return queries[0], rows, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=lambda v: int(float(v)), default=1_000_000)
+    parser.add_argument("--sessions", type=int, default=6, help="por página")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from benchmarks.page_load import warm_up
+    from benchmarks.synthetic import synthetic_raw_frame
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp) / "sintetico.parquet"
+        synthetic_raw_frame(args.rows, seed=args.seed).to_parquet(data_path)
+        env = server_env(Path(tmp) / "cache", data_path)
+        results_path = Path(tmp) / "cache" / "results.sqlite"
+        env["RESULT_CACHE_PATH"] = str(results_path)
+        print(f"Prewarm da base sintética ({args.rows:,} linhas)...")
+        subprocess.run(
+            [sys.executable, "-m", "pages.utils.prewarm"], cwd=ROOT, env=env, check=True
+        )
+
+        port = free_port()
+        proc = start_server(env, port)
+        try:
+            # os imports saem da medição; a visão em si ainda não foi aberta
+            asyncio.run(warm_up(port))
+            query, rows, failures = asyncio.run(
+                run(port, args.sessions, results_path)
+            )
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    print(f"\nVisão: {query}")
+    print(
+        f"    {'página':<30} {'1ª sessão':>10} {'entradas':>9} "
+        f"{'demais (média)':>15} {'recálculos':>11}"
+    )
+    for page in dict.fromkeys(row[0] for row in rows):
+        first, *others = [row for row in rows if row[0] == page]
+        mean = sum(row[2] for row in others) / len(others) if others else float("nan")
+        print(
+            f"    {page:<30} {first[2]:>7.0f} ms {first[3]:>9} {mean:>12.0f} ms "
+            f"{sum(1 for row in others if row[3]):>11}"
+        )
+
+    if failures:
+        print(f"\n❌ {failures[0]}")
+        sys.exit(1)
+    print("\n✅ Uma vez por página: as outras sessões leram a visão do cache")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Gerador de dados sintéticos no esquema da exportação e no esquema normalizado.
+
+`synthetic_raw_frame` produz as colunas da planilha original (session_date,
+chatbot, fonte, ...), e `synthetic_frame` passa esse resultado pela mesma
+normalização de `load_data`, entregando o DataFrame que as páginas recebem.
+Assim verificações e benchmarks rodam sem a planilha privada.
+
+Os dados imitam a forma da base real:
+
+- **sazonalidade**: menos sessões no fim de semana, pico no fim do ano e
+  crescimento ao longo do período, tanto no número de linhas por dia quanto
+  no volume de cada linha;
+- **taxas**: a retenção varia por bot e tecnologia (e sobe no fim de
+  semana), e os pedidos de atendimento humano saem das sessões não retidas;
+- **cardinalidades**: `cardinalities` define quantos valores cada dimensão
+  tem (nomes extras são gerados); os canais, tópicos e assuntos seguem uma
+  distribuição de Zipf, com uma fração de "Unknown" (sem tópico/assunto).
+
+Para bases maiores que a memória de um DataFrame bruto, `write_synthetic`
+grava a exportação em vários arquivos Parquet, um lote por vez.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.data_loader import concat_normalized, normalize
+
+BOTS = ["bot_a", "bot_b"]
+FONTS = ["chat_a", "chat_b", "chat_c"]
+TECHS = ["tech_a", "tech_b"]
+TOPICS = ["Cartão", "Conta", "Maquininha", "Pix", "Empréstimo", "Unknown"]
+SUBJECTS = ["Bloqueio", "Entrega", "Limite", "Saldo", "Senha", "Taxas", "Unknown"]
+
+# coluna da exportação → (nomes padrão, prefixo dos nomes extras, expoente de Zipf)
+DIMENSION_VALUES = {
+    "chatbot": (BOTS, "bot_", 0.0),
+    "fonte": (FONTS, "chat_", 2.0),
+    "tecnologia_do_chatbot": (TECHS, "tech_", 0.0),
+    "topico_da_sessao": (TOPICS, "Tópico ", 1.0),
+    "assunto_da_sessao": (SUBJECTS, "Assunto ", 1.0),
+}
+CARDINALITY_KEYS = {
+    "bot": "chatbot",
+    "font": "fonte",
+    "tech": "tecnologia_do_chatbot",
+    "topic": "topico_da_sessao",
+    "subject": "assunto_da_sessao",
+}
+# segunda a domingo
+WEEKDAY_FACTORS = np.array([1.0, 1.05, 1.0, 0.98, 0.92, 0.6, 0.45])
+UNKNOWN_SHARE = 0.05
+MEAN_SESSIONS = 250
+
+
+def dimension_labels(column, cardinality=None):
+    """Valores de uma dimensão com a cardinalidade pedida ("Unknown" por último)."""
+    names, prefix, _ = DIMENSION_VALUES[column]
+    known = [name for name in names if name != "Unknown"]
+    n_known = (cardinality or len(names)) - ("Unknown" in names)
+    known = (known + [f"{prefix}{i}" for i in range(len(known) + 1, n_known + 1)])[
+        :n_known
+    ]
+    return known + ["Unknown"] if "Unknown" in names else known
+
+
+def dimension_weights(column, labels):
+    """Probabilidade de cada valor: Zipf nos conhecidos, fração fixa de "Unknown"."""
+    _, _, exponent = DIMENSION_VALUES[column]
+    known = [label for label in labels if label != "Unknown"]
+    weights = 1 / np.arange(1, len(known) + 1) ** exponent
+    weights = weights / weights.sum()
+    if len(known) < len(labels):
+        weights = np.append(weights * (1 - UNKNOWN_SHARE), UNKNOWN_SHARE)
+    return weights
+
+
+def day_factors(dates):
+    """Volume relativo de cada dia: semana × fim de ano × tendência."""
+    weekly = WEEKDAY_FACTORS[dates.dayofweek.to_numpy()]
+    # pico anual no fim de dezembro, vale no meio do ano
+    day_of_year = dates.dayofyear.to_numpy()
+    annual = 1 + 0.2 * np.cos(2 * np.pi * (day_of_year - 355) / 365.25)
+    trend = 1 + 0.3 * np.linspace(0, 1, len(dates))
+    return weekly * annual * trend
+
+
+def synthetic_raw_frame(
+    n_rows, start="2024-01-01", end="2025-09-30", seed=0, cardinalities=None
+):
+    """Gera `n_rows` linhas aleatórias com as colunas da exportação original.
+
+    `cardinalities` mapeia dimensões normalizadas ("bot", "topic", ...) ao
+    número de valores distintos; as omitidas usam os valores padrão.
+    """
+    rng = np.random.default_rng(seed)
+    cardinalities = cardinalities or {}
+    dates = pd.date_range(start, end, freq="D")
+    factors = day_factors(dates)
+
+    day = rng.choice(len(dates), n_rows, p=factors / factors.sum())
+    columns = {"session_date": dates[day]}
+    codes = {}
+    for key, column in CARDINALITY_KEYS.items():
+        labels = dimension_labels(column, cardinalities.get(key))
+        codes[key] = rng.choice(
+            len(labels), n_rows, p=dimension_weights(column, labels)
+        ).astype(np.int32)
+        # strings como na exportação, mas compartilhadas: um ponteiro por célula
+        columns[column] = np.array(labels, dtype=object)[codes[key]]
+
+    # volume da linha acompanha a sazonalidade do dia
+    sessions_total = rng.poisson(MEAN_SESSIONS * factors[day] / factors.mean())
+
+    # retenção: efeito de bot e tecnologia, mais alta no fim de semana
+    retention = (
+        0.70
+        + 0.02 * (codes["bot"] % 2)
+        + 0.015 * (codes["tech"] % 2)
+        + 0.02 * (dates.dayofweek.to_numpy()[day] >= 5)
+        + rng.normal(0, 0.03, n_rows)
+    ).clip(0.3, 0.98)
+    session_retained = rng.binomial(sessions_total, retention)
+    # pedidos de atendimento humano vêm das sessões não retidas
+    sessions_human_assistance = rng.binomial(
+        sessions_total - session_retained, rng.uniform(0.4, 0.65, n_rows)
+    )
+
+    return pd.DataFrame(
+        {
+            **columns,
+            "sessoes_total": sessions_total,
+            "sessoes_retidas": session_retained,
+            "sessoes_com_pedido_de_atendimento": sessions_human_assistance,
+        }
+    )
+
+
+def synthetic_frame(
+    n_rows, start="2024-01-01", end="2025-09-30", seed=0, cardinalities=None
+):
+    """Gera `n_rows` linhas já normalizadas, como as que `load_data` retorna."""
+    raw = synthetic_raw_frame(
+        n_rows, start=start, end=end, seed=seed, cardinalities=cardinalities
+    )
+    return concat_normalized([normalize(raw)])
+
+
+def write_synthetic(directory, n_rows, rows_per_file=5_000_000, **kwargs):
+    """Grava uma exportação sintética de `n_rows` linhas em arquivos Parquet.
+
+    Cada arquivo é gerado e gravado separadamente (sementes diferentes), então
+    a memória usada é a de um arquivo. Retorna a lista de caminhos.
+    """
+    seed = kwargs.pop("seed", 0)
+    paths = []
+    for i, lo in enumerate(range(0, n_rows, rows_per_file)):
+        rows = min(rows_per_file, n_rows - lo)
+        path = directory / f"sintetico-{i:03d}.parquet"
+        synthetic_raw_frame(rows, seed=seed + i, **kwargs).to_parquet(
+            path, index=False
+        )
+        paths.append(path)
+    return paths
@@ -0,0 +1,183 @@
+"""Vazão das páginas com 1, 2 e 4 workers atrás do proxy de `serve.py`.
+
+Sobe `python -m pages.utils.serve` sobre uma base sintética (num
+`CACHE_DIR` temporário, depois do prewarm com `SNAPSHOT_STORE=arrow`) e,
+para cada número de workers, conecta o mesmo número de sessões simultâneas
+pelo websocket do navegador (os clientes de `page_load.py`): cada sessão
+abre páginas sorteadas e troca filtros da barra lateral. São medidos os
+reruns por segundo, a latência (p50/p95) e os núcleos de CPU usados pelos
+workers. Com `WORKERS=1` o Streamlit roda direto, sem o proxy, como em
+produção.
+
+A vazão só escala até o número de núcleos da máquina, que é impresso junto
+com o resultado. Sai com código 1 se houver erros nas páginas ou, com
+`--min-speedup`, se a vazão do maior número de workers não chegar a esse
+múltiplo da de um worker.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.worker_scaling
+    python -m benchmarks.worker_scaling --workers 1,2,4,8 --sessions 16
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from benchmarks.page_load import (
+    ProcessMonitor,
+    free_port,
+    percentiles,
+    run_level,
+    server_env,
+    warm_up,
+)
+from pages.utils.data_loader import ROOT
+
+
+def start_serve(env, workers):
+    """Inicia o `serve.py` e espera o health check de cada worker."""
+    port, worker_port = free_port(), free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "pages.utils.serve"],
+        cwd=ROOT,
+        env={
+            **env,
+            "WORKERS": str(workers),
+            "SERVE_ADDRESS": "127.0.0.1",
+            "SERVE_PORT": str(port),
+            "WORKER_PORT": str(worker_port),
+        },
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    ports = [port] if workers == 1 else range(worker_port, worker_port + workers)
+    deadline = time.monotonic() + 120
+    for worker in ports:
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{worker}/_stcore/health")
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    proc.kill()
+                    raise RuntimeError("os workers não responderam")
+                time.sleep(0.2)
+    return proc, port
+
+
+def worker_pids(proc, workers):
+    """Processos do Streamlit: o próprio `serve.py` com um worker, ou os filhos."""
+    if workers == 1:
+        return [proc.pid]
+    with open(f"/proc/{proc.pid}/task/{proc.pid}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+async def warm_workers(port, workers):
+    """Visita cada página em cada worker (sessões abertas juntas se espalham)."""
+    await asyncio.gather(*(warm_up(port) for _ in range(workers)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--workers",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=[1, 2, 4],
+    )
+    parser.add_argument(
+        "--sessions", type=int, default=8, help="sessões simultâneas (padrão 8)"
+    )
+    parser.add_argument("--seconds", type=float, default=20, help="por nível")
+    parser.add_argument("--clicks", type=int, default=3, help="filtros por página")
+    parser.add_argument("--rows", type=lambda v: int(float(v)), default=1_000_000)
+    parser.add_argument(
+        "--page", action="append", help="trecho do nome da página (repetível)"
+    )
+    parser.add_argument("--min-speedup", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from benchmarks.synthetic import synthetic_raw_frame
+
+    levels = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp) / "sintetico.parquet"
+        synthetic_raw_frame(args.rows, seed=args.seed).to_parquet(data_path)
+        env = {**server_env(Path(tmp) / "cache", data_path), "SNAPSHOT_STORE": "arrow"}
+        print(f"Prewarm da base sintética ({args.rows:,} linhas)...")
+        subprocess.run(
+            [sys.executable, "-m", "pages.utils.prewarm"], cwd=ROOT, env=env, check=True
+        )
+
+        for workers in args.workers:
+            proc, port = start_serve(env, workers)
+            try:
+                asyncio.run(warm_workers(port, workers))
+                monitors = [ProcessMonitor(pid) for pid in worker_pids(proc, workers)]
+                cpu_start = sum(m.cpu_seconds() for m in monitors)
+                wall_start = time.perf_counter()
+                samples = asyncio.run(
+                    run_level(
+                        port,
+                        args.page or [""],
+                        args.sessions,
+                        args.seconds,
+                        args.clicks,
+                        args.seed,
+                    )
+                )
+                wall = time.perf_counter() - wall_start
+                cpu = sum(m.cpu_seconds() for m in monitors) - cpu_start
+            finally:
+                proc.terminate()
+                proc.wait()
+            levels.append(
+                {
+                    "workers": workers,
+                    "reruns_per_s": len(samples) / wall,
+                    "cpu_cores": cpu / wall,
+                    "error_count": sum(1 for s in samples if s[3]),
+                    "errors": [s[3] for s in samples if s[3]][:5],
+                    **percentiles([s[2] for s in samples]),
+                }
+            )
+
+    cores = len(os.sched_getaffinity(0))
+    print(f"\n{args.sessions} sessões simultâneas; núcleos disponíveis: {cores}")
+    print(
+        f"    {'workers':>7} {'/s':>7} {'ganho':>6} {'p50':>9} {'p95':>9} "
+        f"{'CPU':>6} {'erros':>6}"
+    )
+    base = levels[0]["reruns_per_s"]
+    for level in levels:
+        level["speedup"] = level["reruns_per_s"] / base
+        print(
+            f"    {level['workers']:>7} {level['reruns_per_s']:>7.1f} "
+            f"{level['speedup']:>5.2f}x {level['p50_ms']:>6.0f} ms "
+            f"{level['p95_ms']:>6.0f} ms {level['cpu_cores']:>6.2f} "
+            f"{level['error_count']:>6}"
+        )
+
+    failed = [level for level in levels if level["error_count"]]
+    if failed:
+        print(f"\n❌ Erros nas páginas: {failed[0]['errors'][0]}")
+        sys.exit(1)
+    if args.min_speedup is not None and levels[-1]["speedup"] < args.min_speedup:
+        print(
+            f"\n❌ {levels[-1]['workers']} workers: ganho de "
+            f"{levels[-1]['speedup']:.2f}x, abaixo de {args.min_speedup:.2f}x"
+        )
+        sys.exit(1)
+    print("\n✅ Reruns sem erros com todos os números de workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import streamlit as st
+from pages.utils.data_loader import get_snapshot
+from pages.utils.lazy_imports import plotly_express
+from pages.utils.memory import (
+    MEMORY_INTERVAL,
+    SESSION_IDLE_TTL,
+    allocation_report,
+    collect_garbage,
+    evict_idle_sessions,
+    history,
+    process_inventory,
+    rss_bytes,
+    sample,
+    session_inventory,
+    shared_memory,
+    stale_generations,
+)
+from pages.utils.result_cache import RESULT_CACHE_MAX_MB
+from pages.utils.result_cache import stats as result_cache_stats
+from pages.utils.timing import debug_panel, start_rerun
+
+MB = 1024**2
+
+# ==========================================================
+# CONFIGURAÇÃO
+# ==========================================================
+start_rerun(__file__)
+
+st.title("🧠 Memória do Servidor")
+st.caption(
+    f"Amostras a cada {MEMORY_INTERVAL:g} s · downloads de sessões sem rerun há "
+    f"mais de {SESSION_IDLE_TTL / 60:g} min são liberados"
+)
+
+snapshot = get_snapshot()
+
+# ==========================================================
+# AÇÕES
+# ==========================================================
+col_sample, col_evict = st.columns(2)
+if col_sample.button("🔄 Amostrar agora"):
+    freed = collect_garbage()
+    sample()
+    if freed is not None:
+        st.toast(f"Coletor de lixo devolveu {freed / MB:,.1f} MB")
+if col_evict.button("🧹 Liberar sessões ociosas agora"):
+    evicted = evict_idle_sessions()
+    st.toast(f"{len(evicted)} sessões liberadas")
+if history().empty:
+    sample()
+
+# ==========================================================
+# MÉTRICAS
+# ==========================================================
+inventory = process_inventory()
+sessions = session_inventory()
+stale = stale_generations(snapshot["generation"])
+rss = rss_bytes()
+proportional = shared_memory()
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric(
+    "RSS do processo",
+    "—" if rss is None else f"{rss / MB:,.0f} MB",
+    help=None
+    if proportional is None
+    else (
+        f"PSS {proportional['pss'] / MB:,.0f} MB · compartilhado com outros "
+        f"processos {proportional['shared'] / MB:,.0f} MB"
+    ),
+)
+col2.metric("Caches do processo", f"{inventory['bytes'].sum() / MB:,.1f} MB")
+col3.metric("Sessões ativas", len(sessions))
+col4.metric(
+    "Gerações antigas vivas",
+    len(stale),
+    delta="possível vazamento" if stale else None,
+    delta_color="inverse",
+)
+
+# ==========================================================
+# INVENTÁRIO
+# ==========================================================
+st.subheader("📦 Objetos em cache no processo")
+st.dataframe(
+    inventory.assign(MB=inventory["bytes"] / MB).drop(columns="bytes"),
+    hide_index=True,
+    use_container_width=True,
+    column_config={"MB": st.column_config.NumberColumn(format="%.2f")},
+)
+st.caption(
+    "Tamanho profundo; o que é compartilhado (o DataFrame dentro do backend "
+    "pandas, por exemplo) é contado só na primeira linha em que aparece."
+)
+
+st.subheader("👥 Sessões")
+st.dataframe(
+    sessions.assign(
+        session_state=sessions["session_state"] / MB,
+        downloads=sessions["downloads"] / MB,
+    ).rename(
+        columns={
+            "session_state": "session_state (MB)",
+            "downloads": "downloads (MB)",
+        }
+    ),
+    hide_index=True,
+    use_container_width=True,
+)
+
+st.subheader("💾 Cache de resultados em disco")
+results = result_cache_stats()
+st.dataframe(
+    results.assign(MB=results["bytes"] / MB).drop(columns="bytes"),
+    hide_index=True,
+    use_container_width=True,
+    column_config={"MB": st.column_config.NumberColumn(format="%.2f")},
+)
+st.caption(
+    f"Compartilhado entre os workers, fora da memória do processo; limite de "
+    f"{RESULT_CACHE_MAX_MB:,.0f} MB."
+)
+
+# ==========================================================
+# HISTÓRICO
+# ==========================================================
+st.subheader("📈 Histórico")
+samples = history()
+px = plotly_express()
+fig = px.line(
+    samples.assign(
+        RSS=samples["rss"] / MB,
+        Caches=samples["caches"] / MB,
+        Downloads=samples["downloads"] / MB,
+    ),
+    x="time",
+    y=["RSS", "Caches", "Downloads"],
+    markers=True,
+    labels={"time": "Horário", "value": "MB", "variable": ""},
+)
+st.plotly_chart(fig, use_container_width=True)
+
+# ==========================================================
+# ALOCAÇÕES (TRACEMALLOC)
+# ==========================================================
+st.subheader("🔎 Maiores crescimentos de alocação")
+since_previous, since_start = allocation_report()
+if since_previous.empty and since_start.empty:
+    st.info(
+        "Inicie o servidor com `MEMORY_TRACE=1` para comparar snapshots do "
+        "`tracemalloc` (são precisas ao menos duas amostras)."
+    )
+else:
+    tab_previous, tab_start = st.tabs(["Desde a amostra anterior", "Desde o início"])
+    for tab, report in ((tab_previous, since_previous), (tab_start, since_start)):
+        tab.dataframe(
+            report.assign(
+                crescimento=report["crescimento"] / MB, total=report["total"] / MB
+            ).rename(
+                columns={"crescimento": "crescimento (MB)", "total": "total (MB)"}
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+# ==========================================================
+# DIAGNÓSTICO (TIMING=1)
+# ==========================================================
+debug_panel()
@@ -1,39 +1,39 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from pages.utils.data_loader import get_data
+from pages.utils.charts import funnel_chart, topic_retention_chart
+from pages.utils.lazy_imports import plotly_express
+from pages.utils.query import RATES, Filters, get_backend
+from pages.utils.summaries import cached_aggregate
+from pages.utils.timing import debug_panel, start_rerun
 
 # ==========================================================
 # CONFIGURAÇÃO
 # ==========================================================
+start_rerun(__file__)
+
 st.set_page_config(page_title="Análise de Agosto", page_icon="📅")
 st.title("📅 Análise de Agosto — Desempenho dos Chatbots Stone e Ton")
 
-df = get_data()
-df["date"] = pd.to_datetime(df["date"], errors="coerce")
+backend = get_backend()
 
 # ==========================================================
 # FILTRAR APENAS AGOSTO/2025
 # ==========================================================
-df_august = df[(df["date"].dt.month == 8) & (df["date"].dt.year == 2025)]
+august = Filters(start_date="2025-08-01", end_date="2025-08-31")
+
+df_daily = cached_aggregate(
+    backend, august, by=["date"], rates=["retention_rate", "human_request_rate"]
+)
 
-if df_august.empty:
+if df_daily.empty:
     st.info("⚠️ Nenhum dado disponível para agosto de 2025.")
     st.stop()
 
 # ==========================================================
 # AGREGAR MÉTRICAS PRINCIPAIS
 # ==========================================================
-agg = pd.DataFrame(
-    {
-        "sessions_total": [df_august["sessions_total"].sum()],
-        "session_retained": [df_august["session_retained"].sum()],
-        "sessions_human_assistance": [df_august["sessions_human_assistance"].sum()],
-    }
+agg = cached_aggregate(
+    backend, august, rates=["retention_rate", "human_request_rate"]
 )
-
-agg["retention_rate"] = agg["session_retained"] / agg["sessions_total"]
-agg["human_request_rate"] = agg["sessions_human_assistance"] / agg["sessions_total"]
 agg["loss_rate"] = 1 - agg["retention_rate"]
 
 total_sessions = int(agg["sessions_total"].iloc[0])
@@ -80,16 +80,7 @@ st.divider()
 # ==========================================================
 st.markdown("### 📈 Evolução Diária de Sessões e Retenção")
 
-df_daily = df_august.groupby("date", as_index=False).agg(
-    sessions_total=("sessions_total", "sum"),
-    session_retained=("session_retained", "sum"),
-    sessions_human_assistance=("sessions_human_assistance", "sum"),
-)
-
-df_daily["retention_rate"] = df_daily["session_retained"] / df_daily["sessions_total"]
-df_daily["human_request_rate"] = (
-    df_daily["sessions_human_assistance"] / df_daily["sessions_total"]
-)
+px = plotly_express()
 
 # --- Gráfico 1: Volume ---
 fig_daily_volume = px.line(
@@ -135,40 +126,18 @@ st.info(
 st.markdown("## 🔍 2. Análise por Tópicos (Topics Analysis)")
 
 df_topics = (
-    df_august.groupby("topic", as_index=False)
-    .agg(
-        sessions_total=("sessions_total", "sum"),
-        session_retained=("session_retained", "sum"),
-        sessions_human_assistance=("sessions_human_assistance", "sum"),
+    cached_aggregate(
+        backend, august, by=["topic"], rates=["retention_rate", "human_request_rate"]
     )
     .sort_values("sessions_total", ascending=False)
     .head(10)
 )
-
-df_topics["retention_rate"] = (
-    df_topics["session_retained"] / df_topics["sessions_total"]
-)
-df_topics["human_request_rate"] = (
-    df_topics["sessions_human_assistance"] / df_topics["sessions_total"]
-)
 df_topics["efficiency"] = df_topics["retention_rate"] - df_topics["human_request_rate"]
 
 min_ret_topic = df_topics.loc[df_topics["retention_rate"].idxmin()]
 max_ret_topic = df_topics.loc[df_topics["retention_rate"].idxmax()]
 
-df_topics_sorted = df_topics.sort_values("retention_rate", ascending=False)
-
-fig_topics = px.bar(
-    df_topics_sorted,
-    x="retention_rate",
-    y="topic",
-    orientation="h",
-    color="retention_rate",
-    color_continuous_scale="RdYlGn",
-    title="Taxa de Retenção por Tópico — Top 10 de Volume",
-    labels={"retention_rate": "Taxa de Retenção", "topic": "Tópico"},
-)
-fig_topics.update_layout(yaxis_categoryorder="total ascending")
+fig_topics = topic_retention_chart(df_topics)
 st.plotly_chart(fig_topics, use_container_width=True)
 
 st.info(
@@ -184,21 +153,7 @@ st.markdown("## 🧠 3. Comparativo entre Bots, Tecnologias e Canais — Agosto"
 
 
 def aggregate_by(column):
-    df_grouped = df_august.groupby(column, as_index=False).agg(
-        sessions_total=("sessions_total", "sum"),
-        session_retained=("session_retained", "sum"),
-        sessions_human_assistance=("sessions_human_assistance", "sum"),
-    )
-    df_grouped["retention_rate"] = (
-        df_grouped["session_retained"] / df_grouped["sessions_total"]
-    )
-    df_grouped["human_request_rate"] = (
-        df_grouped["sessions_human_assistance"] / df_grouped["sessions_total"]
-    )
-    df_grouped["efficiency_score"] = (
-        df_grouped["retention_rate"] - df_grouped["human_request_rate"]
-    )
-    return df_grouped
+    return cached_aggregate(backend, august, by=[column], rates=RATES)
 
 
 df_bot = aggregate_by("bot")
@@ -275,21 +230,10 @@ Essas diferenças indicam **maturidade desigual** entre bots, tecnologias e cana
 # ==========================================================
 st.markdown("## 🔻 4. Funil de Atendimento (Funnel Analysis)")
 
-funnel = {
-    "Sessões Totais": df_august["sessions_total"].sum(),
-    "Sessões Retidas": df_august["session_retained"].sum(),
-    "Sessões Não Resolvidas": df_august["sessions_total"].sum()
-    - df_august["session_retained"].sum(),
-}
-funnel_df = pd.DataFrame(list(funnel.items()), columns=["Etapa", "Quantidade"])
-funnel_df["Percentual"] = funnel_df["Quantidade"] / funnel_df.loc[0, "Quantidade"]
-
-fig_funnel = px.funnel(
-    funnel_df,
-    y="Etapa",
-    x="Quantidade",
-    color="Etapa",
-    color_discrete_sequence=["#1f77b4", "#2ca02c", "#d62728"],
+fig_funnel = funnel_chart(
+    agg["sessions_total"].iloc[0],
+    agg["session_retained"].iloc[0],
+    agg["sessions_total"].iloc[0] - agg["session_retained"].iloc[0],
     title="Funil de Atendimento — Totais → Retidas → Não Resolvidas",
 )
 st.plotly_chart(fig_funnel, use_container_width=True)
@@ -320,3 +264,8 @@ O mês de agosto consolidou o avanço dos canais automatizados, mas também reve
 Para os próximos ciclos, recomenda-se **aprofundar a análise dos tópicos de menor retenção**, **revisar a performance do Bot Ton e da Tech A**, e **avaliar o papel estratégico do Chat C** — garantindo maior equilíbrio na eficiência geral e melhor experiência para o usuário.
 """
 )
+
+# ==========================================================
+# DIAGNÓSTICO (TIMING=1)
+# ==========================================================
+debug_panel()
@@ -1,10 +1,10 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-from statsmodels.tsa.deterministic import CalendarFourier, DeterministicProcess
-from pages.utils.data_loader import get_data
+from pages.utils.charts import projection_chart
+from pages.utils.data_loader import get_snapshot
+from pages.utils.forecast import daily_series, get_projection
+from pages.utils.timing import debug_panel, start_rerun
 import warnings
 
 warnings.filterwarnings("ignore")
@@ -12,109 +12,27 @@ warnings.filterwarnings("ignore")
 # ==========================================================
 # CONFIGURAÇÃO
 # ==========================================================
+start_rerun(__file__)
+
 st.set_page_config(page_title="Projeção 2025", page_icon="📈")
 st.title("📈 Projeção de Desempenho — até Dezembro de 2025 (SARIMAX + Fourier)")
 
 # ==========================================================
 # CARREGAMENTO E PREPARO DOS DADOS
 # ==========================================================
-df = get_data()
-df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-df_daily = (
-    df.groupby("date", as_index=False)
-    .agg(
-        sessions_total=("sessions_total", "sum"),
-        session_retained=("session_retained", "sum"),
-    )
-    .sort_values("date")
-    .reset_index(drop=True)
-)
-df_daily["retention_rate"] = (
-    df_daily["session_retained"] / df_daily["sessions_total"]
-).fillna(0)
-df_daily["loss_rate"] = 1 - df_daily["retention_rate"]
-df_daily = df_daily.set_index("date")
-
-
-# ==========================================================
-# FUNÇÃO DE MODELAGEM — SARIMAX + COMPONENTES FOURIER
-# ==========================================================
-def forecast_with_fourier(series, steps):
-    """
-    Ajusta SARIMAX com componentes Fourier para sazonalidade anual (~365 dias)
-    e semanal (~7 dias).
-    Retorna a média prevista e intervalo de confiança.
-    """
-    series = series.asfreq("D")
-
-    fourier = CalendarFourier(freq="A", order=6)
-
-    dp = DeterministicProcess(
-        index=series.index,
-        constant=True,
-        order=1,
-        seasonal=True,
-        additional_terms=[fourier],
-        drop=True,
-    )
-
-    X = dp.in_sample()
-    X_fore = dp.out_of_sample(steps=steps)
-
-    model = SARIMAX(
-        series,
-        exog=X,
-        order=(1, 1, 1),
-        seasonal_order=(1, 1, 1, 7),
-        enforce_stationarity=False,
-        enforce_invertibility=False,
-    )
-
-    results = model.fit(disp=False)
-    forecast = results.get_forecast(steps=steps, exog=X_fore)
-    mean_forecast = forecast.predicted_mean
-    conf_int = forecast.conf_int()
-    return mean_forecast, conf_int
-
+snapshot = get_snapshot()
+df_daily = daily_series(snapshot["daily"])
 
 # ==========================================================
 # MODELAGEM E PROJEÇÃO
 # ==========================================================
+# reaproveita a projeção calculada no prewarm quando a base não mudou
 last_date = df_daily.index.max()
-future_dates = pd.date_range(
-    start=last_date + pd.Timedelta(days=1), end="2025-12-31", freq="D"
-)
-n_steps = len(future_dates)
-
-sess_forecast, sess_conf = forecast_with_fourier(df_daily["sessions_total"], n_steps)
-ret_forecast, ret_conf = forecast_with_fourier(df_daily["retention_rate"], n_steps)
-loss_forecast, loss_conf = forecast_with_fourier(df_daily["loss_rate"], n_steps)
-
-sess_forecast = np.clip(sess_forecast, 0, None)
-ret_forecast = np.clip(ret_forecast, 0, 1)
-loss_forecast = np.clip(loss_forecast, 0, 1)
-
-df_future = pd.DataFrame(
-    {
-        "date": future_dates,
-        "sessions_total": sess_forecast,
-        "retention_rate": ret_forecast,
-        "loss_rate": loss_forecast,
-        "sess_lower": sess_conf.iloc[:, 0].values,
-        "sess_upper": sess_conf.iloc[:, 1].values,
-        "ret_lower": ret_conf.iloc[:, 0].values,
-        "ret_upper": ret_conf.iloc[:, 1].values,
-        "loss_lower": loss_conf.iloc[:, 0].values,
-        "loss_upper": loss_conf.iloc[:, 1].values,
-    }
-).set_index("date")
+df_future = get_projection(df_daily, snapshot["generation"])
 
 df_proj = pd.concat([df_daily, df_future])
 df_proj["type"] = np.where(df_proj.index <= last_date, "Histórico", "Projeção")
 
-vline_date = last_date
-
 # ==========================================================
 # DESCRIÇÃO DOS MODELOS
 # ==========================================================
@@ -158,61 +76,12 @@ col3.metric(
 # ==========================================================
 st.markdown("### 🔁 Taxa de Retenção — Histórico e Projeção (SARIMAX + Fourier)")
 
-fig_ret = go.Figure()
-fig_ret.add_trace(
-    go.Scatter(
-        x=df_daily.index,
-        y=df_daily["retention_rate"],
-        mode="lines",
-        name="Histórico",
-        line=dict(color="#2ca02c"),
-    )
-)
-fig_ret.add_trace(
-    go.Scatter(
-        x=df_future.index,
-        y=df_future["retention_rate"],
-        mode="lines",
-        name="Projeção",
-        line=dict(color="#ff7f0e", dash="dot"),
-    )
-)
-fig_ret.add_trace(
-    go.Scatter(
-        x=list(df_future.index) + list(df_future.index[::-1]),
-        y=list(df_future["ret_upper"]) + list(df_future["ret_lower"][::-1]),
-        fill="toself",
-        fillcolor="rgba(255,127,14,0.15)",
-        line=dict(color="rgba(255,255,255,0)"),
-        hoverinfo="skip",
-        showlegend=False,
-    )
-)
-fig_ret.add_shape(
-    type="line",
-    x0=vline_date,
-    x1=vline_date,
-    y0=0,
-    y1=1,
-    xref="x",
-    yref="paper",
-    line=dict(color="gray", dash="dot"),
-)
-fig_ret.add_annotation(
-    x=vline_date,
-    y=1,
-    xref="x",
-    yref="paper",
-    text="Início da Projeção",
-    showarrow=False,
-    yshift=10,
-    font=dict(color="gray", size=12),
-)
-fig_ret.update_layout(
+fig_ret = projection_chart(
+    df_daily,
+    df_future,
+    "retention_rate",
     title="Taxa de Retenção — Histórico e Projeção Diária (SARIMAX + Fourier)",
-    yaxis_tickformat=".0%",
     yaxis_title="Taxa de Retenção",
-    xaxis_title="Data",
 )
 st.plotly_chart(fig_ret, use_container_width=True)
 
@@ -221,61 +90,12 @@ st.plotly_chart(fig_ret, use_container_width=True)
 # ==========================================================
 st.markdown("### ⚠️ Sessões Não Resolvidas — Histórico e Projeção (SARIMAX + Fourier)")
 
-fig_loss = go.Figure()
-fig_loss.add_trace(
-    go.Scatter(
-        x=df_daily.index,
-        y=df_daily["loss_rate"],
-        mode="lines",
-        name="Histórico",
-        line=dict(color="#d62728"),
-    )
-)
-fig_loss.add_trace(
-    go.Scatter(
-        x=df_future.index,
-        y=df_future["loss_rate"],
-        mode="lines",
-        name="Projeção",
-        line=dict(color="#ffa07a", dash="dot"),
-    )
-)
-fig_loss.add_trace(
-    go.Scatter(
-        x=list(df_future.index) + list(df_future.index[::-1]),
-        y=list(df_future["loss_upper"]) + list(df_future["loss_lower"][::-1]),
-        fill="toself",
-        fillcolor="rgba(255,127,14,0.15)",
-        line=dict(color="rgba(255,255,255,0)"),
-        hoverinfo="skip",
-        showlegend=False,
-    )
-)
-fig_loss.add_shape(
-    type="line",
-    x0=vline_date,
-    x1=vline_date,
-    y0=0,
-    y1=1,
-    xref="x",
-    yref="paper",
-    line=dict(color="gray", dash="dot"),
-)
-fig_loss.add_annotation(
-    x=vline_date,
-    y=1,
-    xref="x",
-    yref="paper",
-    text="Início da Projeção",
-    showarrow=False,
-    yshift=10,
-    font=dict(color="gray", size=12),
-)
-fig_loss.update_layout(
+fig_loss = projection_chart(
+    df_daily,
+    df_future,
+    "loss_rate",
     title="Taxa de Sessões Não Resolvidas — Histórico e Projeção Diária (SARIMAX + Fourier)",
-    yaxis_tickformat=".0%",
     yaxis_title="Taxa de Perda (Loss)",
-    xaxis_title="Data",
 )
 st.plotly_chart(fig_loss, use_container_width=True)
 
@@ -284,60 +104,12 @@ st.plotly_chart(fig_loss, use_container_width=True)
 # ==========================================================
 st.markdown("### 📈 Volume Diário — Histórico e Projeção (SARIMAX + Fourier)")
 
-fig_sessions = go.Figure()
-fig_sessions.add_trace(
-    go.Scatter(
-        x=df_daily.index,
-        y=df_daily["sessions_total"],
-        mode="lines",
-        name="Histórico",
-        line=dict(color="#1f77b4"),
-    )
-)
-fig_sessions.add_trace(
-    go.Scatter(
-        x=df_future.index,
-        y=df_future["sessions_total"],
-        mode="lines",
-        name="Projeção",
-        line=dict(color="#ff7f0e", dash="dot"),
-    )
-)
-fig_sessions.add_trace(
-    go.Scatter(
-        x=list(df_future.index) + list(df_future.index[::-1]),
-        y=list(df_future["sess_upper"]) + list(df_future["sess_lower"][::-1]),
-        fill="toself",
-        fillcolor="rgba(255,127,14,0.15)",
-        line=dict(color="rgba(255,255,255,0)"),
-        hoverinfo="skip",
-        showlegend=False,
-    )
-)
-fig_sessions.add_shape(
-    type="line",
-    x0=vline_date,
-    x1=vline_date,
-    y0=0,
-    y1=1,
-    xref="x",
-    yref="paper",
-    line=dict(color="gray", dash="dot"),
-)
-fig_sessions.add_annotation(
-    x=vline_date,
-    y=1,
-    xref="x",
-    yref="paper",
-    text="Início da Projeção",
-    showarrow=False,
-    yshift=10,
-    font=dict(color="gray", size=12),
-)
-fig_sessions.update_layout(
+fig_sessions = projection_chart(
+    df_daily,
+    df_future,
+    "sessions_total",
     title="Volume Diário de Sessões — Histórico vs Projeção (SARIMAX + Fourier)",
     yaxis_title="Sessões Totais",
-    xaxis_title="Data",
 )
 st.plotly_chart(fig_sessions, use_container_width=True)
 
@@ -376,3 +148,8 @@ O uso combinado de **SARIMAX + Fourier** agora foi aplicado de forma completa à
 O resultado são projeções mais realistas, coerentes e alinhadas com o comportamento histórico do chatbot.
 """
 )
+
+# ==========================================================
+# DIAGNÓSTICO (TIMING=1)
+# ==========================================================
+debug_panel()
@@ -1,70 +1,27 @@
 import streamlit as st
-import pandas as pd
 from pages.utils.charts import daily_sessions_chart, retention_rate_chart
-from pages.utils.data_loader import get_data
+from pages.utils.export import export_panel
+from pages.utils.filters import sidebar_filters
+from pages.utils.query import get_backend
+from pages.utils.summaries import cached_aggregate
+from pages.utils.timing import debug_panel, fragment, start_rerun
+
+start_rerun(__file__)
 
 st.title("📊 Visão Geral")
 
-df = get_data()  # garante que o dataframe está disponível
+backend = get_backend()  # garante que a base está disponível
 
 # ==========================================================
 # FILTROS
 # ==========================================================
-st.sidebar.header("Filtros")
-
-min_date = df["date"].min()
-max_date = df["date"].max()
-
-# --- Filtro de Data com tratamento seguro ---
-date_selection = st.sidebar.date_input(
-    "Selecione o intervalo",
-    value=(min_date, max_date),
-    min_value=min_date,
-    max_value=max_date,
-)
-
-# Corrige o caso em que o usuário seleciona apenas uma data
-if isinstance(date_selection, tuple) and len(date_selection) == 2:
-    start_date, end_date = date_selection
-else:
-    start_date = end_date = date_selection
-
-# --- Outros filtros ---
-bots = st.sidebar.multiselect("Bot", sorted(df["bot"].dropna().unique()))
-techs = st.sidebar.multiselect("Tech", sorted(df["tech"].dropna().unique()))
-fonts = st.sidebar.multiselect("Fonte", sorted(df["font"].dropna().unique()))
-
-# --- Toggle para média móvel ---
-enable_smoothing = st.sidebar.toggle("📈 Média móvel 7 dias", value=False)
-
-# ==========================================================
-# APLICAR FILTROS
-# ==========================================================
-df_filtered = df.copy()
-
-if bots:
-    df_filtered = df_filtered[df_filtered["bot"].isin(bots)]
-if techs:
-    df_filtered = df_filtered[df_filtered["tech"].isin(techs)]
-if fonts:
-    df_filtered = df_filtered[df_filtered["font"].isin(fonts)]
-
-df_filtered = df_filtered[
-    (df_filtered["date"] >= pd.to_datetime(start_date))
-    & (df_filtered["date"] <= pd.to_datetime(end_date))
-]
+filters = sidebar_filters(backend.indexes())
 
 # ==========================================================
 # AGREGAÇÃO E MÉTRICAS
 # ==========================================================
-df_daily = df_filtered.groupby("date", as_index=False).agg(
-    sessions_total=("sessions_total", "sum"),
-    session_retained=("session_retained", "sum"),
-    sessions_human_assistance=("sessions_human_assistance", "sum"),
-)
-df_daily["retention_rate"] = df_daily["session_retained"] / df_daily["sessions_total"]
-df_daily["human_request_rate"] = (
-    df_daily["sessions_human_assistance"] / df_daily["sessions_total"]
+df_daily = cached_aggregate(
+    backend, filters, by=["date"], rates=["retention_rate", "human_request_rate"]
 )
 
 # ==========================================================
@@ -79,12 +36,30 @@ col3.metric(
     "Taxa de Pedido Humano Média", f"{df_daily['human_request_rate'].mean():.1%}"
 )
 
+
 # ==========================================================
 # GRÁFICOS
 # ==========================================================
-st.plotly_chart(
-    daily_sessions_chart(df_daily, enable_smoothing), use_container_width=True
-)
-st.plotly_chart(
-    retention_rate_chart(df_daily, enable_smoothing), use_container_width=True
-)
+# a média móvel só redesenha os gráficos (rerun parcial, sem nova consulta)
+@fragment
+def daily_charts(df_daily):
+    enable_smoothing = st.toggle("📈 Média móvel 7 dias", value=False)
+    st.plotly_chart(
+        daily_sessions_chart(df_daily, enable_smoothing), use_container_width=True
+    )
+    st.plotly_chart(
+        retention_rate_chart(df_daily, enable_smoothing), use_container_width=True
+    )
+
+
+daily_charts(df_daily)
+
+# ==========================================================
+# EXPORTAÇÃO
+# ==========================================================
+export_panel(backend, filters, tables={"Série diária": df_daily}, name="visao_geral")
+
+# ==========================================================
+# DIAGNÓSTICO (TIMING=1)
+# ==========================================================
+debug_panel()
@@ -1,78 +1,40 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from pages.utils.data_loader import get_data
+from pages.utils.export import export_panel
+from pages.utils.filters import sidebar_filters
+from pages.utils.lazy_imports import plotly_express
+from pages.utils.query import get_backend
+from pages.utils.summaries import cached_aggregate, topic_summary
+from pages.utils.timing import debug_panel, fragment, start_rerun
 
 # ==========================================================
 # CONFIGURAÇÃO
 # ==========================================================
+start_rerun(__file__)
+
 st.title("🎯 Análise por Tópico e Assunto")
 
-df = get_data()
+backend = get_backend()
 
 # ==========================================================
 # FILTROS
 # ==========================================================
-st.sidebar.header("Filtros")
-
-min_date = df["date"].min()
-max_date = df["date"].max()
-
-# --- Filtro de Data com fallback seguro ---
-date_selection = st.sidebar.date_input(
-    "Selecione o intervalo",
-    value=(min_date, max_date),
-    min_value=min_date,
-    max_value=max_date,
+filters = sidebar_filters(
+    backend.indexes(), dimensions=("bot", "tech", "font", "topic")
 )
-if isinstance(date_selection, tuple) and len(date_selection) == 2:
-    start_date, end_date = date_selection
-else:
-    start_date = end_date = date_selection
-
-bots = st.sidebar.multiselect("Bot", sorted(df["bot"].dropna().unique()))
-techs = st.sidebar.multiselect("Tech", sorted(df["tech"].dropna().unique()))
-fonts = st.sidebar.multiselect("Fonte", sorted(df["font"].dropna().unique()))
-topics = st.sidebar.multiselect("Tópico", sorted(df["topic"].dropna().unique()))
-enable_smoothing = st.sidebar.toggle("📈 Média móvel 7 dias", value=False)
-
-# ==========================================================
-# APLICAR FILTROS
-# ==========================================================
-df_filtered = df.copy()
-
-if bots:
-    df_filtered = df_filtered[df_filtered["bot"].isin(bots)]
-if techs:
-    df_filtered = df_filtered[df_filtered["tech"].isin(techs)]
-if fonts:
-    df_filtered = df_filtered[df_filtered["font"].isin(fonts)]
-if topics:
-    df_filtered = df_filtered[df_filtered["topic"].isin(topics)]
-
-df_filtered = df_filtered[
-    (df_filtered["date"] >= pd.to_datetime(start_date))
-    & (df_filtered["date"] <= pd.to_datetime(end_date))
-]
+topics = filters.topic
 
 # ==========================================================
 # AGREGAÇÃO E CÁLCULOS
 # ==========================================================
-df_topic = df_filtered.groupby("topic", as_index=False).agg(
-    sessions_total=("sessions_total", "sum"),
-    session_retained=("session_retained", "sum"),
-    sessions_human_assistance=("sessions_human_assistance", "sum"),
-)
-df_topic["retention_rate"] = df_topic["session_retained"] / df_topic["sessions_total"]
-df_topic["human_request_rate"] = (
-    df_topic["sessions_human_assistance"] / df_topic["sessions_total"]
-)
+df_topic = topic_summary(backend, filters)
 
 # ==========================================================
 # GRÁFICOS
 # ==========================================================
 st.subheader("📊 Volume e Eficiência por Tópico")
 
+px = plotly_express()
+
 # Top 10 tópicos com maior volume
 top_topics = df_topic.sort_values("sessions_total", ascending=False).head(10)
 
@@ -108,20 +70,20 @@ with col2:
 # ==========================================================
 # EVOLUÇÃO TEMPORAL POR TÓPICO (opcional)
 # ==========================================================
-if topics:
-    st.subheader("📈 Evolução Temporal dos Tópicos Selecionados")
-    df_time = (
-        df_filtered.groupby(["date", "topic"], as_index=False)
-        .agg(sessions_total=("sessions_total", "sum"))
-        .sort_values("date")
-    )
+# a média móvel só redesenha o gráfico (rerun parcial, sem nova consulta)
+@fragment
+def time_chart(df_time):
+    enable_smoothing = st.toggle("📈 Média móvel 7 dias", value=False)
+    df_plot = df_time
     if enable_smoothing:
-        df_time["sessions_total"] = df_time.groupby("topic")[
-            "sessions_total"
-        ].transform(lambda x: x.rolling(7, min_periods=1).mean())
+        df_plot = df_time.assign(
+            sessions_total=df_time.groupby("topic")["sessions_total"].transform(
+                lambda x: x.rolling(7, min_periods=1).mean()
+            )
+        )
 
     fig_time = px.line(
-        df_time,
+        df_plot,
         x="date",
         y="sessions_total",
         color="topic",
@@ -131,6 +93,14 @@ if topics:
     )
     st.plotly_chart(fig_time, use_container_width=True)
 
+
+if topics:
+    st.subheader("📈 Evolução Temporal dos Tópicos Selecionados")
+    df_time = cached_aggregate(
+        backend, filters, by=["date", "topic"], measures=["sessions_total"]
+    )
+    time_chart(df_time)
+
 # ==========================================================
 # TABELA DE RESUMO
 # ==========================================================
@@ -146,3 +116,16 @@ st.dataframe(
     ),
     use_container_width=True,
 )
+
+# ==========================================================
+# EXPORTAÇÃO
+# ==========================================================
+tables = {"Resumo de tópicos": df_topic}
+if topics:
+    tables["Série diária por tópico"] = df_time
+export_panel(backend, filters, tables=tables, name="topicos")
+
+# ==========================================================
+# DIAGNÓSTICO (TIMING=1)
+# ==========================================================
+debug_panel()
@@ -1,86 +1,40 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from pages.utils.data_loader import get_data
+from pages.utils.export import export_panel
+from pages.utils.filters import sidebar_filters
+from pages.utils.lazy_imports import plotly_express
+from pages.utils.query import get_backend
+from pages.utils.summaries import cached_aggregate, subject_summary
+from pages.utils.timing import debug_panel, fragment, start_rerun
 
 # ==========================================================
 # CONFIGURAÇÃO
 # ==========================================================
+start_rerun(__file__)
+
 st.title("🧩 Análise por Assunto")
 
-df = get_data()
+backend = get_backend()
 
 # ==========================================================
 # FILTROS
 # ==========================================================
-st.sidebar.header("Filtros")
-
-min_date = df["date"].min()
-max_date = df["date"].max()
-
-# --- Filtro de Data com fallback seguro ---
-date_selection = st.sidebar.date_input(
-    "Selecione o intervalo",
-    value=(min_date, max_date),
-    min_value=min_date,
-    max_value=max_date,
+filters = sidebar_filters(
+    backend.indexes(), dimensions=("bot", "tech", "font", "topic", "subject")
 )
-if isinstance(date_selection, tuple) and len(date_selection) == 2:
-    start_date, end_date = date_selection
-else:
-    start_date = end_date = date_selection
-
-bots = st.sidebar.multiselect("Bot", sorted(df["bot"].dropna().unique()))
-techs = st.sidebar.multiselect("Tech", sorted(df["tech"].dropna().unique()))
-fonts = st.sidebar.multiselect("Fonte", sorted(df["font"].dropna().unique()))
-topics = st.sidebar.multiselect("Tópico", sorted(df["topic"].dropna().unique()))
-subjects = st.sidebar.multiselect("Assunto", sorted(df["subject"].dropna().unique()))
-enable_smoothing = st.sidebar.toggle("📈 Média móvel 7 dias", value=False)
-
-# ==========================================================
-# APLICAR FILTROS
-# ==========================================================
-df_filtered = df.copy()
-
-if bots:
-    df_filtered = df_filtered[df_filtered["bot"].isin(bots)]
-if techs:
-    df_filtered = df_filtered[df_filtered["tech"].isin(techs)]
-if fonts:
-    df_filtered = df_filtered[df_filtered["font"].isin(fonts)]
-if topics:
-    df_filtered = df_filtered[df_filtered["topic"].isin(topics)]
-if subjects:
-    df_filtered = df_filtered[df_filtered["subject"].isin(subjects)]
-
-df_filtered = df_filtered[
-    (df_filtered["date"] >= pd.to_datetime(start_date))
-    & (df_filtered["date"] <= pd.to_datetime(end_date))
-]
+subjects = filters.subject
 
 # ==========================================================
 # AGREGAÇÃO E CÁLCULOS
 # ==========================================================
-df_subject = df_filtered.groupby(["topic", "subject"], as_index=False).agg(
-    sessions_total=("sessions_total", "sum"),
-    session_retained=("session_retained", "sum"),
-    sessions_human_assistance=("sessions_human_assistance", "sum"),
-)
-df_subject["retention_rate"] = (
-    df_subject["session_retained"] / df_subject["sessions_total"]
-)
-df_subject["human_request_rate"] = (
-    df_subject["sessions_human_assistance"] / df_subject["sessions_total"]
-)
-df_subject["efficiency_score"] = (
-    df_subject["retention_rate"] - df_subject["human_request_rate"]
-)
+df_subject = subject_summary(backend, filters)
 
 # ==========================================================
 # GRÁFICOS
 # ==========================================================
 st.subheader("📊 Volume e Eficiência por Assunto")
 
+px = plotly_express()
+
 # Top 10 assuntos com maior volume
 top_subjects = df_subject.sort_values("sessions_total", ascending=False).head(10)
 
@@ -115,20 +69,20 @@ with col2:
 # ==========================================================
 # EVOLUÇÃO TEMPORAL POR ASSUNTO (opcional)
 # ==========================================================
-if subjects:
-    st.subheader("📈 Evolução Temporal dos Assuntos Selecionados")
-    df_time = (
-        df_filtered.groupby(["date", "subject"], as_index=False)
-        .agg(sessions_total=("sessions_total", "sum"))
-        .sort_values("date")
-    )
+# a média móvel só redesenha o gráfico (rerun parcial, sem nova consulta)
+@fragment
+def time_chart(df_time):
+    enable_smoothing = st.toggle("📈 Média móvel 7 dias", value=False)
+    df_plot = df_time
     if enable_smoothing:
-        df_time["sessions_total"] = df_time.groupby("subject")[
-            "sessions_total"
-        ].transform(lambda x: x.rolling(7, min_periods=1).mean())
+        df_plot = df_time.assign(
+            sessions_total=df_time.groupby("subject")["sessions_total"].transform(
+                lambda x: x.rolling(7, min_periods=1).mean()
+            )
+        )
 
     fig_time = px.line(
-        df_time,
+        df_plot,
         x="date",
         y="sessions_total",
         color="subject",
@@ -138,6 +92,14 @@ if subjects:
     )
     st.plotly_chart(fig_time, use_container_width=True)
 
+
+if subjects:
+    st.subheader("📈 Evolução Temporal dos Assuntos Selecionados")
+    df_time = cached_aggregate(
+        backend, filters, by=["date", "subject"], measures=["sessions_total"]
+    )
+    time_chart(df_time)
+
 # ==========================================================
 # TABELA DE RESUMO
 # ==========================================================
@@ -153,3 +115,16 @@ st.dataframe(
     ),
     use_container_width=True,
 )
+
+# ==========================================================
+# EXPORTAÇÃO
+# ==========================================================
+tables = {"Resumo de assuntos": df_subject}
+if subjects:
+    tables["Série diária por assunto"] = df_time
+export_panel(backend, filters, tables=tables, name="assuntos")
+
+# ==========================================================
+# DIAGNÓSTICO (TIMING=1)
+# ==========================================================
+debug_panel()
@@ -1,77 +1,35 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from pages.utils.data_loader import get_data
+from pages.utils.charts import (
+    efficiency_bar_chart,
+    performance_chart,
+    performance_frame,
+)
+from pages.utils.export import export_panel
+from pages.utils.filters import sidebar_filters
+from pages.utils.query import RATES, get_backend
+from pages.utils.summaries import cached_aggregate
+from pages.utils.timing import debug_panel, start_rerun
 
 # ==========================================================
 # CONFIGURAÇÃO
 # ==========================================================
+start_rerun(__file__)
+
 st.title("⚙️ Comparativo entre Bots, Tecnologias e Canais")
 
-df = get_data()
+backend = get_backend()
 
 # ==========================================================
 # FILTROS
 # ==========================================================
-st.sidebar.header("Filtros")
-
-min_date = df["date"].min()
-max_date = df["date"].max()
-
-# --- Filtro de Data com fallback seguro ---
-date_selection = st.sidebar.date_input(
-    "Selecione o intervalo",
-    value=(min_date, max_date),
-    min_value=min_date,
-    max_value=max_date,
-)
-if isinstance(date_selection, tuple) and len(date_selection) == 2:
-    start_date, end_date = date_selection
-else:
-    start_date = end_date = date_selection
-
-bots = st.sidebar.multiselect("Bot", sorted(df["bot"].dropna().unique()))
-techs = st.sidebar.multiselect("Tech", sorted(df["tech"].dropna().unique()))
-fonts = st.sidebar.multiselect("Fonte (Canal)", sorted(df["font"].dropna().unique()))
-enable_smoothing = st.sidebar.toggle("📈 Média móvel 7 dias", value=False)
-
-# ==========================================================
-# APLICAR FILTROS
-# ==========================================================
-df_filtered = df.copy()
-
-if bots:
-    df_filtered = df_filtered[df_filtered["bot"].isin(bots)]
-if techs:
-    df_filtered = df_filtered[df_filtered["tech"].isin(techs)]
-if fonts:
-    df_filtered = df_filtered[df_filtered["font"].isin(fonts)]
-
-df_filtered = df_filtered[
-    (df_filtered["date"] >= pd.to_datetime(start_date))
-    & (df_filtered["date"] <= pd.to_datetime(end_date))
-]
+filters = sidebar_filters(backend.indexes(), labels={"font": "Fonte (Canal)"})
 
 
 # ==========================================================
 # AGREGAÇÃO E MÉTRICAS GERAIS
 # ==========================================================
 def aggregate_by(column):
-    df_grouped = df_filtered.groupby(column, as_index=False).agg(
-        sessions_total=("sessions_total", "sum"),
-        session_retained=("session_retained", "sum"),
-        sessions_human_assistance=("sessions_human_assistance", "sum"),
-    )
-    df_grouped["retention_rate"] = (
-        df_grouped["session_retained"] / df_grouped["sessions_total"]
-    )
-    df_grouped["human_request_rate"] = (
-        df_grouped["sessions_human_assistance"] / df_grouped["sessions_total"]
-    )
-    df_grouped["efficiency_score"] = (
-        df_grouped["retention_rate"] - df_grouped["human_request_rate"]
-    )
-    return df_grouped
+    return cached_aggregate(backend, filters, by=[column], rates=RATES)
 
 
 df_bot = aggregate_by("bot")
@@ -87,55 +45,20 @@ col1, col2, col3 = st.columns(3)
 
 # --- Bots ---
 with col1:
-    fig_bot = px.bar(
-        df_bot.sort_values("sessions_total", ascending=False),
-        x="sessions_total",
-        y="bot",
-        orientation="h",
-        color="efficiency_score",
-        color_continuous_scale="RdYlGn",
-        title="Bots — Volume e Eficiência",
-        labels={
-            "sessions_total": "Sessões Totais",
-            "bot": "Bot",
-            "efficiency_score": "Eficiência",
-        },
-    )
+    fig_bot = efficiency_bar_chart(df_bot, "bot", "Bots — Volume e Eficiência", "Bot")
     st.plotly_chart(fig_bot, use_container_width=True)
 
 # --- Tecnologias ---
 with col2:
-    fig_tech = px.bar(
-        df_tech.sort_values("sessions_total", ascending=False),
-        x="sessions_total",
-        y="tech",
-        orientation="h",
-        color="efficiency_score",
-        color_continuous_scale="RdYlGn",
-        title="Tecnologias — Volume e Eficiência",
-        labels={
-            "sessions_total": "Sessões Totais",
-            "tech": "Tecnologia",
-            "efficiency_score": "Eficiência",
-        },
+    fig_tech = efficiency_bar_chart(
+        df_tech, "tech", "Tecnologias — Volume e Eficiência", "Tecnologia"
     )
     st.plotly_chart(fig_tech, use_container_width=True)
 
 # --- Fontes ---
 with col3:
-    fig_font = px.bar(
-        df_font.sort_values("sessions_total", ascending=False),
-        x="sessions_total",
-        y="font",
-        orientation="h",
-        color="efficiency_score",
-        color_continuous_scale="RdYlGn",
-        title="Canais — Volume e Eficiência",
-        labels={
-            "sessions_total": "Sessões Totais",
-            "font": "Fonte",
-            "efficiency_score": "Eficiência",
-        },
+    fig_font = efficiency_bar_chart(
+        df_font, "font", "Canais — Volume e Eficiência", "Fonte"
     )
     st.plotly_chart(fig_font, use_container_width=True)
 
@@ -144,31 +67,8 @@ with col3:
 # ==========================================================
 st.subheader("📈 Matriz de Desempenho (Volume x Retenção x Pedido Humano)")
 
-df_perf = pd.concat(
-    [
-        df_bot.assign(level="Bot", label=df_bot["bot"]),
-        df_tech.assign(level="Tech", label=df_tech["tech"]),
-        df_font.assign(level="Fonte", label=df_font["font"]),
-    ],
-    ignore_index=True,
-)
-
-fig_perf = px.scatter(
-    df_perf,
-    x="sessions_total",
-    y="retention_rate",
-    color="level",
-    size="sessions_total",
-    hover_data=["label", "human_request_rate", "efficiency_score"],
-    title="Comparativo Geral — Volume x Retenção (Cor = Categoria)",
-    labels={
-        "sessions_total": "Sessões Totais",
-        "retention_rate": "Taxa de Retenção",
-        "level": "Categoria",
-    },
-)
-fig_perf.update_layout(yaxis_tickformat=".0%")
-st.plotly_chart(fig_perf, use_container_width=True)
+df_perf = performance_frame(df_bot, df_tech, df_font)
+st.plotly_chart(performance_chart(df_perf), use_container_width=True)
 
 # ==========================================================
 # TABELAS DE RESUMO
@@ -215,3 +115,23 @@ with tabs[2]:
         ),
         use_container_width=True,
     )
+
+# ==========================================================
+# EXPORTAÇÃO
+# ==========================================================
+export_panel(
+    backend,
+    filters,
+    tables={
+        "Resumo por bot": df_bot,
+        "Resumo por tecnologia": df_tech,
+        "Resumo por canal": df_font,
+        "Matriz de desempenho": df_perf,
+    },
+    name="tecnologias",
+)
+
+# ==========================================================
+# DIAGNÓSTICO (TIMING=1)
+# ==========================================================
+debug_panel()
@@ -1,68 +1,50 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-from pages.utils.data_loader import get_data
+from pages.utils.data_loader import get_snapshot
+from pages.utils.export import export_panel
+from pages.utils.filters import sidebar_filters
+from pages.utils.lazy_imports import plotly_express, plotly_graph_objects
+from pages.utils.quality import (
+    REASONS,
+    flag_anomalies,
+    quality_timeline,
+    select,
+    summarize,
+)
+from pages.utils.query import backend_for
+from pages.utils.timing import debug_panel, start_rerun
 
 # ==========================================================
 # CONFIGURAÇÃO
 # ==========================================================
+start_rerun(__file__)
+
 st.title("🧩 Qualidade dos Dados")
 
-df = get_data()
+snapshot = get_snapshot()
+backend = backend_for(snapshot)
 
 # ==========================================================
 # FILTROS
 # ==========================================================
-st.sidebar.header("Filtros")
-
-min_date = df["date"].min()
-max_date = df["date"].max()
-
-# --- Filtro de Data com fallback seguro ---
-date_selection = st.sidebar.date_input(
-    "Selecione o intervalo",
-    value=(min_date, max_date),
-    min_value=min_date,
-    max_value=max_date,
-)
-if isinstance(date_selection, tuple) and len(date_selection) == 2:
-    start_date, end_date = date_selection
-else:
-    start_date = end_date = date_selection
-
-bots = st.sidebar.multiselect("Bot", sorted(df["bot"].dropna().unique()))
-techs = st.sidebar.multiselect("Tech", sorted(df["tech"].dropna().unique()))
-fonts = st.sidebar.multiselect("Fonte (Canal)", sorted(df["font"].dropna().unique()))
+filters = sidebar_filters(backend.indexes(), labels={"font": "Fonte (Canal)"})
 
 # ==========================================================
-# APLICAR FILTROS
+# MÉTRICAS DE QUALIDADE
 # ==========================================================
-df_filtered = df.copy()
+# contagens calculadas uma vez na ingestão (quality.py), somadas para os filtros
+stats = summarize(snapshot["quality"], filters)
+total_rows = int(stats["rows"])
 
-if bots:
-    df_filtered = df_filtered[df_filtered["bot"].isin(bots)]
-if techs:
-    df_filtered = df_filtered[df_filtered["tech"].isin(techs)]
-if fonts:
-    df_filtered = df_filtered[df_filtered["font"].isin(fonts)]
 
-df_filtered = df_filtered[
-    (df_filtered["date"] >= pd.to_datetime(start_date))
-    & (df_filtered["date"] <= pd.to_datetime(end_date))
-]
+def share(count):
+    return count / total_rows if total_rows else float("nan")
 
-# ==========================================================
-# MÉTRICAS DE QUALIDADE
-# ==========================================================
-total_rows = len(df_filtered)
-missing_topic = df_filtered["topic"].isna().mean()
-missing_subject = df_filtered["subject"].isna().mean()
-duplicate_rows = df_filtered.duplicated().mean()
 
-numeric_cols = ["sessions_total", "session_retained", "sessions_human_assistance"]
-invalid_rows = (
-    df_filtered[numeric_cols].lt(0).any(axis=1) | df_filtered["sessions_total"].eq(0)
-).mean()
+missing_topic = share(stats["missing_topic"])
+missing_subject = share(stats["missing_subject"])
+duplicate_rows = share(stats["duplicates"])
+invalid_rows = share(stats["invalid_values"])
 
 
 # ==========================================================
@@ -70,6 +52,7 @@ invalid_rows = (
 # ==========================================================
 def gauge_chart(value, title, color="#00cc96"):
     """Cria um gauge chart de 0 a 100%."""
+    go = plotly_graph_objects()
     fig = go.Figure(
         go.Indicator(
             mode="gauge+number",
@@ -139,12 +122,12 @@ else:
 # ==========================================================
 st.subheader("📋 Resumo de Completeness por Coluna")
 
-# calcula % de missing por coluna
-missing_summary = (
-    df_filtered.isna()
-    .mean()
-    .reset_index()
-    .rename(columns={0: "missing_rate", "index": "column"})
+missing_counts = stats.filter(like="missing_")
+missing_summary = pd.DataFrame(
+    {
+        "column": missing_counts.index.str.removeprefix("missing_"),
+        "missing_rate": [share(count) for count in missing_counts],
+    }
 )
 missing_summary["completeness"] = 1 - missing_summary["missing_rate"]
 
@@ -165,3 +148,111 @@ col2.metric("Duplicatas", f"{duplicate_rows*100:.1f}%")
 col3.metric(
     "Campos Vazios (Topic + Subject)", f"{(missing_topic + missing_subject)/2:.1%}"
 )
+
+# ==========================================================
+# LINHA DO TEMPO DA QUALIDADE
+# ==========================================================
+st.subheader("📅 Qualidade Dia a Dia")
+st.caption(
+    "Cada segmento (bot × tecnologia × fonte) é comparado com o próprio "
+    "histórico: volume e completude por z-score robusto (mediana e MAD), "
+    "duplicatas e valores inválidos por limites de controle. Dias com z além de "
+    "3,5 ou com sessões retidas/humanas acima do total são sinalizados."
+)
+
+METRIC_LABELS = {
+    "rows": "Linhas",
+    "topic_completeness": "Tópicos Preenchidos",
+    "subject_completeness": "Assuntos Preenchidos",
+    "duplicate_rate": "Duplicatas",
+    "invalid_rate": "Valores Inválidos (%)",
+    "invalid_values": "Valores Inválidos",
+    "retained_gt_total": "Retidas > Total",
+    "human_gt_total": "Humanas > Total",
+}
+
+timeline = quality_timeline(select(snapshot["quality"], filters))
+# anomalias avaliadas sobre todo o histórico; só a exibição segue os filtros
+anomalies = select(
+    flag_anomalies(snapshot["quality"], generation=snapshot["generation"]), filters
+)
+flagged_days = timeline.index.isin(anomalies["date"])
+
+px = plotly_express()
+rates = timeline[["topic_completeness", "subject_completeness", "duplicate_rate"]]
+fig = px.line(
+    rates.rename(columns=METRIC_LABELS),
+    labels={"value": "Taxa", "date": "Data", "variable": "Métrica"},
+)
+fig.add_scatter(
+    x=timeline.index[flagged_days],
+    y=timeline["topic_completeness"][flagged_days],
+    mode="markers",
+    marker={"color": "#ff6b6b", "size": 8, "symbol": "x"},
+    name="Dia com anomalia",
+)
+fig.update_layout(yaxis_tickformat=".0%", height=350)
+st.plotly_chart(fig, use_container_width=True)
+
+counts = timeline[["invalid_values", "retained_gt_total", "human_gt_total"]]
+fig = px.bar(
+    counts.rename(columns=METRIC_LABELS),
+    labels={"value": "Linhas", "date": "Data", "variable": "Verificação"},
+)
+fig.update_layout(height=300)
+st.plotly_chart(fig, use_container_width=True)
+
+if anomalies.empty:
+    st.success("✅ Nenhum dia anômalo no período selecionado.")
+else:
+    st.warning(
+        f"{anomalies['date'].nunique()} dias com anomalias no período selecionado."
+    )
+    st.dataframe(
+        anomalies.assign(
+            date=anomalies["date"].dt.date,
+            metric=anomalies["metric"].map(METRIC_LABELS),
+        )
+        .sort_values("date", ascending=False)
+        .style.format({"value": "{:.3g}", "z": "{:.1f}"}),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+# ==========================================================
+# QUARENTENA
+# ==========================================================
+st.subheader("🧪 Quarentena")
+st.caption(
+    "Linhas inválidas são separadas na ingestão e ficam fora das demais páginas "
+    "(arquivos em `.cache/quarantine/`)."
+)
+st.metric("Linhas em Quarentena", f"{int(stats['quarantined']):,}".replace(",", "."))
+reasons = pd.DataFrame(
+    {
+        "motivo": list(REASONS),
+        "descrição": list(REASONS.values()),
+        "linhas": [int(stats[f"quarantine_{code.lower()}"]) for code in REASONS],
+    }
+)
+st.dataframe(reasons, use_container_width=True, hide_index=True)
+
+# ==========================================================
+# EXPORTAÇÃO
+# ==========================================================
+export_panel(
+    backend,
+    filters,
+    tables={
+        "Qualidade dia a dia": timeline.reset_index(),
+        "Dias anômalos": anomalies,
+        "Completeness por coluna": missing_summary,
+        "Motivos de quarentena": reasons,
+    },
+    name="qualidade",
+)
+
+# ==========================================================
+# DIAGNÓSTICO (TIMING=1)
+# ==========================================================
+debug_panel()
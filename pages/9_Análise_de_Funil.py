@@ -1,84 +1,42 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from pages.utils.data_loader import get_data
+from pages.utils.charts import funnel_chart, funnel_rates_chart
+from pages.utils.export import export_panel
+from pages.utils.filters import FILTER_LABELS, sidebar_filters
+from pages.utils.funnel import (
+    FUNNEL_DIMENSIONS,
+    daily_funnel,
+    drill_down,
+    funnel_cube,
+    rollup,
+)
+from pages.utils.lazy_imports import plotly_express
+from pages.utils.query import get_backend
+from pages.utils.timing import debug_panel, fragment, start_rerun
 
 # ==========================================================
 # CONFIGURAÇÃO
 # ==========================================================
+start_rerun(__file__)
+
 st.title("🔻 Funil de Atendimento")
 
-df = get_data()
+backend = get_backend()
 
 # ==========================================================
 # FILTROS
 # ==========================================================
-st.sidebar.header("Filtros")
-
-min_date = df["date"].min()
-max_date = df["date"].max()
-
-# --- Filtro de Data com fallback seguro ---
-date_selection = st.sidebar.date_input(
-    "Selecione o intervalo",
-    value=(min_date, max_date),
-    min_value=min_date,
-    max_value=max_date,
+filters = sidebar_filters(
+    backend.indexes(),
+    dimensions=("bot", "tech", "font", "topic"),
+    labels={"font": "Fonte (Canal)"},
 )
-if isinstance(date_selection, tuple) and len(date_selection) == 2:
-    start_date, end_date = date_selection
-else:
-    start_date = end_date = date_selection
-
-bots = st.sidebar.multiselect("Bot", sorted(df["bot"].dropna().unique()))
-techs = st.sidebar.multiselect("Tech", sorted(df["tech"].dropna().unique()))
-fonts = st.sidebar.multiselect("Fonte (Canal)", sorted(df["font"].dropna().unique()))
-topics = st.sidebar.multiselect("Tópico", sorted(df["topic"].dropna().unique()))
-enable_smoothing = st.sidebar.toggle("📈 Média móvel 7 dias", value=False)
-
-# ==========================================================
-# APLICAR FILTROS
-# ==========================================================
-df_filtered = df.copy()
-
-if bots:
-    df_filtered = df_filtered[df_filtered["bot"].isin(bots)]
-if techs:
-    df_filtered = df_filtered[df_filtered["tech"].isin(techs)]
-if fonts:
-    df_filtered = df_filtered[df_filtered["font"].isin(fonts)]
-if topics:
-    df_filtered = df_filtered[df_filtered["topic"].isin(topics)]
-
-df_filtered = df_filtered[
-    (df_filtered["date"] >= pd.to_datetime(start_date))
-    & (df_filtered["date"] <= pd.to_datetime(end_date))
-]
 
 # ==========================================================
 # AGREGAÇÃO GERAL DO FUNIL
 # ==========================================================
-# soma global das métricas principais
-funnel_df = pd.DataFrame(
-    {
-        "sessions_total": [df_filtered["sessions_total"].sum()],
-        "session_retained": [df_filtered["session_retained"].sum()],
-        "sessions_human_assistance": [df_filtered["sessions_human_assistance"].sum()],
-    }
-)
-
-# Cálculo de perdas (sessões não resolvidas)
-funnel_df["loss_count"] = funnel_df["sessions_total"] - funnel_df["session_retained"]
-funnel_df["loss_count"] = funnel_df["loss_count"].apply(lambda x: x if x > 0 else 0)
-
-# Cálculo das taxas
-funnel_df["retention_rate"] = (
-    funnel_df["session_retained"] / funnel_df["sessions_total"]
-)
-funnel_df["human_request_rate"] = (
-    funnel_df["sessions_human_assistance"] / funnel_df["sessions_total"]
-)
-funnel_df["loss_rate"] = funnel_df["loss_count"] / funnel_df["sessions_total"]
+# funil de todos os segmentos numa só agregação; os demais níveis somam o cubo
+cube = funnel_cube(backend, filters)
+funnel_df = rollup(cube)
 
 # Extrair valores finais
 total_sessions = funnel_df.loc[0, "sessions_total"]
@@ -90,25 +48,15 @@ retention_rate = funnel_df.loc[0, "retention_rate"]
 human_request_rate = funnel_df.loc[0, "human_request_rate"]
 loss_rate = funnel_df.loc[0, "loss_rate"]
 
-# Montar DataFrame do funil (3 etapas)
-funnel_data = pd.DataFrame(
-    {
-        "Etapa": ["Sessões Totais", "Sessões Retidas", "Sessões Não Resolvidas"],
-        "Quantidade": [total_sessions, retained, loss],
-    }
-)
-
 # ==========================================================
 # GRÁFICO DE FUNIL
 # ==========================================================
 st.subheader("📊 Estrutura do Funil de Atendimento")
 
-fig_funnel = px.funnel(
-    funnel_data,
-    x="Quantidade",
-    y="Etapa",
-    color="Etapa",
-    color_discrete_sequence=["#1f77b4", "#2ca02c", "#d62728"],
+fig_funnel = funnel_chart(
+    total_sessions,
+    retained,
+    loss,
     title="Fluxo de Sessões: Totais → Retidas → Não Resolvidas",
 )
 st.plotly_chart(fig_funnel, use_container_width=True)
@@ -124,51 +72,144 @@ col2.metric("Taxa de Retenção", f"{retention_rate:.1%}")
 col3.metric("Taxa de Sessões Não Resolvidas", f"{loss_rate:.1%}")
 
 # ==========================================================
-# EVOLUÇÃO TEMPORAL DO FUNIL
+# FUNIL POR SEGMENTO
 # ==========================================================
-st.subheader("🕒 Evolução Temporal — Retenção x Não Resolvidas")
+st.subheader("🧭 Funil por Segmento")
 
-df_daily = df_filtered.groupby("date", as_index=False).agg(
-    sessions_total=("sessions_total", "sum"),
-    session_retained=("session_retained", "sum"),
-)
-df_daily["loss_count"] = df_daily["sessions_total"] - df_daily["session_retained"]
-df_daily["retention_rate"] = df_daily["session_retained"] / df_daily["sessions_total"]
-df_daily["loss_rate"] = df_daily["loss_count"] / df_daily["sessions_total"]
+SEGMENT_LABELS = {**FILTER_LABELS, "font": "Fonte (Canal)"}
+FUNNEL_FORMAT = {
+    "sessions_total": "{:,.0f}",
+    "session_retained": "{:,.0f}",
+    "sessions_human_assistance": "{:,.0f}",
+    "loss_count": "{:,.0f}",
+    "retention_rate": "{:.1%}",
+    "human_request_rate": "{:.1%}",
+    "loss_rate": "{:.1%}",
+}
 
-if enable_smoothing:
-    df_daily[["retention_rate", "loss_rate"]] = (
-        df_daily[["retention_rate", "loss_rate"]].rolling(7, min_periods=1).mean()
+
+# os widgets de cada seção só refazem a própria seção a partir do cubo
+# (rerun parcial, sem nova consulta)
+@fragment
+def segment_table(cube):
+    segment_dims = st.multiselect(
+        "Abrir por",
+        FUNNEL_DIMENSIONS,
+        default=FUNNEL_DIMENSIONS,
+        format_func=SEGMENT_LABELS.get,
+    )
+    segments = rollup(cube, segment_dims).sort_values("loss_rate", ascending=False)
+    st.dataframe(
+        segments.style.format(FUNNEL_FORMAT),
+        use_container_width=True,
+        hide_index=True,
+    )
+    # exportada aqui dentro: "Abrir por" só refaz o fragmento, e um painel de
+    # fora ficaria com o agrupamento do último rerun da página
+    export_panel(
+        backend,
+        filters,
+        tables={"Funil por segmento": segments},
+        name="funil-segmentos",
+        rows=False,
     )
 
-fig_time = px.line(
-    df_daily,
-    x="date",
-    y=["retention_rate", "loss_rate"],
-    labels={"value": "Taxa", "variable": "Indicador", "date": "Data"},
-    color_discrete_map={
-        "retention_rate": "#2ca02c",
-        "loss_rate": "#d62728",
-    },
-    title="Tendência das Taxas de Retenção e Sessões Não Resolvidas ao Longo do Tempo",
-)
-fig_time.update_layout(yaxis_tickformat=".0%")
-st.plotly_chart(fig_time, use_container_width=True)
+
+segment_table(cube)
+
+
+# ----------------------------------------------------------
+# detalhamento: abre um segmento pelas outras dimensões, sem nova consulta
+# ----------------------------------------------------------
+@fragment
+def segment_drill_down(cube):
+    st.markdown("**🔎 Detalhar um segmento**")
+    col1, col2, col3 = st.columns(3)
+    drill_dim = col1.selectbox(
+        "Dimensão", FUNNEL_DIMENSIONS, format_func=SEGMENT_LABELS.get
+    )
+    drill_value = col2.selectbox("Valor", sorted(cube[drill_dim].unique()))
+    drill_by = col3.selectbox(
+        "Abrir por",
+        [dim for dim in FUNNEL_DIMENSIONS if dim != drill_dim],
+        format_func=SEGMENT_LABELS.get,
+    )
+    if drill_value is None:
+        return
+
+    detail = drill_down(cube, {drill_dim: drill_value}, [drill_by])
+    px = plotly_express()
+    fig_detail = px.bar(
+        detail.sort_values("loss_rate"),
+        x="loss_rate",
+        y=drill_by,
+        orientation="h",
+        color="loss_rate",
+        color_continuous_scale="Reds",
+        labels={
+            "loss_rate": "Taxa de Não Resolvidas",
+            drill_by: SEGMENT_LABELS[drill_by],
+        },
+        title=f"Não resolvidas em {SEGMENT_LABELS[drill_dim]} = {drill_value}",
+    )
+    fig_detail.update_layout(xaxis_tickformat=".0%")
+    st.plotly_chart(fig_detail, use_container_width=True)
+
+
+segment_drill_down(cube)
 
 # ==========================================================
-# TABELA DE DETALHAMENTO
+# EVOLUÇÃO TEMPORAL DO FUNIL
 # ==========================================================
-st.subheader("📋 Detalhamento Diário do Funil")
+st.subheader("🕒 Evolução Temporal — Retenção x Não Resolvidas")
+
+df_daily = daily_funnel(backend, filters)
+
+
+# a média móvel só refaz o gráfico e a tabela diária
+@fragment
+def daily_section(df_daily):
+    enable_smoothing = st.toggle("📈 Média móvel 7 dias", value=False)
+    df_plot = df_daily
+    if enable_smoothing:
+        # cópia: o fragmento reusa o mesmo `df_daily` a cada rerun parcial
+        df_plot = df_daily.copy()
+        df_plot[["retention_rate", "loss_rate"]] = (
+            df_daily[["retention_rate", "loss_rate"]].rolling(7, min_periods=1).mean()
+        )
+
+    fig_time = funnel_rates_chart(df_plot)
+    st.plotly_chart(fig_time, use_container_width=True)
+
+    st.subheader("📋 Detalhamento Diário do Funil")
+
+    st.dataframe(
+        df_plot.sort_values("date", ascending=False).style.format(
+            {
+                "sessions_total": "{:,.0f}",
+                "session_retained": "{:,.0f}",
+                "loss_count": "{:,.0f}",
+                "retention_rate": "{:.1%}",
+                "loss_rate": "{:.1%}",
+            }
+        ),
+        use_container_width=True,
+    )
+
+
+daily_section(df_daily)
 
-st.dataframe(
-    df_daily.sort_values("date", ascending=False).style.format(
-        {
-            "sessions_total": "{:,.0f}",
-            "session_retained": "{:,.0f}",
-            "loss_count": "{:,.0f}",
-            "retention_rate": "{:.1%}",
-            "loss_rate": "{:.1%}",
-        }
-    ),
-    use_container_width=True,
+# ==========================================================
+# EXPORTAÇÃO
+# ==========================================================
+export_panel(
+    backend,
+    filters,
+    tables={"Funil diário": df_daily},
+    name="funil",
 )
+
+# ==========================================================
+# DIAGNÓSTICO (TIMING=1)
+# ==========================================================
+debug_panel()
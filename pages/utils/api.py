@@ -0,0 +1,331 @@
+"""API HTTP local com os mesmos números do painel.
+
+Um processo leve, ao lado do Streamlit, que responde sobre a mesma camada de
+dados (`get_snapshot` / `get_backend`) e se atualiza com o mesmo observador
+de `reload.py`:
+
+    GET /health                       geração servida
+    GET /v1/indexes                   opções dos filtros e intervalo de datas
+    GET /v1/aggregate?by=date&rates=retention_rate&bot=Bot+Ton&start=2025-08-01
+    GET /v1/funnel?by=bot&by=tech     funil (totais → retidas → não resolvidas)
+    GET /v1/forecast                  projeção da página 3, com as faixas
+
+Os filtros são os das páginas: `start`/`end` (inclusivos) e `bot`, `tech`,
+`font`, `topic`, `subject`, repetíveis. As respostas saem em JSON ou, com
+`format=arrow` (ou `Accept: application/vnd.apache.arrow.stream`), em Arrow
+IPC; acima de `GZIP_MIN_BYTES` são comprimidas com gzip quando o cliente
+aceita.
+
+Cada resposta depende só da geração da base e da consulta, então o ETag é o
+hash das duas: um `If-None-Match` igual recebe 304 sem consultar nada, e o
+corpo já montado fica num cache LRU de `API_CACHE_ENTRIES` respostas.
+
+    python -m pages.utils.api --port 8000
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from pages.utils.data_loader import DIMENSIONS, MEASURES, get_snapshot
+from pages.utils.dataset import arrow_table
+from pages.utils.query import (
+    RATE_MEASURES,
+    RATES,
+    Filters,
+    backend_for,
+    get_backend,
+)
+
+# só a máquina local por padrão; o container abre para a rede (Dockerfile)
+API_HOST = os.environ.get("API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("API_PORT", "8000"))
+API_CACHE_ENTRIES = int(os.environ.get("API_CACHE_ENTRIES", "512"))
+GZIP_MIN_BYTES = 1024
+
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+FILTER_PARAMS = {"start", "end", *DIMENSIONS}
+
+logger = logging.getLogger(__name__)
+
+
+class BadRequest(ValueError):
+    """Parâmetro inválido na consulta (vira resposta 400)."""
+
+
+# ==========================================================
+# CONSULTAS
+# ==========================================================
+def _one(params, name):
+    values = params.get(name, [])
+    if len(values) > 1:
+        raise BadRequest(f"'{name}' aceita um único valor")
+    return values[0] if values else None
+
+
+def _many(params, name, allowed):
+    """Valores de um parâmetro repetível (ou separado por vírgulas)."""
+    values = [v for value in params.get(name, []) for v in value.split(",") if v]
+    unknown = sorted(set(values) - set(allowed))
+    if unknown:
+        raise BadRequest(f"'{name}' inválido: {', '.join(unknown)}")
+    return values
+
+
+def _day(params, name):
+    value = _one(params, name)
+    if value is not None:
+        try:
+            pd.Timestamp(value)
+        except ValueError:
+            raise BadRequest(f"'{name}' não é uma data: {value}") from None
+    return value
+
+
+def parse_filters(params):
+    """`Filters` a partir dos parâmetros da URL."""
+    return Filters(
+        start_date=_day(params, "start"),
+        end_date=_day(params, "end"),
+        **{dim: tuple(params.get(dim, [])) for dim in DIMENSIONS},
+    )
+
+
+def query_indexes(params, snapshot):
+    indexes = snapshot["indexes"]
+    return {
+        "options": {
+            dim: list(map(str, values)) for dim, values in indexes["options"].items()
+        },
+        "date_range": [str(day.date()) for day in indexes["date_range"]],
+    }
+
+
+def query_aggregate(params, snapshot):
+    by = _many(params, "by", ["date", *DIMENSIONS])
+    measures = _many(params, "measures", MEASURES) or MEASURES
+    rates = _many(params, "rates", RATES)
+    # as taxas pedidas podem depender de medidas que não foram pedidas: elas
+    # entram na agregação e saem da resposta
+    needed = [
+        m
+        for m in MEASURES
+        if m in measures or any(m in RATE_MEASURES[rate] for rate in rates)
+    ]
+    result = backend_for(snapshot).aggregate(
+        parse_filters(params), by=by, measures=needed, rates=rates
+    )
+    return result[[*by, *dict.fromkeys(measures), *dict.fromkeys(rates)]]
+
+
+def query_funnel(params, snapshot):
+    from pages.utils.funnel import FUNNEL_DIMENSIONS, funnel_cube, rollup
+
+    by = _many(params, "by", FUNNEL_DIMENSIONS)
+    return rollup(funnel_cube(backend_for(snapshot), parse_filters(params)), by)
+
+
+def query_forecast(params, snapshot):
+    from pages.utils.forecast import daily_series, get_projection
+
+    df_daily = daily_series(snapshot["daily"])
+    df_future = get_projection(df_daily, snapshot["generation"])
+    return df_future.rename_axis("date").reset_index()
+
+
+# rota → (consulta, parâmetros aceitos)
+ROUTES = {
+    "/v1/indexes": (query_indexes, set()),
+    "/v1/aggregate": (query_aggregate, {"by", "measures", "rates"} | FILTER_PARAMS),
+    "/v1/funnel": (query_funnel, {"by"} | FILTER_PARAMS),
+    "/v1/forecast": (query_forecast, set()),
+}
+
+
+# ==========================================================
+# CORPO DAS RESPOSTAS
+# ==========================================================
+def encode(result, fmt, generation):
+    """Serializa o resultado de uma consulta em JSON ou Arrow IPC."""
+    if isinstance(result, dict):
+        if fmt == "arrow":
+            raise BadRequest("esta rota só responde em JSON")
+        payload = json.dumps({"generation": generation, "data": result})
+        return payload.encode(), "application/json"
+    if fmt == "arrow":
+        import pyarrow as pa
+
+        table = arrow_table(result)
+        table = table.replace_schema_metadata({"generation": generation})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes(), ARROW_MIME
+    data = result.to_json(orient="records", date_format="iso")
+    payload = f'{{"generation": {json.dumps(generation)}, "data": {data}}}'
+    return payload.encode(), "application/json"
+
+
+class ResponseCache:
+    """Cache LRU das respostas prontas (corpo, tipo e corpo com gzip)."""
+
+    def __init__(self, max_entries=API_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_cache = ResponseCache()
+
+
+def response_key(path, params, fmt, generation):
+    """Identifica a resposta: geração + rota + parâmetros em ordem canônica."""
+    query = sorted((name, sorted(values)) for name, values in params.items())
+    return f"{generation}|{path}|{fmt}|{json.dumps(query)}"
+
+
+def etag_for(key):
+    # vale para qualquer codificação do mesmo conteúdo: validador fraco
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+def build_response(path, params, fmt, snapshot):
+    """Corpo da resposta (com versão gzip), do cache ou calculado agora."""
+    key = response_key(path, params, fmt, snapshot["generation"])
+    entry = _cache.get(key)
+    if entry is None:
+        query, allowed = ROUTES[path]
+        unknown = sorted(set(params) - allowed)
+        if unknown:
+            raise BadRequest(f"parâmetros desconhecidos: {', '.join(unknown)}")
+        body, mime = encode(query(params, snapshot), fmt, snapshot["generation"])
+        compressed = gzip.compress(body, 6) if len(body) >= GZIP_MIN_BYTES else None
+        entry = (etag_for(key), body, compressed, mime)
+        _cache.put(key, entry)
+    return entry
+
+
+# ==========================================================
+# SERVIDOR
+# ==========================================================
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "chatbot-dashboard-api"
+    protocol_version = "HTTP/1.1"
+    # cabeçalho e corpo saem em escritas separadas: sem Nagle, sem os ~40 ms
+    # de espera pelo ACK atrasado do cliente em conexões keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            generation = get_snapshot()["generation"]
+            return self._send_json({"status": "ok", "generation": generation})
+        if url.path not in ROUTES:
+            return self._send_error(HTTPStatus.NOT_FOUND, "rota desconhecida")
+
+        params = parse_qs(url.query)
+        fmt = (params.pop("format", [None])[0]) or (
+            "arrow" if ARROW_MIME in self.headers.get("Accept", "") else "json"
+        )
+        if fmt not in ("json", "arrow"):
+            return self._send_error(HTTPStatus.BAD_REQUEST, f"formato: {fmt}")
+
+        # o snapshot é lido uma vez: a resposta inteira sai da mesma geração
+        snapshot = get_snapshot()
+        etag = etag_for(response_key(url.path, params, fmt, snapshot["generation"]))
+        known = self.headers.get("If-None-Match", "")
+        if etag in (tag.strip() for tag in known.split(",")):
+            return self._send(HTTPStatus.NOT_MODIFIED, etag=etag)
+        try:
+            etag, body, compressed, mime = build_response(
+                url.path, params, fmt, snapshot
+            )
+        except BadRequest as error:
+            return self._send_error(HTTPStatus.BAD_REQUEST, str(error))
+        except Exception:
+            logger.exception("Falha ao responder %s", self.path)
+            return self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, "erro interno")
+
+        encoding = None
+        accepted = self.headers.get("Accept-Encoding", "")
+        if compressed is not None and "gzip" in accepted:
+            body, encoding = compressed, "gzip"
+        self._send(HTTPStatus.OK, body, mime, etag=etag, encoding=encoding)
+
+    def _send(self, status, body=b"", mime=None, etag=None, encoding=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            # a base pode ser recarregada: o cliente revalida a cada uso
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Vary", "Accept, Accept-Encoding")
+        if mime:
+            self.send_header("Content-Type", mime)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _send_json(self, payload, status=HTTPStatus.OK):
+        self._send(status, json.dumps(payload).encode(), "application/json")
+
+    def _send_error(self, status, message):
+        self._send_json({"error": message}, status)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(port=API_PORT, host=API_HOST):
+    """Cria o servidor (uma thread por conexão) sem iniciá-lo."""
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--host", default=API_HOST)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from pages.utils.reload import start_watcher
+
+    # carrega a base antes de abrir a porta e acompanha as novas versões
+    get_backend().indexes()
+    start_watcher()
+    server = make_server(args.port, args.host)
+    logger.info("API em http://%s:%d", args.host, args.port)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
-import plotly.express as px
+import pandas as pd
 
+from pages.utils.lazy_imports import plotly_express, plotly_graph_objects
+from pages.utils.timing import timed
 
+
+@timed()
 def daily_sessions_chart(df, enable_smoothing=False):
     if enable_smoothing:
+        # cópia: o fragmento reusa o mesmo DataFrame a cada rerun parcial
         cols = ["sessions_total", "session_retained", "sessions_human_assistance"]
+        df = df.copy()
         df[cols] = df[cols].rolling(7, min_periods=1).mean()
 
+    px = plotly_express()
     fig = px.line(
         df,
         x="date",
@@ -19,8 +26,10 @@ def daily_sessions_chart(df, enable_smoothing=False):
     return fig
 
 
+@timed()
 def retention_rate_chart(df, enable_smoothing=False):
     if enable_smoothing:
+        df = df.copy()
         df[["retention_rate", "human_request_rate"]] = (
             df[["retention_rate", "human_request_rate"]]
             .rolling(7, min_periods=1)
@@ -34,6 +43,7 @@ def retention_rate_chart(df, enable_smoothing=False):
         value_name="Taxa",
     )
 
+    px = plotly_express()
     fig = px.line(
         df_plot,
         x="date",
@@ -45,3 +55,185 @@ def retention_rate_chart(df, enable_smoothing=False):
     )
     fig.update_layout(yaxis_tickformat=".0%", template="plotly_white")
     return fig
+
+
+@timed()
+def topic_retention_chart(df_topics):
+    """Barras da retenção dos tópicos de maior volume (página de agosto)."""
+    px = plotly_express()
+    fig = px.bar(
+        df_topics.sort_values("retention_rate", ascending=False),
+        x="retention_rate",
+        y="topic",
+        orientation="h",
+        color="retention_rate",
+        color_continuous_scale="RdYlGn",
+        title="Taxa de Retenção por Tópico — Top 10 de Volume",
+        labels={"retention_rate": "Taxa de Retenção", "topic": "Tópico"},
+    )
+    fig.update_layout(yaxis_categoryorder="total ascending")
+    return fig
+
+
+@timed()
+def efficiency_bar_chart(df, column, title, label):
+    """Volume por categoria de `column`, colorido pela eficiência."""
+    px = plotly_express()
+    return px.bar(
+        df.sort_values("sessions_total", ascending=False),
+        x="sessions_total",
+        y=column,
+        orientation="h",
+        color="efficiency_score",
+        color_continuous_scale="RdYlGn",
+        title=title,
+        labels={
+            "sessions_total": "Sessões Totais",
+            column: label,
+            "efficiency_score": "Eficiência",
+        },
+    )
+
+
+@timed()
+def performance_frame(df_bot, df_tech, df_font):
+    """Une os resumos por bot, tecnologia e fonte para a matriz de desempenho."""
+    return pd.concat(
+        [
+            df_bot.assign(level="Bot", label=df_bot["bot"]),
+            df_tech.assign(level="Tech", label=df_tech["tech"]),
+            df_font.assign(level="Fonte", label=df_font["font"]),
+        ],
+        ignore_index=True,
+    )
+
+
+@timed()
+def performance_chart(df_perf):
+    px = plotly_express()
+    fig = px.scatter(
+        df_perf,
+        x="sessions_total",
+        y="retention_rate",
+        color="level",
+        size="sessions_total",
+        hover_data=["label", "human_request_rate", "efficiency_score"],
+        title="Comparativo Geral — Volume x Retenção (Cor = Categoria)",
+        labels={
+            "sessions_total": "Sessões Totais",
+            "retention_rate": "Taxa de Retenção",
+            "level": "Categoria",
+        },
+    )
+    fig.update_layout(yaxis_tickformat=".0%")
+    return fig
+
+
+@timed()
+def funnel_chart(total, retained, loss, title):
+    """Funil em três etapas: totais → retidas → não resolvidas."""
+    funnel_data = pd.DataFrame(
+        {
+            "Etapa": ["Sessões Totais", "Sessões Retidas", "Sessões Não Resolvidas"],
+            "Quantidade": [total, retained, loss],
+        }
+    )
+    px = plotly_express()
+    return px.funnel(
+        funnel_data,
+        x="Quantidade",
+        y="Etapa",
+        color="Etapa",
+        color_discrete_sequence=["#1f77b4", "#2ca02c", "#d62728"],
+        title=title,
+    )
+
+
+@timed()
+def funnel_rates_chart(df_daily):
+    px = plotly_express()
+    fig = px.line(
+        df_daily,
+        x="date",
+        y=["retention_rate", "loss_rate"],
+        labels={"value": "Taxa", "variable": "Indicador", "date": "Data"},
+        color_discrete_map={
+            "retention_rate": "#2ca02c",
+            "loss_rate": "#d62728",
+        },
+        title="Tendência das Taxas de Retenção e Sessões Não Resolvidas ao Longo do Tempo",
+    )
+    fig.update_layout(yaxis_tickformat=".0%")
+    return fig
+
+
+# métrica projetada → (limites da faixa, cor do histórico, cor da projeção)
+PROJECTION_STYLES = {
+    "retention_rate": ("ret", "#2ca02c", "#ff7f0e"),
+    "loss_rate": ("loss", "#d62728", "#ffa07a"),
+    "sessions_total": ("sess", "#1f77b4", "#ff7f0e"),
+}
+
+
+@timed()
+def projection_chart(df_daily, df_future, metric, title, yaxis_title):
+    """Histórico e projeção de `metric`, com a faixa de confiança da projeção."""
+    band, color, projection_color = PROJECTION_STYLES[metric]
+    start = df_daily.index.max()
+
+    go = plotly_graph_objects()
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=df_daily.index,
+            y=df_daily[metric],
+            mode="lines",
+            name="Histórico",
+            line=dict(color=color),
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=df_future.index,
+            y=df_future[metric],
+            mode="lines",
+            name="Projeção",
+            line=dict(color=projection_color, dash="dot"),
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=list(df_future.index) + list(df_future.index[::-1]),
+            y=list(df_future[f"{band}_upper"])
+            + list(df_future[f"{band}_lower"][::-1]),
+            fill="toself",
+            fillcolor="rgba(255,127,14,0.15)",
+            line=dict(color="rgba(255,255,255,0)"),
+            hoverinfo="skip",
+            showlegend=False,
+        )
+    )
+    fig.add_shape(
+        type="line",
+        x0=start,
+        x1=start,
+        y0=0,
+        y1=1,
+        xref="x",
+        yref="paper",
+        line=dict(color="gray", dash="dot"),
+    )
+    fig.add_annotation(
+        x=start,
+        y=1,
+        xref="x",
+        yref="paper",
+        text="Início da Projeção",
+        showarrow=False,
+        yshift=10,
+        font=dict(color="gray", size=12),
+    )
+    fig.update_layout(title=title, yaxis_title=yaxis_title, xaxis_title="Data")
+    if metric != "sessions_total":
+        fig.update_layout(yaxis_tickformat=".0%")
+    return fig
@@ -1,40 +1,155 @@
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
-import streamlit as st
 from pathlib import Path
 
-DATA_PATH = Path(__file__).resolve().parents[2] / "Case_Data_Analyst_Pl.xlsx"
+from pages.utils.file_lock import file_lock
+from pages.utils.timing import timed
+
+ROOT = Path(__file__).resolve().parents[2]
+# um arquivo, um diretório ou um glob (ex.: "exports/*.xlsx")
+DATA_PATH = Path(os.environ.get("DATA_PATH", ROOT / "Case_Data_Analyst_Pl.xlsx"))
+DATA_SUFFIXES = (".xlsx", ".xls", ".csv", ".parquet")
+# processos usados para ler várias exportações (padrão: um por núcleo)
+LOAD_WORKERS = int(os.environ.get("LOAD_WORKERS", "0")) or os.cpu_count()
+# snapshot, projeção e base particionada (outro diretório isola benchmarks)
+CACHE_DIR = Path(os.environ.get("CACHE_DIR", ROOT / ".cache"))
+SNAPSHOT_PATH = CACHE_DIR / "dataset.pkl"
+# registro e incrementos da ingestão: a única cópia dos arquivos ingeridos,
+# fora do cache (que pode ser apagado e é refeito a partir deles)
+INGEST_DIR = Path(os.environ.get("INGEST_DIR", ROOT / "ingest"))
+LEDGER_PATH = INGEST_DIR / "ledger.json"
+# "pickle" (um arquivo por processo) ou "arrow" (mmap compartilhado entre
+# workers, ver `shared_store.py`)
+SNAPSHOT_STORE = os.environ.get("SNAPSHOT_STORE", "pickle")
+
+# incrementado quando o conteúdo do snapshot muda de formato ou de regras (a
+# quarentena de `quality.py`): entra na chave do cache de resultados
+SNAPSHOT_FORMAT = 5
+
+DIMENSIONS = ["bot", "tech", "font", "topic", "subject"]
+MEASURES = ["sessions_total", "session_retained", "sessions_human_assistance"]
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+COLUMN_NAMES = {
+    "session_date": "date",
+    "chatbot": "bot",
+    "fonte": "font",
+    "tecnologia_do_chatbot": "tech",
+    "topico_da_sessao": "topic",
+    "assunto_da_sessao": "subject",
+    "sessoes_total": "sessions_total",
+    "sessoes_retidas": "session_retained",
+    "sessoes_com_pedido_de_atendimento": "sessions_human_assistance",
+}
 
+BOT_NAMES = {"Bot A": "Bot Ton", "Bot B": "Bot Stone"}
 
-def load_data():
-    df = pd.read_excel(DATA_PATH)
 
-    df = df.rename(
-        columns={
-            "session_date": "date",
-            "chatbot": "bot",
-            "fonte": "font",
-            "tecnologia_do_chatbot": "tech",
-            "topico_da_sessao": "topic",
-            "assunto_da_sessao": "subject",
-            "sessoes_total": "sessions_total",
-            "sessoes_retidas": "session_retained",
-            "sessoes_com_pedido_de_atendimento": "sessions_human_assistance",
-        }
+# ==========================================================
+# LEITURA DAS EXPORTAÇÕES
+# ==========================================================
+def source_files(source=DATA_PATH):
+    """Lista os arquivos de dados de um arquivo, diretório ou glob."""
+    source = str(source)
+    if any(char in source for char in "*?["):
+        candidates = [Path(p) for p in glob.glob(source, recursive=True)]
+    elif Path(source).is_dir():
+        candidates = list(Path(source).rglob("*"))
+    else:
+        return [Path(source)]
+    files = sorted(
+        p
+        for p in candidates
+        if p.suffix.lower() in DATA_SUFFIXES and not p.name.startswith("~$")
     )
+    if not files:
+        raise FileNotFoundError(f"Nenhum arquivo de dados em {source}")
+    return files
+
+
+def read_source(path):
+    """Lê uma exportação no esquema original; retorna um DataFrame por aba."""
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        return [pd.read_parquet(path)]
+    if suffix == ".csv":
+        return [pd.read_csv(path)]
+    # abas sem a coluna de data (notas, legendas) não são exportações
+    sheets = pd.read_excel(path, sheet_name=None)
+    return [sheet for sheet in sheets.values() if "session_date" in sheet.columns]
+
+
+def as_categories(df):
+    """Converte as dimensões para `category` (dicionário + códigos inteiros)."""
+    return df.assign(
+        **{col: df[col].astype("category") for col in DIMENSIONS if col in df}
+    )
+
+
+def concat_normalized(frames):
+    """Concatena bases normalizadas com o mesmo dicionário em cada dimensão.
+
+    Sem isso o pandas volta a `object` ao juntar categorias diferentes.
+    """
+    frames = [as_categories(df) for df in frames]
+    for col in DIMENSIONS:
+        categories = sorted(set().union(*(df[col].cat.categories for df in frames)))
+        frames = [
+            df.assign(**{col: df[col].cat.set_categories(categories)}) for df in frames
+        ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_file(path):
+    """Lê e normaliza um arquivo (todas as abas); roda dentro dos workers."""
+    # categorias encolhem o resultado que volta do worker para o processo pai
+    return concat_normalized([normalize(raw) for raw in read_source(path)])
+
+
+def load_data(source=DATA_PATH, workers=LOAD_WORKERS):
+    """Carrega e normaliza todas as exportações de `source`.
+
+    Com mais de um arquivo, cada um é lido e normalizado num processo
+    separado; os resultados são unidos com dicionários de categorias comuns.
+    """
+    files = source_files(source)
+    workers = min(workers, len(files))
+    if workers <= 1:
+        return concat_normalized([load_file(path) for path in files])
+    # "spawn": o servidor tem threads, e fork com threads não é seguro
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return concat_normalized(list(pool.map(load_file, files)))
+
+
+def normalize(df):
+    """Renomeia as colunas da exportação e padroniza valores e tipos."""
+    df = df.rename(columns=COLUMN_NAMES)
 
     categorical_columns = ["bot", "font", "tech"]
     for col in categorical_columns:
         if col in df.columns:
             df[col] = df[col].astype(str).str.replace("_", " ").str.title()
 
-    df.bot = df.bot.replace("Bot A", "Bot Ton")
-    df.bot = df.bot.replace("Bot B", "Bot Stone")
+    df.bot = df.bot.replace(BOT_NAMES)
 
     df.topic = df.topic.replace("Unknown", None)
     df.subject = df.subject.replace("Unknown", None)
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
 
-    for c in ["sessions_total", "session_retained", "sessions_human_assistance"]:
+    for c in MEASURES:
         if c in df.columns:
             df[c] = pd.to_numeric(df[c], errors="coerce")
 
@@ -42,10 +157,168 @@ def load_data():
     return df
 
 
-def get_data():
-    """Retorna o DataFrame do session_state, ou o carrega se ainda não existir."""
-    if "df" not in st.session_state:
-        from pages.utils.data_loader import load_data
+# ==========================================================
+# SNAPSHOT PRÉ-AQUECIDO
+# ==========================================================
+def source_generation():
+    """Identifica a versão dos arquivos base (mtime + tamanho de cada um)."""
+    stats = [(path, path.stat()) for path in source_files()]
+    if len(stats) == 1:
+        stat = stats[0][1]
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+    digest = hashlib.sha1(
+        "".join(f"{p}:{st.st_mtime_ns}:{st.st_size};" for p, st in stats).encode()
+    )
+    return f"{len(stats)}x-{digest.hexdigest()[:16]}"
+
+
+def read_ledger():
+    """Retorna o registro da ingestão incremental, ou None se não houver."""
+    if not LEDGER_PATH.exists():
+        return None
+    return json.loads(LEDGER_PATH.read_text())
+
+
+def dataset_generation():
+    """Identifica a versão da base: planilha + arquivos incrementais ingeridos.
+
+    Os incrementos só valem sobre a planilha em que foram aplicados; se ela
+    for substituída, a geração volta a ser apenas a da planilha.
+    """
+    generation = source_generation()
+    ledger = read_ledger()
+    if ledger is not None and ledger["base"] == generation and ledger["sequence"]:
+        generation += f"+{ledger['sequence']}"
+    return generation
+
+
+def build_indexes(df):
+    """Pré-calcula as estruturas derivadas que as páginas consultam a cada rerun."""
+    return {
+        "options": {col: sorted(df[col].dropna().unique()) for col in DIMENSIONS},
+        "date_range": (df["date"].min(), df["date"].max()),
+    }
+
+
+def daily_rollup(df):
+    """Soma as medidas por dia (base da série diária e da projeção)."""
+    return df.groupby("date")[MEASURES].sum()
+
+
+def build_snapshot():
+    """Carrega a planilha e os incrementos e monta o snapshot (dados + derivados).
+
+    A base passa pelo perfil de qualidade: as linhas em quarentena ficam fora
+    do snapshot, e as estatísticas de qualidade vão junto com ele.
+    """
+    from pages.utils.ingest import replay_increments
+    from pages.utils.quality import profile, save_quarantine
+
+    generation = dataset_generation()
+    df, quarantine, quality = profile(load_data())
+    save_quarantine(quarantine, "base", source=str(DATA_PATH))
+    df, quality = replay_increments(df, quality)
+    # ordenada por data, os filtros de intervalo viram recortes contíguos
+    df = df.sort_values("date", kind="stable", ignore_index=True)
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "generation": generation,
+        "df": df,
+        "indexes": build_indexes(df),
+        "daily": daily_rollup(df),
+        "quality": quality,
+    }
+
+
+def save_snapshot(snapshot):
+    """Grava o snapshot em disco de forma atômica."""
+    if SNAPSHOT_STORE == "arrow":
+        from pages.utils.shared_store import write_store
+
+        write_store(snapshot)
+        return
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = SNAPSHOT_PATH.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path.replace(SNAPSHOT_PATH)
+
+
+def read_snapshot():
+    """Lê o snapshot gravado pelo prewarm, se ainda corresponder à planilha atual."""
+    if SNAPSHOT_STORE == "arrow":
+        from pages.utils.shared_store import read_store
+
+        return read_store(dataset_generation())
+    if not SNAPSHOT_PATH.exists():
+        return None
+    with open(SNAPSHOT_PATH, "rb") as f:
+        snapshot = pickle.load(f)
+    if (
+        snapshot.get("format") != SNAPSHOT_FORMAT
+        or snapshot.get("generation") != dataset_generation()
+    ):
+        return None
+    return snapshot
+
+
+@timed()
+def load_snapshot():
+    """Lê o snapshot da versão atual do disco ou, se não houver, monta e salva.
+
+    Entre processos, só um monta: os outros esperam a trava e leem o gravado.
+    """
+    snapshot = read_snapshot()
+    if snapshot is not None:
+        return snapshot
+    with file_lock(CACHE_DIR / "snapshot.lock"):
+        snapshot = read_snapshot()
+        if snapshot is None:
+            snapshot = build_snapshot()
+            save_snapshot(snapshot)
+            if SNAPSHOT_STORE == "arrow":
+                # também este processo passa a usar as páginas compartilhadas
+                snapshot = read_snapshot()
+    return snapshot
+
+
+def _serving():
+    """Indica se o processo é o servidor Streamlit (e não um script de linha de comando)."""
+    runtime = sys.modules.get("streamlit.runtime")
+    return runtime is not None and runtime.exists()
+
+
+@timed()
+def get_snapshot():
+    """Retorna o snapshot publicado no processo, carregando-o uma única vez.
+
+    A ordem de preferência é: memória do processo → arquivo do prewarm →
+    leitura completa da planilha (que então é salva para o próximo processo).
+    No servidor, a primeira carga também inicia o observador de `reload.py`,
+    que troca o snapshot quando a base muda, e o monitor de `memory.py`.
+
+    Cada rerun deve chamar esta função (ou `get_backend`) e não guardar o
+    resultado em `st.session_state`, para sempre enxergar a versão publicada.
+    """
+    global _snapshot
+    if _snapshot is None:
+        with _snapshot_lock:
+            if _snapshot is None:
+                _snapshot = load_snapshot()
+                if _serving():
+                    from pages.utils.memory import start_monitor
+                    from pages.utils.reload import start_watcher
+
+                    start_watcher()
+                    start_monitor()
+    return _snapshot
+
+
+def publish_snapshot(snapshot):
+    """Troca atomicamente o snapshot servido pelo processo.
 
-        st.session_state["df"] = load_data()
-    return st.session_state["df"]
+    Reruns em andamento mantêm a referência ao snapshot anterior e terminam
+    sobre ele; a memória é liberada quando a última referência some.
+    """
+    global _snapshot
+    _snapshot = snapshot
@@ -0,0 +1,190 @@
+"""Base particionada por mês, em Parquet, com manifesto.
+
+Layout gravado em `.cache/dataset/`:
+
+    dataset/
+        _manifest.json
+        year=2025/month=07/part-<versão>.parquet
+        year=2025/month=08/part-<versão>.parquet
+        ...
+
+O manifesto guarda a geração da base (e o formato do snapshot que a
+originou), o intervalo de datas de cada partição
+e os índices das páginas (opções dos filtros e intervalo total). Com ele as
+consultas escolhem, antes de abrir qualquer arquivo, só as partições que
+cruzam o intervalo de datas pedido; a barra lateral nem precisa ler dados.
+
+Os arquivos de cada geração têm nome próprio e nunca são sobrescritos: a
+troca de versão é só a troca do manifesto. Os arquivos da versão anterior
+ficam no disco até a próxima atualização, para que consultas em andamento
+terminem sobre os dados que começaram a ler.
+"""
+
+import hashlib
+import json
+
+import pandas as pd
+
+from pages.utils.data_loader import CACHE_DIR, SNAPSHOT_FORMAT, build_indexes
+
+DATASET_DIR = CACHE_DIR / "dataset"
+MANIFEST_NAME = "_manifest.json"
+# row groups menores limitam o que cada thread de leitura segura por vez
+ROW_GROUP_ROWS = 128 * 1024
+
+
+# ==========================================================
+# ESCRITA
+# ==========================================================
+def _file_token(generation):
+    if generation is None:
+        return "0"
+    return hashlib.sha1(generation.encode()).hexdigest()[:12]
+
+
+def arrow_table(df):
+    """Converte para Arrow com as dimensões categóricas como texto.
+
+    O Parquet já codifica por dicionário, e assim todos os leitores (DuckDB,
+    Polars) veem o mesmo tipo.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema = pa.schema(
+        field.with_type(field.type.value_type)
+        if pa.types.is_dictionary(field.type)
+        else field
+        for field in table.schema
+    )
+    return table.cast(schema)
+
+
+def _write_partition(df, path, month, token):
+    """Grava uma partição (atomicamente) e retorna sua entrada no manifesto."""
+    import pyarrow.parquet as pq
+
+    relative = f"year={month.year}/month={month.month:02d}/part-{token}.parquet"
+    target = path / relative
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_suffix(".tmp")
+    pq.write_table(arrow_table(df), tmp_path, row_group_size=ROW_GROUP_ROWS)
+    tmp_path.replace(target)
+    return {
+        "month": str(month),
+        "path": relative,
+        "rows": len(df),
+        "min_date": df["date"].min().isoformat(),
+        "max_date": df["date"].max().isoformat(),
+    }
+
+
+def _write_manifest(path, generation, partitions, indexes):
+    """Publica o novo manifesto e apaga arquivos de versões mais antigas."""
+    previous = read_manifest(path)
+    manifest = {
+        "generation": generation,
+        "format": SNAPSHOT_FORMAT,
+        "partitions": sorted(partitions, key=lambda p: p["month"]),
+        "options": indexes["options"],
+        "date_range": [d.isoformat() for d in indexes["date_range"]],
+    }
+    tmp_path = path / (MANIFEST_NAME + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, default=str))
+    tmp_path.replace(path / MANIFEST_NAME)
+
+    # a versão anterior continua legível por quem ainda a consulta
+    keep = {p["path"] for p in manifest["partitions"]}
+    if previous is not None:
+        keep |= {p["path"] for p in previous["partitions"]}
+    for file in path.glob("year=*/month=*/part-*.parquet"):
+        if file.relative_to(path).as_posix() not in keep:
+            file.unlink(missing_ok=True)
+    for month_dir in path.glob("year=*/month=*"):
+        if not any(month_dir.iterdir()):
+            month_dir.rmdir()
+
+
+def write_dataset(df, path=DATASET_DIR, generation=None):
+    """Grava a base inteira particionada por mês e publica o novo manifesto."""
+    path.mkdir(parents=True, exist_ok=True)
+    token = _file_token(generation)
+    partitions = [
+        _write_partition(part, path, month, token)
+        for month, part in df.groupby(df["date"].dt.to_period("M"), sort=True)
+    ]
+    _write_manifest(path, generation, partitions, build_indexes(df))
+
+
+def update_dataset(df, months, indexes, path=DATASET_DIR, generation=None):
+    """Regrava só as partições dos meses afetados e atualiza o manifesto.
+
+    `df` é a base completa, ordenada por data: cada mês é obtido por busca
+    binária, sem percorrer o resto do histórico.
+    """
+    manifest = read_manifest(path)
+    if manifest is None:
+        return write_dataset(df, path, generation)
+
+    token = _file_token(generation)
+    dates = df["date"].to_numpy()
+    partitions = {p["month"]: p for p in manifest["partitions"]}
+    for month in months:
+        lo = dates.searchsorted(month.start_time.to_datetime64())
+        hi = dates.searchsorted((month + 1).start_time.to_datetime64())
+        if hi > lo:
+            partitions[str(month)] = _write_partition(
+                df.iloc[lo:hi], path, month, token
+            )
+        else:
+            partitions.pop(str(month), None)
+    _write_manifest(path, generation, partitions.values(), indexes)
+
+
+# ==========================================================
+# LEITURA
+# ==========================================================
+def read_manifest(path=DATASET_DIR):
+    """Retorna o manifesto da base particionada, ou None se ainda não existir."""
+    manifest_path = path / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    return json.loads(manifest_path.read_text())
+
+
+def is_current(manifest, generation):
+    """Se o manifesto descreve `generation` no formato atual do snapshot.
+
+    Uma mudança de formato (ex.: a quarentena passando a remover linhas) muda
+    o conteúdo da base sem mudar a geração da planilha.
+    """
+    return (
+        manifest is not None
+        and manifest["generation"] == generation
+        and manifest.get("format") == SNAPSHOT_FORMAT
+    )
+
+
+def manifest_indexes(manifest):
+    """Converte os índices do manifesto para o formato de `build_indexes`."""
+    return {
+        "options": manifest["options"],
+        "date_range": tuple(pd.Timestamp(d) for d in manifest["date_range"]),
+    }
+
+
+def partition_files(manifest, path=DATASET_DIR, start=None, end=None):
+    """Lista os arquivos das partições que cruzam [start, end).
+
+    Sempre devolve ao menos um arquivo, para que o leitor conheça o esquema;
+    quando nenhuma partição cruza o intervalo, o próprio filtro de data da
+    consulta devolve um resultado vazio.
+    """
+    partitions = manifest["partitions"]
+    selected = [
+        p
+        for p in partitions
+        if (start is None or pd.Timestamp(p["max_date"]) >= start)
+        and (end is None or pd.Timestamp(p["min_date"]) < end)
+    ]
+    return [str(path / p["path"]) for p in selected or partitions[:1]]
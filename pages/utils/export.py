@@ -0,0 +1,223 @@
+"""Exportação em lotes das linhas filtradas e das tabelas agregadas.
+
+Os dados chegam a `write_export` um lote Arrow por vez (`iter_batches` dos
+backends ou fatias de uma tabela já agregada) e vão direto para o arquivo: o
+CSV é anexado lote a lote e o Parquet ganha um row group por lote. Os lotes
+não passam por pandas, e o pico de memória depende do tamanho do lote, não
+do tamanho da exportação.
+
+Nas páginas, `export_panel` grava o arquivo em `.cache/exports/` e, se ele
+couber em `EXPORT_DOWNLOAD_MB`, oferece também o botão de download. Esse
+botão leva o arquivo inteiro para a memória da sessão, então só aparece no
+rerun em que o arquivo foi gerado ou em que o download foi pedido ("Preparar
+download"), e não a cada troca de filtro. Exportações maiores ficam no
+disco, com o caminho indicado na página. Fora do Streamlit:
+
+    python -m pages.utils.export agosto.parquet --start 2025-08-01 --end 2025-08-31
+    python -m pages.utils.export ton.csv --bot "Bot Ton" --topic Pix
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from pages.utils.data_loader import CACHE_DIR, DIMENSIONS, get_snapshot
+from pages.utils.dataset import arrow_table
+from pages.utils.query import BATCH_ROWS, Filters, get_backend
+
+EXPORT_DIR = CACHE_DIR / "exports"
+# maior arquivo oferecido como download direto (o resto fica no disco)
+EXPORT_DOWNLOAD_MB = float(os.environ.get("EXPORT_DOWNLOAD_MB", "100"))
+# exportações mais antigas que isso são apagadas na próxima gravação
+EXPORT_MAX_AGE_HOURS = 24
+
+FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+
+# ==========================================================
+# ESCRITA EM LOTES
+# ==========================================================
+def iter_frame(df, batch_size=BATCH_ROWS):
+    """Fatias de uma tabela já em memória, no formato de `iter_batches`."""
+    for lo in range(0, max(len(df), 1), batch_size):
+        yield arrow_table(df.iloc[lo : lo + batch_size])
+
+
+def _csv_table(table):
+    """A coluna `date` guarda dias: no CSV sai como AAAA-MM-DD, sem horário."""
+    import pyarrow as pa
+
+    index = table.schema.get_field_index("date")
+    if index >= 0 and pa.types.is_timestamp(table.schema.field(index).type):
+        table = table.set_column(index, "date", table["date"].cast(pa.date32()))
+    return table
+
+
+def write_export(batches, path, fmt=None):
+    """Grava os lotes Arrow em `path` (CSV ou Parquet) e retorna o número de linhas.
+
+    O formato vem da extensão quando `fmt` não é informado. O arquivo só
+    aparece com o nome final depois de completo: cada gravação usa um
+    temporário próprio na mesma pasta, então duas sessões exportando o mesmo
+    arquivo não se misturam.
+    """
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    fmt = fmt or path.suffix.lstrip(".")
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato de exportação desconhecido: {fmt!r}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    ) as tmp:
+        tmp_path = Path(tmp.name)
+
+    rows, writer, schema = 0, None, None
+    try:
+        try:
+            for table in batches:
+                if fmt == "csv":
+                    table = _csv_table(table)
+                if writer is None:
+                    schema = table.schema
+                    writer = (
+                        pa_csv.CSVWriter(tmp_path, schema)
+                        if fmt == "csv"
+                        else pq.ParquetWriter(tmp_path, schema)
+                    )
+                elif table.schema != schema:
+                    # ex.: lote só com nulos numa coluna de texto: segue o 1º lote
+                    table = table.cast(schema)
+                if fmt == "csv":
+                    writer.write_table(table)
+                else:
+                    # um row group por lote
+                    writer.write_table(table, row_group_size=max(len(table), 1))
+                rows += len(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        tmp_path.replace(path)
+    finally:
+        # sem efeito depois do replace; numa falha, não sobra temporário
+        tmp_path.unlink(missing_ok=True)
+    return rows
+
+
+# ==========================================================
+# PAINEL DAS PÁGINAS
+# ==========================================================
+def _prune(directory, max_age_hours):
+    cutoff = time.time() - max_age_hours * 3600
+    for file in directory.glob("*.*"):
+        if file.stat().st_mtime < cutoff:
+            file.unlink(missing_ok=True)
+
+
+def _export_path(name, fmt, content_key):
+    """Arquivo da exportação: mesmo conteúdo, formato e base → mesmo nome."""
+    key = f"{get_snapshot()['generation']}|{name}|{fmt}|{content_key}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    return EXPORT_DIR / f"{name}-{digest}.{fmt}"
+
+
+def export_panel(backend, filters, tables=None, name="dados", rows=True):
+    """Expander para exportar as linhas filtradas ou uma das tabelas da página.
+
+    `tables` mapeia o rótulo de cada tabela agregada da página ao DataFrame.
+    Com `rows=False`, só as tabelas: é o painel de uma seção em fragmento,
+    chamado dentro dela para exportar a tabela que está na tela.
+    """
+    tables = tables or {}
+    raw_label = "Linhas filtradas (base completa)"
+    options = [raw_label, *tables] if rows else list(tables)
+
+    with st.expander("📥 Exportar dados"):
+        col1, col2 = st.columns([3, 1])
+        choice = col1.selectbox("Conteúdo", options, key=f"export_content_{name}")
+        fmt = col2.radio(
+            "Formato",
+            list(FORMATS),
+            format_func=str.upper,
+            horizontal=True,
+            key=f"export_format_{name}",
+        )
+
+        if choice == raw_label:
+            slug, content_key = "linhas", repr(filters)
+        else:
+            # tabelas pequenas: o próprio conteúdo identifica a versão
+            slug = re.sub(r"\W+", "-", choice.lower()).strip("-")
+            content_key = pd.util.hash_pandas_object(tables[choice]).sum()
+        path = _export_path(f"{name}-{slug}", fmt, content_key)
+        requested = False
+        if not path.exists() and st.button("Gerar arquivo", key=f"export_{name}"):
+            batches = (
+                backend.iter_batches(filters)
+                if choice == raw_label
+                else iter_frame(tables[choice])
+            )
+            with st.spinner("Gravando em lotes..."):
+                _prune(EXPORT_DIR, EXPORT_MAX_AGE_HOURS)
+                write_export(batches, path, fmt)
+            requested = True
+
+        if not path.exists():
+            return
+        size_mb = path.stat().st_size / 1e6
+        if size_mb > EXPORT_DOWNLOAD_MB:
+            st.info(
+                f"Arquivo de {size_mb:,.0f} MB gravado em `{path}` "
+                f"(acima do limite de download de {EXPORT_DOWNLOAD_MB:,.0f} MB)."
+            )
+            return
+        # o download_button lê o arquivo para a memória da sessão: só no rerun
+        # em que foi pedido, não a cada filtro, fragmento ou recarregamento
+        requested = requested or st.button(
+            f"Preparar download ({size_mb:,.1f} MB)", key=f"export_prepare_{name}"
+        )
+        if requested:
+            with open(path, "rb") as f:
+                st.download_button(
+                    f"⬇️ Baixar {fmt.upper()} ({size_mb:,.1f} MB)",
+                    f,
+                    file_name=f"{name}-{slug}.{fmt}",
+                    mime=FORMATS[fmt],
+                    on_click="ignore",
+                    key=f"export_download_{name}",
+                )
+
+
+# ==========================================================
+# LINHA DE COMANDO
+# ==========================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path, help="arquivo de saída (.csv ou .parquet)")
+    parser.add_argument("--start", help="primeiro dia (AAAA-MM-DD)")
+    parser.add_argument("--end", help="último dia (AAAA-MM-DD)")
+    for dim in DIMENSIONS:
+        parser.add_argument(f"--{dim}", action="append", default=[])
+    args = parser.parse_args()
+
+    filters = Filters(
+        start_date=args.start,
+        end_date=args.end,
+        **{dim: tuple(getattr(args, dim)) for dim in DIMENSIONS},
+    )
+    start = time.perf_counter()
+    rows = write_export(get_backend().iter_batches(filters), args.path)
+    print(f"{rows:,} linhas em {args.path} ({time.perf_counter() - start:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
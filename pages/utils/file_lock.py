@@ -0,0 +1,38 @@
+"""Trava entre processos para o trabalho caro feito uma vez por geração da base.
+
+Com vários workers (`serve.py`), todos encontram o cache em disco vazio ao
+mesmo tempo depois de uma troca de geração: sem trava, cada um montaria o
+snapshot, as partições e a projeção por conta própria e gravaria por cima
+dos outros. Com ela, o primeiro calcula e grava; os demais esperam e leem o
+resultado do disco:
+
+    with file_lock(CACHE_DIR / "snapshot.lock"):
+        snapshot = read_snapshot()
+        if snapshot is None:
+            ...
+
+A trava é um `flock` no arquivo `path`, liberado pelo sistema se o processo
+morrer. Sem `fcntl` (Windows) só há um processo servindo, e ela não faz nada.
+"""
+
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path):
+    """Segura a trava exclusiva de `path` durante o bloco `with`."""
+    if fcntl is None:
+        yield
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,159 @@
+import pandas as pd
+import streamlit as st
+
+from pages.utils.data_loader import DIMENSIONS
+from pages.utils.query import Filters
+from pages.utils.timing import annotate, timed
+
+FILTER_LABELS = {
+    "bot": "Bot",
+    "tech": "Tech",
+    "font": "Fonte",
+    "topic": "Tópico",
+    "subject": "Assunto",
+}
+# parâmetros da URL: os mesmos da API (`api.py`)
+DATE_PARAMS = ("start", "end")
+URL_PARAMS = {*DATE_PARAMS, *DIMENSIONS}
+# filtros lidos da URL na primeira execução de cada página da sessão
+URL_STATE_KEY = "_filtros_da_url"
+
+
+# ==========================================================
+# ESTADO NA URL
+# ==========================================================
+def _clip_day(day, min_date, max_date):
+    day = pd.Timestamp(day)
+    if pd.isna(day):
+        raise ValueError("data vazia")
+    return min(max(day, min_date), max_date).date()
+
+
+def filter_params(filters, date_range):
+    """Parâmetros da URL de `filters`, em forma canônica.
+
+    Os nomes são os da API: `start`/`end` como AAAA-MM-DD (omitidos quando
+    são os limites da base) e um parâmetro por valor de cada dimensão, em
+    ordem alfabética. Os mesmos filtros dão sempre a mesma URL.
+    """
+    params = {}
+    days = (filters.start_date, filters.end_date)
+    for name, day, bound in zip(DATE_PARAMS, days, date_range):
+        if day is not None and pd.Timestamp(day) != pd.Timestamp(bound):
+            params[name] = pd.Timestamp(day).date().isoformat()
+    for dim in DIMENSIONS:
+        values = getattr(filters, dim)
+        if values:
+            params[dim] = sorted(map(str, values))
+    return params
+
+
+def filters_from_params(params, indexes, dimensions):
+    """`Filters` pedido em `params` ({nome: [valores]}, como na URL).
+
+    Datas inválidas e valores fora das opções são ignorados; as datas ficam
+    dentro do intervalo da base.
+    """
+    min_date, max_date = indexes["date_range"]
+    days = []
+    for name, default in zip(DATE_PARAMS, (min_date, max_date)):
+        values = params.get(name) or [default]
+        try:
+            days.append(_clip_day(values[-1], min_date, max_date))
+        except ValueError:
+            days.append(pd.Timestamp(default).date())
+    start_date, end_date = sorted(days)
+
+    selections = {}
+    for dim in dimensions:
+        options = {str(option): option for option in indexes["options"][dim]}
+        selections[dim] = tuple(
+            sorted({options[v] for v in params.get(dim, []) if v in options}, key=str)
+        )
+    return Filters(start_date=start_date, end_date=end_date, **selections)
+
+
+def url_filters(indexes, dimensions):
+    """Filtros da URL com que a página foi aberta nesta sessão.
+
+    São os valores iniciais dos widgets, que não podem mudar a cada rerun (o
+    Streamlit recriaria o widget e perderia a seleção): a URL é lida uma vez
+    por página e guardada na sessão.
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    page = ctx.page_script_hash if ctx is not None else ""
+    opened = st.session_state.setdefault(URL_STATE_KEY, {})
+    if page not in opened:
+        params = {key: st.query_params.get_all(key) for key in st.query_params}
+        opened[page] = filters_from_params(params, indexes, dimensions)
+    return opened[page]
+
+
+def sync_url(filters, date_range):
+    """Grava `filters` na URL quando mudam, mantendo os outros parâmetros."""
+    params = filter_params(filters, date_range)
+    current = {key: st.query_params.get_all(key) for key in st.query_params}
+    wanted = {
+        key: value if isinstance(value, list) else [value]
+        for key, value in params.items()
+    }
+    if {k: v for k, v in current.items() if k in URL_PARAMS} == wanted:
+        return
+    others = {k: v for k, v in current.items() if k not in URL_PARAMS}
+    st.query_params.from_dict({**params, **others})
+
+
+# ==========================================================
+# BARRA LATERAL
+# ==========================================================
+@timed()
+def sidebar_filters(indexes, dimensions=("bot", "tech", "font"), labels=None):
+    """Desenha os filtros da sidebar e retorna o `Filters` selecionado.
+
+    Os valores iniciais vêm da URL, e a seleção volta para ela a cada rerun:
+    uma visão pode ser salva nos favoritos ou enviada a outro analista. O
+    `Filters` sai em forma canônica (valores em ordem alfabética), a mesma
+    chave no cache de resultados para a mesma seleção.
+    """
+    labels = {**FILTER_LABELS, **(labels or {})}
+
+    st.sidebar.header("Filtros")
+
+    min_date, max_date = indexes["date_range"]
+    initial = url_filters(indexes, dimensions)
+
+    # --- Filtro de Data com fallback seguro ---
+    date_selection = st.sidebar.date_input(
+        "Selecione o intervalo",
+        # a base pode ter mudado desde que a URL foi lida
+        value=(
+            _clip_day(initial.start_date, min_date, max_date),
+            _clip_day(initial.end_date, min_date, max_date),
+        ),
+        min_value=min_date,
+        max_value=max_date,
+    )
+    # Corrige o caso em que o usuário seleciona apenas uma data
+    if isinstance(date_selection, tuple) and len(date_selection) == 2:
+        start_date, end_date = date_selection
+    elif isinstance(date_selection, tuple) and date_selection:
+        start_date = end_date = date_selection[0]
+    else:
+        start_date = end_date = date_selection
+
+    selections = {}
+    for dim in dimensions:
+        options = indexes["options"][dim]
+        allowed = set(options)
+        selected = st.sidebar.multiselect(
+            labels[dim],
+            options,
+            default=[value for value in getattr(initial, dim) if value in allowed],
+        )
+        selections[dim] = tuple(sorted(selected, key=str))
+    filters = Filters(start_date=start_date, end_date=end_date, **selections)
+    sync_url(filters, indexes["date_range"])
+    annotate(filters=filters)
+    return filters
@@ -0,0 +1,121 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.lazy_imports import deterministic_terms, sarimax
+from pages.utils.result_cache import disk_cached
+from pages.utils.timing import timed
+
+FORECAST_END = "2025-12-31"
+
+
+# ==========================================================
+# SÉRIE DIÁRIA
+# ==========================================================
+def daily_series(daily):
+    """Calcula as taxas usadas na projeção a partir da soma diária do snapshot."""
+    df_daily = daily[["sessions_total", "session_retained"]].sort_index()
+    df_daily["retention_rate"] = (
+        df_daily["session_retained"] / df_daily["sessions_total"]
+    ).fillna(0)
+    df_daily["loss_rate"] = 1 - df_daily["retention_rate"]
+    return df_daily
+
+
+# ==========================================================
+# FUNÇÃO DE MODELAGEM — SARIMAX + COMPONENTES FOURIER
+# ==========================================================
+@timed()
+def forecast_with_fourier(series, steps):
+    """
+    Ajusta SARIMAX com componentes Fourier para sazonalidade anual (~365 dias)
+    e semanal (~7 dias).
+    Retorna a média prevista e intervalo de confiança.
+    """
+    CalendarFourier, DeterministicProcess = deterministic_terms()
+    SARIMAX = sarimax()
+
+    series = series.asfreq("D")
+
+    # o statsmodels emite avisos de convergência e de depreciação a cada ajuste
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        fourier = CalendarFourier(freq="A", order=6)
+
+        dp = DeterministicProcess(
+            index=series.index,
+            constant=True,
+            order=1,
+            seasonal=True,
+            additional_terms=[fourier],
+            drop=True,
+        )
+
+        X = dp.in_sample()
+        X_fore = dp.out_of_sample(steps=steps)
+
+        model = SARIMAX(
+            series,
+            exog=X,
+            order=(1, 1, 1),
+            seasonal_order=(1, 1, 1, 7),
+            enforce_stationarity=False,
+            enforce_invertibility=False,
+        )
+        results = model.fit(disp=False)
+    forecast = results.get_forecast(steps=steps, exog=X_fore)
+    mean_forecast = forecast.predicted_mean
+    conf_int = forecast.conf_int()
+    return mean_forecast, conf_int
+
+
+# ==========================================================
+# MODELAGEM E PROJEÇÃO
+# ==========================================================
+def build_projection(df_daily, end=FORECAST_END):
+    """Projeta sessões, retenção e perda do dia seguinte ao histórico até `end`."""
+    last_date = df_daily.index.max()
+    future_dates = pd.date_range(
+        start=last_date + pd.Timedelta(days=1), end=end, freq="D"
+    )
+    n_steps = len(future_dates)
+
+    sess_forecast, sess_conf = forecast_with_fourier(
+        df_daily["sessions_total"], n_steps
+    )
+    ret_forecast, ret_conf = forecast_with_fourier(df_daily["retention_rate"], n_steps)
+    loss_forecast, loss_conf = forecast_with_fourier(df_daily["loss_rate"], n_steps)
+
+    sess_forecast = np.clip(sess_forecast, 0, None)
+    ret_forecast = np.clip(ret_forecast, 0, 1)
+    loss_forecast = np.clip(loss_forecast, 0, 1)
+
+    return pd.DataFrame(
+        {
+            "date": future_dates,
+            "sessions_total": sess_forecast,
+            "retention_rate": ret_forecast,
+            "loss_rate": loss_forecast,
+            "sess_lower": sess_conf.iloc[:, 0].values,
+            "sess_upper": sess_conf.iloc[:, 1].values,
+            "ret_lower": ret_conf.iloc[:, 0].values,
+            "ret_upper": ret_conf.iloc[:, 1].values,
+            "loss_lower": loss_conf.iloc[:, 0].values,
+            "loss_upper": loss_conf.iloc[:, 1].values,
+        }
+    ).set_index("date")
+
+
+@timed()
+@disk_cached(ttl=None)
+def get_projection(df_daily, generation):
+    """Retorna a projeção de uma versão da base, calculada uma única vez.
+
+    Fica no cache de resultados (`result_cache.py`) até a base mudar — a
+    geração ou o formato do snapshot, que muda com as regras da quarentena:
+    uma projeção das linhas de antes da quarentena não é servida depois
+    dela. O prewarm e o recarregamento a calculam antes do primeiro acesso,
+    e as páginas, os outros workers e a API leem a mesma entrada.
+    """
+    return build_projection(df_daily)
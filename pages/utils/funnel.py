@@ -0,0 +1,75 @@
+"""Funil de atendimento por segmento: totais → retidas → não resolvidas.
+
+Uma única agregação no backend traz o cubo de segmentos bot × tecnologia ×
+fonte × tópico. Todos os níveis — o funil geral, o funil de cada dimensão, o
+detalhamento de um segmento — somam as medidas das células do cubo, sem
+voltar às linhas. A perda (sessões não retidas, nunca negativa) é calculada
+depois da soma, no nível exibido: ela é sempre total − retidas daquele
+nível, como no funil diário, mesmo quando alguma célula tem mais retidas
+que sessões.
+
+Sessões sem tópico entram no cubo com o rótulo `NO_TOPIC`, para que os
+totais do funil continuem iguais aos das outras páginas.
+"""
+
+import numpy as np
+
+from pages.utils.data_loader import MEASURES
+from pages.utils.summaries import cached_aggregate
+from pages.utils.timing import timed
+
+FUNNEL_DIMENSIONS = ["bot", "tech", "font", "topic"]
+FUNNEL_RATES = ["retention_rate", "human_request_rate", "loss_rate"]
+NO_TOPIC = "Sem tópico"
+
+
+@timed()
+def funnel_cube(backend, filters):
+    """Funil de cada segmento bot × tecnologia × fonte × tópico, numa só agregação."""
+    cube = cached_aggregate(
+        backend, filters, by=FUNNEL_DIMENSIONS, dropna=False
+    )
+    cube["topic"] = cube["topic"].fillna(NO_TOPIC)
+    return cube
+
+
+def funnel_rates(df):
+    """Acrescenta a perda e as taxas do funil (NaN quando não há sessões)."""
+    total = df["sessions_total"].where(df["sessions_total"] != 0)
+    loss = (df["sessions_total"] - df["session_retained"]).clip(lower=0)
+    return df.assign(
+        loss_count=loss,
+        retention_rate=df["session_retained"] / total,
+        human_request_rate=df["sessions_human_assistance"] / total,
+        loss_rate=loss / total,
+    )
+
+
+def rollup(cube, by=()):
+    """Funis por `by` (vazio = funil geral), somando as células do cubo."""
+    by = list(by)
+    if by:
+        result = cube.groupby(by, as_index=False, sort=True)[MEASURES].sum()
+    else:
+        result = cube[MEASURES].sum().to_frame().T
+    return funnel_rates(result)
+
+
+def drill_down(cube, segment, by):
+    """Funis por `by` dentro de `segment` ({dimensão: valor})."""
+    mask = np.ones(len(cube), dtype=bool)
+    for dim, value in segment.items():
+        mask &= (cube[dim] == value).to_numpy()
+    return rollup(cube[mask], by)
+
+
+@timed()
+def daily_funnel(backend, filters):
+    """Retidas e não resolvidas por dia, com as duas taxas."""
+    df = cached_aggregate(
+        backend, filters, by=["date"], measures=["sessions_total", "session_retained"]
+    )
+    df["loss_count"] = (df["sessions_total"] - df["session_retained"]).clip(lower=0)
+    df["retention_rate"] = df["session_retained"] / df["sessions_total"]
+    df["loss_rate"] = df["loss_count"] / df["sessions_total"]
+    return df
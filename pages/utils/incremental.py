@@ -0,0 +1,158 @@
+"""Agregação incremental quando um filtro de múltipla escolha muda.
+
+Nas páginas 5 e 9, a interação mais comum é acrescentar ou tirar um tópico
+da seleção, e cada troca refiltrava a base inteira para refazer as mesmas
+somas. Quando duas consultas seguidas da mesma sessão, com o mesmo formato
+(agrupamento, medidas, `dropna`), diferem só numa dimensão D, a segunda
+guarda as **parciais** de D: a agregação por `[*by, D]` com os outros
+filtros e sem filtro em D. Dali em diante, qualquer seleção em D é
+respondida somando as parciais dos valores selecionados (todas, com a
+seleção vazia) — poucas centenas de linhas em vez de milhões.
+
+O resultado é idêntico ao do backend: as medidas são inteiras (a soma não
+depende da ordem), a ordem das linhas é a do agrupamento do backend (as
+parciais já vêm ordenadas por `by` e depois por D), as linhas com chave
+nula seguem `dropna` e as taxas são calculadas por `add_rates`, como no
+backend. Por isso só o `PandasBackend`, com geração conhecida e medidas
+inteiras, usa o modo incremental; os outros casos vão direto ao backend.
+
+As parciais ficam num LRU do processo com `INCREMENTAL_ENTRIES` entradas
+(padrão 32), descartadas quando a base muda (`release_stale`).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+
+import pandas as pd
+
+from pages.utils.data_loader import DIMENSIONS, MEASURES
+from pages.utils.query import PandasBackend, add_rates
+from pages.utils.timing import span
+
+INCREMENTAL_ENTRIES = int(os.environ.get("INCREMENTAL_ENTRIES", "32"))
+# última consulta de cada formato em cada sessão
+PREVIOUS_ENTRIES = 1024
+
+_partials = OrderedDict()
+_previous = OrderedDict()
+_lock = threading.Lock()
+
+
+# ==========================================================
+# ESTADO
+# ==========================================================
+def _remember(cache, key, value, limit):
+    with _lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
+
+
+def _lookup(cache, key):
+    with _lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _session():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+def release_stale(generation):
+    """Descarta as parciais e consultas de outras gerações da base."""
+    with _lock:
+        for cache in (_partials, _previous):
+            for key in [key for key in cache if key[0][1] != generation]:
+                del cache[key]
+
+
+def inventory():
+    """Parciais guardadas: [(geração, dimensão, DataFrame)]."""
+    with _lock:
+        return [(key[0][1], key[1], df) for key, df in _partials.items()]
+
+
+# ==========================================================
+# PARCIAIS
+# ==========================================================
+def changed_dimension(previous, filters):
+    """A única dimensão em que `filters` difere de `previous`, ou None."""
+    if previous is None or previous.date_bounds() != filters.date_bounds():
+        return None
+    changed = [
+        dim for dim in DIMENSIONS if getattr(previous, dim) != getattr(filters, dim)
+    ]
+    return changed[0] if len(changed) == 1 else None
+
+
+def build_partials(backend, filters, dim, by, measures):
+    """Soma por `[*by, dim]` sem o filtro em `dim` (com os nulos de `dim`)."""
+    keys = by if dim in by else [*by, dim]
+    return backend.aggregate(
+        replace(filters, **{dim: ()}), by=keys, measures=measures, dropna=False
+    )
+
+
+def combine(partials, dim, selected, by, measures, dropna):
+    """Soma as parciais dos valores `selected` de `dim` (todas, se vazio)."""
+    rows = partials[partials[dim].isin(selected)] if selected else partials
+    if not by:
+        return pd.DataFrame({m: [rows[m].sum()] for m in measures})
+    # sort=False: as parciais já estão na ordem do agrupamento do backend
+    result = rows.groupby(by, as_index=False, dropna=dropna, sort=False)[
+        measures
+    ].sum()
+    return result.reset_index(drop=True)
+
+
+# ==========================================================
+# CONSULTA
+# ==========================================================
+def supports(backend, measures):
+    return (
+        isinstance(backend, PandasBackend)
+        and getattr(backend, "generation", None) is not None
+        and all(pd.api.types.is_integer_dtype(backend.df[m]) for m in measures)
+    )
+
+
+def incremental_aggregate(
+    backend, filters, by=(), measures=MEASURES, rates=(), dropna=True
+):
+    """`backend.aggregate`, respondido pelas parciais quando possível."""
+    by, measures = list(by), list(measures)
+    if not supports(backend, measures):
+        return backend.aggregate(
+            filters, by=by, measures=measures, rates=rates, dropna=dropna
+        )
+
+    shape = (backend.name, backend.generation, tuple(by), tuple(measures), dropna)
+    session_key = (shape, _session())
+    previous = _lookup(_previous, session_key)
+    _remember(_previous, session_key, filters, PREVIOUS_ENTRIES)
+
+    for dim in DIMENSIONS:
+        key = (shape, dim, replace(filters, **{dim: ()}))
+        partials = _lookup(_partials, key)
+        if partials is None and dim == changed_dimension(previous, filters):
+            with span("parciais", dimension=dim):
+                partials = build_partials(backend, filters, dim, by, measures)
+            _remember(_partials, key, partials, INCREMENTAL_ENTRIES)
+        if partials is not None:
+            with span("aggregate incremental", dimension=dim):
+                result = combine(
+                    partials, dim, getattr(filters, dim), by, measures, dropna
+                )
+            return add_rates(result, rates)
+
+    return backend.aggregate(
+        filters, by=by, measures=measures, rates=rates, dropna=dropna
+    )
@@ -0,0 +1,312 @@
+"""Ingestão incremental de exportações diárias ou mensais.
+
+Em vez de substituir a planilha e reprocessar todo o histórico, novos
+arquivos de exportação (Excel, CSV ou Parquet) são aplicados sobre a base
+atual:
+
+    python -m pages.utils.ingest exports/2025-10-01.xlsx exports/2025-10.csv
+    python -m pages.utils.ingest --status
+
+Cada arquivo passa pela mesma normalização de `load_data` e é a versão
+oficial dos dias que contém:
+
+- dias depois da marca d'água (a maior data já ingerida) são só anexados;
+- em dias até a marca d'água, cada linha substitui as que a base já tinha
+  com a mesma chave natural (dia, bot, tecnologia, fonte, tópico e assunto);
+  as outras linhas do dia continuam, então exportações parciais do mesmo dia
+  (um bot por arquivo, por exemplo) se somam. Só esses dias são
+  reprocessados.
+
+Cada arquivo passa pelo perfil de qualidade (`quality.py`): linhas inválidas
+vão para a quarentena e não entram na base.
+
+Os derivados são atualizados por delta: a soma diária é recalculada só nos
+dias do arquivo, as estatísticas de qualidade recebem as contagens do
+arquivo (menos as das linhas substituídas), as opções dos filtros recebem
+os valores novos e, na base particionada, só os meses afetados são
+regravados. Em seguida o prewarm reaquece o backend e a projeção a partir
+da soma diária.
+
+O registro em `ingest/ledger.json` guarda a marca d'água e os arquivos
+aplicados (um arquivo repetido é ignorado). Os incrementos ficam em
+`ingest/increments/`, para que `build_snapshot` reconstrua a base do zero
+quando preciso. `INGEST_DIR` muda esse diretório, que fica fora do
+`CACHE_DIR`: apagar o cache não perde nada ingerido. Substituir a planilha
+base descarta os incrementos.
+"""
+
+import argparse
+import hashlib
+import json
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.data_loader import (
+    DIMENSIONS,
+    INGEST_DIR,
+    LEDGER_PATH,
+    SNAPSHOT_FORMAT,
+    build_indexes,
+    concat_normalized,
+    daily_rollup,
+    get_snapshot,
+    load_file,
+    read_ledger,
+    save_snapshot,
+    source_generation,
+)
+from pages.utils.dataset import (
+    is_current,
+    read_manifest,
+    update_dataset,
+    write_dataset,
+)
+from pages.utils.quality import (
+    QUARANTINE_DIR,
+    profile,
+    update_counts,
+    save_quarantine,
+)
+
+INCREMENTS_DIR = INGEST_DIR / "increments"
+# identifica uma linha da exportação: um incremento a substitui por inteiro
+NATURAL_KEY = ["date", *DIMENSIONS]
+
+
+# ==========================================================
+# LEITURA E APLICAÇÃO DE INCREMENTOS
+# ==========================================================
+def file_fingerprint(path):
+    """Hash do conteúdo, para não aplicar o mesmo arquivo duas vezes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def restated_rows(df, delta):
+    """Máscara das linhas de `df` cuja chave natural aparece em `delta`.
+
+    Só os dias de `delta` são comparados; chaves nulas (sem tópico, por
+    exemplo) casam entre si.
+    """
+    mask = np.zeros(len(df), dtype=bool)
+    overlap = np.flatnonzero(df["date"].isin(delta["date"].unique()).to_numpy())
+    if len(overlap):
+        keys = delta[NATURAL_KEY].drop_duplicates()
+        merged = df.iloc[overlap][NATURAL_KEY].merge(keys, how="left", indicator=True)
+        mask[overlap[merged["_merge"].eq("both").to_numpy()]] = True
+    return mask
+
+
+def apply_increment(df, delta, restated=None):
+    """Aplica um incremento normalizado sobre a base ordenada por data.
+
+    As linhas da base com uma chave natural presente em `restated` (por
+    padrão, o próprio `delta`) são descartadas e substituídas pelas do
+    incremento; as demais linhas dos mesmos dias continuam. Dias novos são
+    apenas anexados. Retorna a base e as linhas substituídas.
+    """
+    restated = delta if restated is None else restated
+    replaced = df.iloc[:0]
+    if len(df) and len(restated) and restated["date"].min() <= df["date"].iloc[-1]:
+        mask = restated_rows(df, restated)
+        df, replaced = df[~mask], df[mask]
+    df = concat_normalized([df, delta])
+    if not df["date"].is_monotonic_increasing:
+        df = df.sort_values("date", kind="stable", ignore_index=True)
+    return df, replaced
+
+
+def replay_increments(df, quality):
+    """Reaplica, em ordem, os incrementos registrados sobre a planilha base.
+
+    Retorna a base e as estatísticas de qualidade atualizadas.
+    """
+    ledger = read_ledger()
+    if ledger is None or ledger["base"] != source_generation():
+        return df, quality
+    df = df.sort_values("date", kind="stable", ignore_index=True)
+    for source in ledger["sources"]:
+        delta = pd.read_parquet(INCREMENTS_DIR / source["file"])
+        clean, quarantine, stats = profile(delta)
+        # a quarentena fica no cache: é refeita junto com o snapshot
+        save_quarantine(quarantine, Path(source["file"]).stem, source["source"])
+        df, replaced = apply_increment(df, clean, delta)
+        quality = update_counts(quality, stats, replaced)
+    return df, quality
+
+
+def merge_indexes(indexes, delta):
+    """Acrescenta aos índices os valores e datas de um incremento só com dias novos."""
+    options = {
+        dim: sorted(set(indexes["options"][dim]) | set(delta[dim].dropna().unique()))
+        for dim in DIMENSIONS
+    }
+    lo, hi = indexes["date_range"]
+    return {
+        "options": options,
+        "date_range": (min(lo, delta["date"].min()), max(hi, delta["date"].max())),
+    }
+
+
+# ==========================================================
+# INGESTÃO
+# ==========================================================
+def write_ledger(ledger):
+    INGEST_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = LEDGER_PATH.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(ledger, indent=2))
+    tmp_path.replace(LEDGER_PATH)
+
+
+def ingest(paths):
+    """Aplica as exportações em `paths` e atualiza snapshot, partições e registro.
+
+    Retorna um relatório por arquivo (linhas, dias novos, dias reprocessados).
+    """
+    base = source_generation()
+    ledger = read_ledger()
+    if ledger is None or ledger["base"] != base:
+        shutil.rmtree(INCREMENTS_DIR, ignore_errors=True)
+        for path in QUARANTINE_DIR.glob("0*.parquet"):
+            path.unlink()
+        ledger = {"base": base, "sequence": 0, "watermark": None, "sources": []}
+
+    snapshot = get_snapshot()
+    df, daily, indexes = snapshot["df"], snapshot["daily"], snapshot["indexes"]
+    quality = snapshot["quality"]
+    applied = {source["fingerprint"] for source in ledger["sources"]}
+    months, report = set(), []
+
+    for path in map(Path, paths):
+        start = time.perf_counter()
+        fingerprint = file_fingerprint(path)
+        if fingerprint in applied:
+            report.append({"file": path.name, "skipped": True})
+            continue
+
+        delta = load_file(path)
+        delta = delta.sort_values("date", kind="stable", ignore_index=True)
+        days = pd.DatetimeIndex(delta["date"].unique())
+        watermark = (
+            pd.Timestamp(ledger["watermark"])
+            if ledger["watermark"]
+            else df["date"].max()
+        )
+        restated = days[days <= watermark]
+
+        clean, quarantine, stats = profile(delta)
+        # as linhas em quarentena também substituem as antigas: o arquivo é a
+        # versão oficial das chaves que contém
+        df, replaced = apply_increment(df, clean, delta)
+        # a soma dos dias tocados sai da base inteira: outros segmentos do
+        # mesmo dia continuam nela
+        touched = df.iloc[
+            df["date"].searchsorted(days.min()) : df["date"].searchsorted(
+                days.max(), side="right"
+            )
+        ]
+        daily = pd.concat(
+            [
+                daily.drop(days, errors="ignore"),
+                daily_rollup(touched[touched["date"].isin(days)]),
+            ]
+        ).sort_index()
+        quality = update_counts(quality, stats, replaced)
+        # linhas substituídas podem remover valores: aí os índices são refeitos
+        indexes = build_indexes(df) if len(restated) else merge_indexes(indexes, clean)
+        months |= set(days.to_period("M"))
+
+        ledger["sequence"] += 1
+        name = f"{ledger['sequence']:05d}"
+        INCREMENTS_DIR.mkdir(parents=True, exist_ok=True)
+        # o incremento é guardado como chegou: o perfil é refeito na reconstrução
+        delta.to_parquet(INCREMENTS_DIR / f"{name}.parquet", index=False)
+        save_quarantine(quarantine, name, source=str(path))
+        ledger["watermark"] = max(watermark, days.max()).isoformat()
+        ledger["sources"].append(
+            {
+                "file": f"{name}.parquet",
+                "source": str(path),
+                "fingerprint": fingerprint,
+                "rows": len(delta),
+                "quarantined": len(quarantine),
+                "new_days": len(days) - len(restated),
+                "restated_days": len(restated),
+                "replaced_rows": len(replaced),
+                "ingested_at": datetime.now().isoformat(timespec="seconds"),
+            }
+        )
+        applied.add(fingerprint)
+        report.append(
+            {**ledger["sources"][-1], "seconds": time.perf_counter() - start}
+        )
+
+    if not months:
+        return report
+
+    generation = f"{base}+{ledger['sequence']}"
+    save_snapshot(
+        {
+            "format": SNAPSHOT_FORMAT,
+            "generation": generation,
+            "df": df,
+            "indexes": indexes,
+            "daily": daily,
+            "quality": quality,
+        }
+    )
+    if is_current(read_manifest(), snapshot["generation"]):
+        update_dataset(df, sorted(months), indexes, generation=generation)
+    else:
+        write_dataset(df, generation=generation)
+    # por último: a troca de geração publica a nova versão da base
+    write_ledger(ledger)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", type=Path, help="exportações a aplicar")
+    parser.add_argument("--status", action="store_true", help="mostra o registro")
+    parser.add_argument("--no-prewarm", action="store_true")
+    parser.add_argument("--no-forecast", action="store_true")
+    args = parser.parse_args()
+
+    if args.status or not args.paths:
+        ledger = read_ledger()
+        if ledger is None or ledger["base"] != source_generation():
+            print("Nenhum incremento aplicado sobre a planilha atual.")
+        else:
+            print(f"marca d'água {ledger['watermark']}  ({ledger['sequence']} arquivos)")
+            for source in ledger["sources"]:
+                print(f"    {source['file']}  {source['source']}  {source['rows']} linhas")
+        return
+
+    for item in ingest(args.paths):
+        if item.get("skipped"):
+            print(f"{item['file']}: já aplicado, ignorado")
+        else:
+            print(
+                f"{item['source']}: {item['rows']} linhas, "
+                f"{item['new_days']} dias novos, {item['restated_days']} reprocessados "
+                f"({item['replaced_rows']} linhas substituídas), "
+                f"{item['quarantined']} em quarentena "
+                f"({item['seconds']:.2f} s)"
+            )
+
+    if not args.no_prewarm:
+        from pages.utils.prewarm import prewarm
+
+        prewarm(forecast=not args.no_forecast)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Acesso preguiçoso às bibliotecas pesadas usadas pelas páginas.
+
+Importar `plotly` ou `statsmodels` no topo de um módulo faz com que qualquer
+import dele (inclusive a página inicial, o prewarm ou scripts auxiliares)
+pague esse custo. Estas funções adiam o import até o primeiro uso real e
+guardam o módulo em cache para as chamadas seguintes.
+"""
+
+from functools import cache
+
+
+@cache
+def plotly_express():
+    """Retorna o módulo `plotly.express`."""
+    import plotly.express as px
+
+    return px
+
+
+@cache
+def plotly_graph_objects():
+    """Retorna o módulo `plotly.graph_objects`."""
+    import plotly.graph_objects as go
+
+    return go
+
+
+@cache
+def sarimax():
+    """Retorna a classe `SARIMAX` do statsmodels."""
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    return SARIMAX
+
+
+@cache
+def deterministic_terms():
+    """Retorna as classes `CalendarFourier` e `DeterministicProcess`."""
+    from statsmodels.tsa.deterministic import CalendarFourier, DeterministicProcess
+
+    return CalendarFourier, DeterministicProcess
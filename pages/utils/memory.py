@@ -0,0 +1,397 @@
+"""Contabilidade de memória do servidor: caches, sessões e vazamentos.
+
+A base é uma só por processo (o snapshot e os backends de cada geração);
+por sessão ficam o `st.session_state` e os arquivos dos botões de download,
+que o Streamlit guarda em memória até a sessão terminar. Este módulo mede
+tudo isso com tamanho profundo (`deep_size`) e, numa thread de monitoramento
+(`start_monitor`, a cada `MEMORY_INTERVAL` segundos):
+
+- guarda o histórico do RSS e do tamanho dos caches;
+- com `MEMORY_TRACE=1`, tira snapshots do `tracemalloc` e compara cada um
+  com o anterior e com o primeiro (as linhas que mais cresceram);
+- acompanha, por referência fraca, os DataFrames das gerações da base: uma
+  geração antiga que continua viva depois da troca é um vazamento;
+- libera os downloads das sessões sem rerun há mais de `SESSION_IDLE_TTL`
+  segundos (o arquivo continua em disco; "Preparar download" o oferece de
+  novo).
+
+Os resultados aparecem na página "Memória" (`pages/10_Memória.py`).
+"""
+
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+MEMORY_INTERVAL = float(os.environ.get("MEMORY_INTERVAL", "60"))
+SESSION_IDLE_TTL = float(os.environ.get("SESSION_IDLE_TTL", "1800"))
+MEMORY_TRACE = os.environ.get("MEMORY_TRACE", "0") == "1"
+# quadros guardados por alocação: mais quadros, mais memória do próprio tracemalloc
+MEMORY_TRACE_FRAMES = int(os.environ.get("MEMORY_TRACE_FRAMES", "1"))
+# amostras mantidas no histórico (24 h com o intervalo padrão)
+HISTORY_SIZE = 1440
+TOP_ALLOCATIONS = 15
+
+logger = logging.getLogger(__name__)
+
+_last_seen = {}
+_history = deque(maxlen=HISTORY_SIZE)
+_generations = {}
+_trace = {"baseline": None, "previous": None, "since_previous": [], "since_start": []}
+_state_lock = threading.Lock()
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+# ==========================================================
+# TAMANHOS
+# ==========================================================
+def deep_size(obj, seen=None):
+    """Bytes ocupados por `obj` e por tudo o que ele referencia.
+
+    Objetos já contados em `seen` (ids) valem zero, então vários relatórios
+    com o mesmo `seen` não contam duas vezes o que é compartilhado.
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        # visões compartilham o buffer de outro array
+        return 0 if obj.base is not None else obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return size + sum(
+            deep_size(key, seen) + deep_size(value, seen)
+            for key, value in list(obj.items())
+        )
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return size + sum(deep_size(item, seen) for item in list(obj))
+    if hasattr(obj, "__dict__") and not isinstance(obj, type):
+        return size + deep_size(vars(obj), seen)
+    return size
+
+
+def rss_bytes():
+    """RSS atual do processo (Linux), ou None se não houver /proc."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+
+def shared_memory(pid="self"):
+    """RSS, PSS e parte compartilhada de um processo (Linux), em bytes.
+
+    O PSS divide cada página compartilhada (o snapshot mapeado de
+    `SNAPSHOT_STORE=arrow`, por exemplo) entre os processos que a usam: a
+    soma dos PSS dos workers é a memória que eles realmente ocupam juntos.
+    Retorna None se não houver /proc.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if value.strip().endswith("kB"):
+                    fields[key] = int(value.split()[0]) * 1024
+    except OSError:
+        return None
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+# ==========================================================
+# INVENTÁRIO
+# ==========================================================
+def track_generation(snapshot):
+    """Passa a acompanhar (por referência fraca) o DataFrame de uma geração."""
+    with _state_lock:
+        if snapshot["generation"] not in _generations:
+            _generations[snapshot["generation"]] = weakref.ref(snapshot["df"])
+
+
+def stale_generations(current):
+    """Gerações anteriores a `current` cujo DataFrame ainda está na memória."""
+    with _state_lock:
+        for generation in [g for g, ref in _generations.items() if ref() is None]:
+            del _generations[generation]
+        return [
+            (generation, ref())
+            for generation, ref in _generations.items()
+            if generation != current and ref() is not None
+        ]
+
+
+def process_inventory():
+    """Objetos em cache no processo: [{objeto, geração, bytes}].
+
+    O que já foi contado (o DataFrame do snapshot dentro do backend pandas,
+    por exemplo) aparece com zero bytes na segunda vez.
+    """
+    from pages.utils.data_loader import get_snapshot
+    from pages.utils.incremental import inventory
+    from pages.utils.query import _backends, _backends_lock
+
+    snapshot = get_snapshot()
+    track_generation(snapshot)
+    seen, rows = set(), []
+    for key in ("df", "daily", "quality", "indexes"):
+        rows.append(
+            {
+                "objeto": f"snapshot · {key}",
+                "geração": snapshot["generation"],
+                "bytes": deep_size(snapshot[key], seen),
+            }
+        )
+    with _backends_lock:
+        backends = list(_backends.items())
+    for (name, generation), backend in backends:
+        rows.append(
+            {
+                "objeto": f"backend · {name}",
+                "geração": generation,
+                "bytes": deep_size(backend, seen),
+            }
+        )
+    for generation, dim, df in inventory():
+        rows.append(
+            {
+                "objeto": f"parciais incrementais · {dim}",
+                "geração": generation,
+                "bytes": deep_size(df, seen),
+            }
+        )
+    for generation, df in stale_generations(snapshot["generation"]):
+        rows.append(
+            {
+                "objeto": "geração antiga ainda viva",
+                "geração": generation,
+                "bytes": deep_size(df, seen),
+            }
+        )
+    for category, size in streamlit_caches().items():
+        rows.append(
+            {"objeto": f"streamlit · {category}", "geração": "", "bytes": size}
+        )
+    if tracemalloc.is_tracing():
+        rows.append(
+            {
+                "objeto": "tracemalloc (overhead)",
+                "geração": "",
+                "bytes": tracemalloc.get_tracemalloc_memory(),
+            }
+        )
+    return pd.DataFrame(rows, columns=["objeto", "geração", "bytes"])
+
+
+def _runtime():
+    from streamlit.runtime import Runtime
+
+    return Runtime.instance() if Runtime.exists() else None
+
+
+def streamlit_caches():
+    """Bytes por categoria de cache do Streamlit (as mesmas de /_stcore/metrics)."""
+    runtime = _runtime()
+    if runtime is None:
+        return {}
+    totals = {}
+    for stat in runtime.stats_mgr.get_stats():
+        category = stat.category_name
+        totals[category] = totals.get(category, 0) + stat.byte_length
+    return totals
+
+
+def _session_media_bytes(runtime, session_id):
+    """Bytes dos arquivos (downloads) referenciados por uma sessão.
+
+    O Streamlit não expõe isso por sessão: lê os índices internos do
+    gerenciador de mídia e conta zero se eles mudarem de forma.
+    """
+    manager = runtime.media_file_mgr
+    by_session = getattr(manager, "_files_by_session_and_coord", {})
+    files = getattr(manager._storage, "_files_by_id", {})
+    file_ids = set(by_session.get(session_id, {}).values())
+    return sum(len(files[f].content) for f in file_ids if f in files)
+
+
+def _active_sessions(runtime):
+    """Sessões conectadas (nenhuma se o runtime não tiver gerenciador, em testes)."""
+    manager = getattr(runtime, "_session_mgr", None)
+    if manager is None or not hasattr(manager, "list_active_sessions"):
+        return []
+    return [info.session for info in manager.list_active_sessions()]
+
+
+def touch_session(session_id, page):
+    """Registra um rerun da sessão (usado para achar as sessões ociosas)."""
+    _last_seen[session_id] = (time.monotonic(), page)
+
+
+def session_inventory():
+    """Uma linha por sessão ativa: ociosidade, estado e downloads em memória."""
+    runtime = _runtime()
+    columns = ["sessão", "página", "ociosa (min)", "session_state", "downloads"]
+    if runtime is None:
+        return pd.DataFrame(columns=columns)
+    now = time.monotonic()
+    rows = []
+    for session in _active_sessions(runtime):
+        seen_at, page = _last_seen.get(session.id, (None, ""))
+        rows.append(
+            {
+                "sessão": session.id,
+                "página": page,
+                "ociosa (min)": None if seen_at is None else (now - seen_at) / 60,
+                "session_state": sum(
+                    stat.byte_length for stat in session.session_state.get_stats()
+                ),
+                "downloads": _session_media_bytes(runtime, session.id),
+            }
+        )
+    return pd.DataFrame(rows, columns=columns)
+
+
+def evict_idle_sessions(ttl=SESSION_IDLE_TTL):
+    """Libera os downloads das sessões sem rerun há mais de `ttl` segundos.
+
+    Retorna os ids das sessões liberadas.
+    """
+    runtime = _runtime()
+    if runtime is None or ttl <= 0:
+        return []
+    now = time.monotonic()
+    active = {session.id for session in _active_sessions(runtime)}
+    for session_id in [s for s in _last_seen if s not in active]:
+        _last_seen.pop(session_id, None)
+
+    evicted = [
+        session_id
+        for session_id, (seen_at, _) in list(_last_seen.items())
+        if now - seen_at > ttl and _session_media_bytes(runtime, session_id)
+    ]
+    for session_id in evicted:
+        runtime.media_file_mgr.clear_session_refs(session_id)
+    if evicted:
+        runtime.media_file_mgr.remove_orphaned_files()
+        logger.info("Downloads de %d sessões ociosas liberados", len(evicted))
+    return evicted
+
+
+# ==========================================================
+# TRACEMALLOC
+# ==========================================================
+def _allocation_diff(snapshot, reference):
+    rows = []
+    for stat in snapshot.compare_to(reference, "lineno")[:TOP_ALLOCATIONS]:
+        frame = stat.traceback[0]
+        rows.append(
+            {
+                "linha": f"{frame.filename}:{frame.lineno}",
+                "crescimento": stat.size_diff,
+                "total": stat.size,
+                "alocações": stat.count_diff,
+            }
+        )
+    return rows
+
+
+def trace_allocations():
+    """Tira um snapshot do tracemalloc e o compara com o anterior e o primeiro."""
+    if not tracemalloc.is_tracing():
+        return
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+    )
+    with _state_lock:
+        if _trace["baseline"] is None:
+            _trace["baseline"] = snapshot
+        else:
+            _trace["since_previous"] = _allocation_diff(snapshot, _trace["previous"])
+            _trace["since_start"] = _allocation_diff(snapshot, _trace["baseline"])
+        _trace["previous"] = snapshot
+
+
+def allocation_report():
+    """Maiores crescimentos: (desde a amostra anterior, desde a primeira)."""
+    with _state_lock:
+        return (
+            pd.DataFrame(_trace["since_previous"]),
+            pd.DataFrame(_trace["since_start"]),
+        )
+
+
+# ==========================================================
+# MONITORAMENTO
+# ==========================================================
+def sample():
+    """Uma rodada do monitor: histórico, tracemalloc e sessões ociosas."""
+    inventory = process_inventory()
+    sessions = session_inventory()
+    _history.append(
+        {
+            "time": datetime.now(),
+            "rss": rss_bytes(),
+            "caches": int(inventory["bytes"].sum()),
+            "sessions": len(sessions),
+            "downloads": int(sessions["downloads"].sum()),
+        }
+    )
+    trace_allocations()
+    evict_idle_sessions()
+
+
+def history():
+    return pd.DataFrame(list(_history))
+
+
+def collect_garbage():
+    """Roda o coletor de lixo; retorna os bytes de RSS devolvidos (ou None)."""
+    before = rss_bytes()
+    gc.collect()
+    after = rss_bytes()
+    return None if before is None else before - after
+
+
+def _watch(interval):
+    while True:
+        try:
+            sample()
+        except Exception:
+            logger.exception("Falha na amostragem de memória")
+        time.sleep(interval)
+
+
+def start_monitor(interval=MEMORY_INTERVAL):
+    """Inicia, uma única vez por processo, a thread de monitoramento."""
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None and interval > 0:
+            if MEMORY_TRACE and not tracemalloc.is_tracing():
+                tracemalloc.start(MEMORY_TRACE_FRAMES)
+            _monitor = threading.Thread(
+                target=_watch, args=(interval,), name="memory-monitor", daemon=True
+            )
+            _monitor.start()
@@ -0,0 +1,164 @@
+"""Caminho de execução em Polars para as agregações.
+
+Mesma interface do `PandasBackend`/`DuckDBBackend` de `query.py`, mas com
+planos preguiçosos (`LazyFrame`): só as partições mensais que cruzam o
+intervalo de datas são abertas, os demais filtros são empurrados para a
+leitura do Parquet e os group-bys rodam em todos os núcleos. A conversão
+para pandas acontece só no fim, no DataFrame pequeno que vai para os
+gráficos.
+
+Só as consultas usam o Polars: a base continua sendo carregada por
+`data_loader.load_data` (dimensões `category`, perfil de qualidade). A
+`normalize_polars` existe para comparar as normalizações em
+`benchmarks/polars_vs_pandas.py`.
+
+Requer o extra `polars` (`uv sync --extra polars`).
+"""
+
+import polars as pl
+
+from pages.utils.data_loader import (
+    BOT_NAMES,
+    COLUMN_NAMES,
+    DIMENSIONS,
+    MEASURES,
+    build_indexes,
+)
+from pages.utils.dataset import manifest_indexes, partition_files, read_manifest
+from pages.utils.query import BATCH_ROWS
+from pages.utils.timing import span
+
+
+# ==========================================================
+# NORMALIZAÇÃO
+# ==========================================================
+def normalize_polars(lf):
+    """Equivalente em Polars de `data_loader.normalize`."""
+    lf = lf.rename(
+        {raw: name for raw, name in COLUMN_NAMES.items() if raw in lf.collect_schema()}
+    )
+    schema = lf.collect_schema()
+
+    date = pl.col("date")
+    if schema["date"] == pl.String:
+        date = date.str.to_datetime(strict=False)
+
+    return (
+        lf.with_columns(
+            *[
+                pl.col(col)
+                .cast(pl.String)
+                .str.replace_all("_", " ")
+                .str.to_titlecase()
+                for col in ["bot", "font", "tech"]
+            ],
+            *[
+                pl.when(pl.col(col) == "Unknown")
+                .then(None)
+                .otherwise(pl.col(col))
+                .alias(col)
+                for col in ["topic", "subject"]
+            ],
+            *[
+                pl.col(col).cast(pl.Float64, strict=False)
+                for col in MEASURES
+                if not schema[col].is_numeric()
+            ],
+            date.cast(pl.Datetime("ns")).alias("date"),
+        )
+        .with_columns(pl.col("bot").replace(BOT_NAMES))
+        .filter(pl.col("date").is_not_null())
+    )
+
+
+# ==========================================================
+# BACKEND
+# ==========================================================
+class PolarsBackend:
+    name = "polars"
+
+    def __init__(self, source):
+        """`source` é o diretório da base particionada ou um DataFrame Polars."""
+        if isinstance(source, (pl.DataFrame, pl.LazyFrame)):
+            self._lf, self._manifest = source.lazy(), None
+            self._indexes = None
+        else:
+            self._dir, self._manifest = source, read_manifest(source)
+            self._indexes = manifest_indexes(self._manifest)
+
+    def _scan(self, start, end):
+        if self._manifest is None:
+            return self._lf
+        files = partition_files(self._manifest, self._dir, start, end)
+        return pl.scan_parquet(files, hive_partitioning=False)
+
+    @staticmethod
+    def _predicates(filters):
+        predicates = []
+        start, end = filters.date_bounds()
+        if start is not None:
+            predicates.append(pl.col("date") >= start.to_pydatetime())
+        if end is not None:
+            predicates.append(pl.col("date") < end.to_pydatetime())
+        for dim in DIMENSIONS:
+            values = getattr(filters, dim)
+            if values:
+                predicates.append(pl.col(dim).is_in(list(values)))
+        return predicates
+
+    def _filtered(self, filters):
+        lf = self._scan(*filters.date_bounds())
+        predicates = self._predicates(filters)
+        return lf.filter(*predicates) if predicates else lf
+
+    def indexes(self):
+        if self._indexes is None:
+            self._indexes = build_indexes(self._lf.collect().to_pandas())
+        return self._indexes
+
+    def filter(self, filters):
+        with span("filter", backend=self.name):
+            return self._filtered(filters).collect().to_pandas()
+
+    def _raw_batches(self, filters, batch_size):
+        if self._manifest is None:
+            yield from self._lf.collect().iter_slices(batch_size)
+            return
+        import pyarrow.parquet as pq
+
+        # lê as partições lote a lote; o `collect_batches` do Polars produz à
+        # frente de quem consome, e a memória cresceria com a exportação
+        start, end = filters.date_bounds()
+        for file in partition_files(self._manifest, self._dir, start, end):
+            for batch in pq.ParquetFile(file).iter_batches(batch_size):
+                yield pl.from_arrow(batch)
+
+    def iter_batches(self, filters, batch_size=BATCH_ROWS):
+        predicates = self._predicates(filters)
+        for df in self._raw_batches(filters, batch_size):
+            yield (df.filter(*predicates) if predicates else df).to_arrow()
+
+    def aggregate(self, filters, by=(), measures=MEASURES, rates=(), dropna=True):
+        by, measures = list(by), list(measures)
+        lf = self._filtered(filters)
+        sums = [pl.col(m).sum() for m in measures]
+        if by:
+            # como no pandas, linhas com chave de agrupamento nula ficam de fora
+            if dropna:
+                lf = lf.drop_nulls(by)
+            lf = lf.group_by(by).agg(sums).sort(by, nulls_last=True)
+        else:
+            lf = lf.select(sums)
+
+        total = pl.when(pl.col("sessions_total") != 0).then(pl.col("sessions_total"))
+        retention = pl.col("session_retained") / total
+        human = pl.col("sessions_human_assistance") / total
+        expressions = {
+            "retention_rate": retention,
+            "human_request_rate": human,
+            "efficiency_score": retention - human,
+        }
+        lf = lf.with_columns(expressions[rate].alias(rate) for rate in rates)
+        # o plano é preguiçoso: leitura, filtro e group-by acontecem no collect
+        with span("aggregate", backend=self.name, by=",".join(by)):
+            return lf.collect().to_pandas()
@@ -0,0 +1,134 @@
+"""Prewarm do servidor: carrega a base e monta os caches antes do primeiro acesso.
+
+Executado na inicialização do container, antes do `streamlit run`:
+
+    python -m pages.utils.prewarm            # aquece dados, índices e projeção
+    python -m pages.utils.prewarm --check    # sai com 0 apenas se estiver pronto
+
+O status fica em `.cache/status.json` (`warming` → `ready`) junto com os
+tempos medidos, e é usado pelo HEALTHCHECK do Dockerfile para que o tráfego
+só seja roteado depois que tudo estiver quente.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from pages.utils.data_loader import (
+    CACHE_DIR,
+    SNAPSHOT_FORMAT,
+    build_snapshot,
+    dataset_generation,
+    read_snapshot,
+    save_snapshot,
+)
+
+STATUS_PATH = CACHE_DIR / "status.json"
+
+# Projeção da página 3 é calculada no prewarm por padrão (PREWARM_FORECAST=0 desliga)
+PREWARM_FORECAST = os.environ.get("PREWARM_FORECAST", "1") == "1"
+
+
+def write_status(status, **details):
+    """Grava o status de prontidão de forma atômica."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "status": status,
+        "generation": dataset_generation(),
+        "format": SNAPSHOT_FORMAT,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+        **details,
+    }
+    tmp_path = STATUS_PATH.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(payload, indent=2))
+    tmp_path.replace(STATUS_PATH)
+
+
+def read_status():
+    """Retorna o status gravado pelo prewarm, ou None se ainda não existir."""
+    if not STATUS_PATH.exists():
+        return None
+    return json.loads(STATUS_PATH.read_text())
+
+
+def is_ready():
+    """Indica se o prewarm terminou para a versão atual do arquivo de dados.
+
+    O formato do snapshot também conta: depois de uma mudança nas regras da
+    quarentena, a projeção e os resultados em cache precisam ser refeitos.
+    """
+    status = read_status()
+    return (
+        status is not None
+        and status["status"] == "ready"
+        and status["generation"] == dataset_generation()
+        and status.get("format") == SNAPSHOT_FORMAT
+    )
+
+
+def prewarm(forecast=PREWARM_FORECAST, force=False):
+    """Carrega a base, grava o snapshot e (opcionalmente) a projeção.
+
+    Retorna os tempos medidos, em segundos:
+    - `cold_load_s`: leitura da planilha + normalização + índices;
+    - `warm_load_s`: leitura do snapshot, que é o que o primeiro acesso paga;
+    - `backend_s`: preparo do backend de consulta (partições Parquet no
+      DuckDB/Polars);
+    - `forecast_s`: ajuste dos três modelos SARIMAX da página 3.
+    """
+    write_status("warming")
+    timings = {}
+
+    snapshot = None if force else read_snapshot()
+    if snapshot is None:
+        start = time.perf_counter()
+        snapshot = build_snapshot()
+        timings["cold_load_s"] = time.perf_counter() - start
+        save_snapshot(snapshot)
+
+    start = time.perf_counter()
+    snapshot = read_snapshot()
+    timings["warm_load_s"] = time.perf_counter() - start
+
+    # nos backends DuckDB/Polars isso grava as partições consultadas pelas páginas
+    from pages.utils.query import get_backend
+
+    start = time.perf_counter()
+    get_backend().indexes()
+    timings["backend_s"] = time.perf_counter() - start
+
+    if forecast:
+        from pages.utils.forecast import daily_series, get_projection
+
+        start = time.perf_counter()
+        get_projection(daily_series(snapshot["daily"]), snapshot["generation"])
+        timings["forecast_s"] = time.perf_counter() - start
+
+    # resultados guardados para versões anteriores da base não servem mais
+    from pages.utils.result_cache import purge_stale
+
+    purge_stale(snapshot["generation"])
+    write_status("ready", rows=len(snapshot["df"]), timings=timings)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="verifica prontidão")
+    parser.add_argument("--force", action="store_true", help="ignora o snapshot")
+    parser.add_argument("--no-forecast", action="store_true")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if is_ready() else 1)
+
+    timings = prewarm(forecast=PREWARM_FORECAST and not args.no_forecast, force=args.force)
+    for name, seconds in timings.items():
+        print(f"{name:<14} {seconds:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Captura de perfil de um rerun de página, sob demanda.
+
+Ligada para todos os reruns com `PROFILE=1`, ou para um rerun só com
+`?profile=1` na URL da página (o parâmetro é retirado depois da captura).
+A captura começa em `timing.start_rerun` e termina em `timing.debug_panel`,
+então cobre a página inteira, e o relatório vai para `PROFILE_DIR` (padrão
+`.cache/profiles/`) com o nome da página e o hash dos filtros:
+
+- `PROFILER=sampling` (padrão): uma thread amostra a pilha da thread do
+  rerun a cada `PROFILE_INTERVAL_MS`; sai um flame graph em HTML (icicle do
+  Plotly) e as pilhas no formato "collapsed" (speedscope, flamegraph.pl).
+  Só a sessão capturada aparece, e várias capturas podem correr juntas;
+- `PROFILER=cprofile`: perfil determinístico do `cProfile`, salvo em
+  `.pstats` (`python -m pstats`, snakeviz) e num resumo em texto. No Python
+  3.12+ ele enxerga todas as threads e só um pode estar ativo, então as
+  capturas são feitas uma de cada vez.
+
+Cada captura tem um `.json` com página, sessão, filtros e duração; só as
+`PROFILE_KEEP` mais recentes são mantidas.
+"""
+
+import cProfile
+import hashlib
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_ENABLED = os.environ.get("PROFILE", "0") == "1"
+PROFILER = os.environ.get("PROFILER", "sampling")
+PROFILE_DIR = os.environ.get("PROFILE_DIR")
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", "20"))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+# linhas do resumo em texto do cProfile
+PSTATS_LINES = 60
+
+logger = logging.getLogger(__name__)
+
+_cprofile_lock = threading.Lock()
+_cprofile_owner = None
+
+
+def profile_dir():
+    if PROFILE_DIR:
+        return Path(PROFILE_DIR)
+    from pages.utils.data_loader import CACHE_DIR
+
+    return CACHE_DIR / "profiles"
+
+
+def profile_requested():
+    """Indica se este rerun deve ser capturado (variável ou parâmetro da URL)."""
+    if PROFILE_ENABLED:
+        return True
+    import streamlit as st
+
+    return st.query_params.get("profile") == "1"
+
+
+# ==========================================================
+# PROFILERS
+# ==========================================================
+class SamplingCapture:
+    """Amostra a pilha de uma thread em intervalos fixos, numa thread à parte."""
+
+    kind = "sampling"
+
+    def __init__(self, page, interval_ms=PROFILE_INTERVAL_MS):
+        self.script = Path(page).name
+        self.interval = interval_ms / 1000
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._sampler.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                # a thread do rerun terminou sem fechar a captura
+                return
+            self.stacks[self._stack(frame)] += 1
+
+    def _stack(self, frame):
+        """Pilha da raiz à folha, a partir do script da página."""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            location = f"{Path(code.co_filename).name}:{code.co_firstlineno}"
+            frames.append(f"{code.co_name} ({location})")
+            if code.co_name == "<module>" and location.startswith(self.script):
+                # acima do script da página só há o executor do Streamlit
+                break
+            frame = frame.f_back
+        return tuple(reversed(frames))
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+
+    def save(self, stem):
+        """Grava as pilhas "collapsed" e o flame graph; retorna o HTML."""
+        collapsed = "".join(
+            f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.items()
+        )
+        stem.with_suffix(".collapsed").write_text(collapsed, encoding="utf-8")
+        html = stem.with_suffix(".html")
+        # o plotly.js fica num arquivo só no diretório, e não em cada captura
+        flame_graph(self.stacks, self.interval * 1000, stem.name).write_html(
+            html, include_plotlyjs="directory"
+        )
+        return html
+
+
+class CProfileCapture:
+    """`cProfile` determinístico; um por processo (Python 3.12+)."""
+
+    kind = "cprofile"
+
+    def __init__(self, page):
+        self.thread = threading.current_thread()
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        global _cprofile_owner
+        if not _cprofile_lock.acquire(blocking=False):
+            owner = _cprofile_owner
+            # rerun interrompido (st.stop, exceção): a thread dona já morreu
+            if owner is None or owner.thread.is_alive():
+                return False
+            owner.profiler.disable()
+        _cprofile_owner = self
+        self.profiler.enable()
+        return True
+
+    def stop(self):
+        global _cprofile_owner
+        self.profiler.disable()
+        _cprofile_owner = None
+        _cprofile_lock.release()
+
+    def save(self, stem):
+        """Grava o `.pstats` e um resumo em texto; retorna o `.pstats`."""
+        path = stem.with_suffix(".pstats")
+        self.profiler.dump_stats(path)
+        out = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=out).strip_dirs()
+        stats.sort_stats("cumulative").print_stats(PSTATS_LINES)
+        stats.sort_stats("tottime").print_stats(PSTATS_LINES // 2)
+        stem.with_suffix(".txt").write_text(out.getvalue(), encoding="utf-8")
+        return path
+
+
+def start_capture(page):
+    """Inicia a captura do rerun de `page`, ou None se não foi pedida."""
+    if not profile_requested():
+        return None
+    if PROFILER == "cprofile":
+        capture = CProfileCapture(page)
+        if not capture.start():
+            logger.warning("cProfile ocupado por outro rerun; captura ignorada")
+            return None
+        return capture
+    capture = SamplingCapture(page)
+    capture.start()
+    return capture
+
+
+# ==========================================================
+# RELATÓRIO
+# ==========================================================
+def flame_graph(stacks, interval_ms, title):
+    """Flame graph (icicle) das pilhas amostradas: largura = tempo."""
+    from pages.utils.lazy_imports import plotly_graph_objects
+
+    totals = Counter()
+    for stack, count in stacks.items():
+        for depth in range(1, len(stack) + 1):
+            totals[stack[:depth]] += count
+
+    # ids curtos: o caminho completo de cada nó deixaria o HTML enorme
+    ids = {path: str(i) for i, path in enumerate(totals)}
+    go = plotly_graph_objects()
+    fig = go.Figure(
+        go.Icicle(
+            ids=list(ids.values()),
+            labels=[path[-1].split(" (")[0] for path in totals],
+            parents=[ids.get(path[:-1], "") for path in totals],
+            values=[count * interval_ms for count in totals.values()],
+            customdata=[path[-1] for path in totals],
+            branchvalues="total",
+            hovertemplate="%{customdata}<br>%{value:,.0f} ms<extra></extra>",
+            tiling={"orientation": "v"},
+        )
+    )
+    fig.update_layout(
+        title=f"{title} — {sum(stacks.values())} amostras a cada {interval_ms:g} ms",
+        margin={"t": 50, "l": 10, "r": 10, "b": 10},
+        height=800,
+    )
+    return fig
+
+
+def prune_captures(directory, keep=PROFILE_KEEP):
+    """Apaga as capturas mais antigas, mantendo as `keep` mais recentes."""
+    captures = sorted(directory.glob("*.json"))
+    for meta in captures[: max(len(captures) - keep, 0)]:
+        for path in directory.glob(f"{meta.stem}.*"):
+            path.unlink(missing_ok=True)
+
+
+def finish_capture(capture, record):
+    """Encerra a captura e grava o relatório do rerun descrito em `record`.
+
+    `record` é o registro de `timing.finish_rerun` (página, sessão, duração
+    e as anotações, como os filtros). Retorna o caminho do relatório.
+    """
+    capture.stop()
+    info = record["info"]
+    digest = hashlib.sha1(
+        json.dumps(info, sort_keys=True, default=str).encode()
+    ).hexdigest()[:8]
+
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    stem = directory / f"{stamp}-{record['page']}-{digest}"
+    report = capture.save(stem)
+    meta = {
+        "page": record["page"],
+        "session": record["session"],
+        "time": record["time"],
+        "total_ms": record["total_ms"],
+        "profiler": capture.kind,
+        "report": report.name,
+        **info,
+    }
+    stem.with_suffix(".json").write_text(
+        json.dumps(meta, indent=2, ensure_ascii=False, default=str), encoding="utf-8"
+    )
+    prune_captures(directory)
+
+    import streamlit as st
+
+    # `?profile=1` vale para uma captura só
+    if "profile" in st.query_params:
+        del st.query_params["profile"]
+    return report
@@ -0,0 +1,260 @@
+"""Perfil de qualidade da base, calculado uma vez por ingestão.
+
+`profile` avalia todas as regras numa única passada vetorizada sobre a base
+normalizada e devolve:
+
+- a base limpa, sem as linhas em quarentena;
+- as linhas em quarentena, com os códigos de motivo (separados por `|`);
+- contagens por dia × bot × tecnologia × fonte, que a página 8 soma para os
+  filtros escolhidos em vez de varrer as linhas a cada rerun.
+
+As contagens descrevem os dados como chegaram (antes da quarentena). Como as
+linhas duplicadas são idênticas, caem sempre no mesmo grupo, e todas as
+contagens podem ser somadas entre grupos sem perder exatidão.
+
+As linhas em quarentena ficam em `.cache/quarantine/` (`base.parquet` para
+os arquivos base e um arquivo por incremento ingerido).
+
+As mesmas contagens alimentam a linha do tempo diária da página 8 e a
+detecção de dias anômalos (`flag_anomalies`): cada segmento é comparado com
+o próprio histórico, por z-score robusto (mediana e MAD) para volume e
+completude e por limites de controle de Poisson para eventos raros como
+duplicatas e valores inválidos, numa única operação vetorizada sobre
+todos os dias e segmentos.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.data_loader import CACHE_DIR, MEASURES
+from pages.utils.result_cache import disk_cached
+from pages.utils.timing import timed
+
+QUARANTINE_DIR = CACHE_DIR / "quarantine"
+QUALITY_KEYS = ["date", "bot", "tech", "font"]
+SEGMENT_KEYS = QUALITY_KEYS[1:]
+
+REASONS = {
+    "DUPLICATE": "Cópia exata de uma linha anterior",
+    "NEGATIVE_VALUE": "Medida negativa",
+    "MISSING_VALUE": "Medida ausente ou não numérica",
+    "INCONSISTENT": "Sessões retidas ou com pedido humano acima do total",
+}
+
+
+# ==========================================================
+# PERFIL
+# ==========================================================
+def profile(df):
+    """Avalia as regras de qualidade e separa as linhas em quarentena.
+
+    Retorna `(limpa, quarentena, estatísticas)`.
+    """
+    measures = df[MEASURES]
+    negative = measures.lt(0).any(axis=1).to_numpy()
+    retained_gt_total = (
+        measures["session_retained"].gt(measures["sessions_total"]).to_numpy()
+    )
+    human_gt_total = (
+        measures["sessions_human_assistance"].gt(measures["sessions_total"]).to_numpy()
+    )
+    checks = {
+        "DUPLICATE": df.duplicated().to_numpy(),
+        "NEGATIVE_VALUE": negative,
+        "MISSING_VALUE": measures.isna().any(axis=1).to_numpy(),
+        "INCONSISTENT": retained_gt_total | human_gt_total,
+    }
+    bad = np.logical_or.reduce(list(checks.values()))
+
+    indicators = pd.DataFrame(
+        {
+            **{key: df[key] for key in QUALITY_KEYS},
+            "rows": 1,
+            **{f"missing_{col}": df[col].isna() for col in df.columns},
+            "duplicates": checks["DUPLICATE"],
+            # mesmo critério de "valores válidos" da página 8
+            "invalid_values": negative | df["sessions_total"].eq(0).to_numpy(),
+            "retained_gt_total": retained_gt_total,
+            "human_gt_total": human_gt_total,
+            **{f"quarantine_{code.lower()}": mask for code, mask in checks.items()},
+            "quarantined": bad,
+        }
+    )
+    stats = indicators.groupby(QUALITY_KEYS, observed=True, dropna=False).sum()
+    stats = stats.reset_index().astype(dict.fromkeys(SEGMENT_KEYS, object))
+
+    quarantine = df[bad].assign(
+        reason=[
+            "|".join(code for code, mask in checks.items() if mask[i])
+            for i in np.flatnonzero(bad)
+        ]
+    )
+    return df[~bad], quarantine, stats
+
+
+def save_quarantine(quarantine, name, source=None):
+    """Grava as linhas em quarentena de uma ingestão (ou remove o arquivo antigo)."""
+    path = QUARANTINE_DIR / f"{name}.parquet"
+    if quarantine.empty:
+        path.unlink(missing_ok=True)
+        return
+    QUARANTINE_DIR.mkdir(parents=True, exist_ok=True)
+    quarantine = quarantine.assign(source=source or name)
+    tmp_path = path.with_suffix(".tmp")
+    quarantine.to_parquet(tmp_path, index=False)
+    tmp_path.replace(path)
+
+
+def update_counts(stats, delta_stats, replaced=None):
+    """Soma as contagens de um incremento e tira as das linhas que ele substituiu.
+
+    As contagens são aditivas, e as linhas substituídas (`replaced`, da base
+    limpa) dão as mesmas contagens que deram ao chegar: os outros segmentos e
+    tópicos dos mesmos dias continuam contados.
+    """
+    frames = [stats, delta_stats]
+    if replaced is not None and len(replaced):
+        _, _, removed = profile(replaced)
+        counts = removed.columns.difference(QUALITY_KEYS)
+        frames.append(removed.assign(**{col: -removed[col] for col in counts}))
+    stats = pd.concat(frames, ignore_index=True).groupby(
+        QUALITY_KEYS, as_index=False, dropna=False
+    ).sum()
+    return stats[stats["rows"] > 0].reset_index(drop=True)
+
+
+# ==========================================================
+# CONSULTA
+# ==========================================================
+def select(stats, filters):
+    """Linhas das estatísticas que caem nos dias e dimensões de `filters`."""
+    if filters.topic or filters.subject:
+        raise ValueError("As estatísticas de qualidade não são abertas por tópico")
+    mask = np.ones(len(stats), dtype=bool)
+    start, end = filters.date_bounds()
+    if start is not None:
+        mask &= (stats["date"] >= start).to_numpy()
+    if end is not None:
+        mask &= (stats["date"] < end).to_numpy()
+    for dim in SEGMENT_KEYS:
+        values = getattr(filters, dim)
+        if values:
+            mask &= stats[dim].isin(values).to_numpy()
+    return stats.loc[mask]
+
+
+@timed()
+def summarize(stats, filters):
+    """Soma as estatísticas dos dias e dimensões selecionados em `filters`."""
+    return select(stats, filters).drop(columns=QUALITY_KEYS).sum()
+
+
+def quality_rates(counts):
+    """Converte contagens (por dia ou por dia × segmento) nas métricas da linha do tempo."""
+    rows = counts["rows"].where(counts["rows"] > 0)
+    return pd.DataFrame(
+        {
+            "rows": counts["rows"],
+            "topic_completeness": 1 - counts["missing_topic"] / rows,
+            "subject_completeness": 1 - counts["missing_subject"] / rows,
+            "duplicate_rate": counts["duplicates"] / rows,
+            "invalid_rate": counts["invalid_values"] / rows,
+            "invalid_values": counts["invalid_values"],
+            "retained_gt_total": counts["retained_gt_total"],
+            "human_gt_total": counts["human_gt_total"],
+        }
+    )
+
+
+@timed()
+def quality_timeline(stats):
+    """Métricas de qualidade por dia, somando os segmentos de `stats`."""
+    daily = stats.drop(columns=SEGMENT_KEYS).groupby("date").sum()
+    return quality_rates(daily)
+
+
+# ==========================================================
+# ANOMALIAS
+# ==========================================================
+# métricas comparadas por z robusto. +1: só valores altos são ruins;
+# -1: só baixos; 0: os dois lados
+ROBUST_METRICS = {"rows": 0, "topic_completeness": -1, "subject_completeness": -1}
+# eventos raros (taxa: contagem) comparados por limites de controle
+RARE_EVENTS = {"duplicate_rate": "duplicates", "invalid_rate": "invalid_values"}
+CONSISTENCY_CHECKS = ["retained_gt_total", "human_gt_total"]
+
+
+def robust_z(values, groups):
+    """z-score robusto de cada valor contra a mediana e o MAD do seu grupo.
+
+    Quando o MAD é zero (métrica quase sempre constante), usa o desvio
+    absoluto médio, como de costume para o z modificado.
+    """
+    median = values.groupby(groups).transform("median")
+    deviation = (values - median).abs()
+    mad = deviation.groupby(groups).transform("median")
+    mean_ad = deviation.groupby(groups).transform("mean")
+    scale = (mad / 0.6745).where(mad > 0, mean_ad * 1.253314)
+    return (values - median) / scale.where(scale > 0)
+
+
+def control_z(counts, rows, groups):
+    """Limite de controle de eventos raros, expresso como z-score.
+
+    O esperado de cada dia é a taxa histórica do grupo vezes as linhas do
+    dia; a cauda exata de Poisson (P(X >= contagem)) é convertida no z normal
+    equivalente, para usar o mesmo limiar dos z robustos. Dias pequenos não
+    disparam alarmes à toa e, num grupo que nunca teve o evento, qualquer
+    ocorrência é anômala.
+    """
+    from scipy.stats import norm, poisson
+
+    rate = counts.groupby(groups).transform("sum") / rows.groupby(groups).transform(
+        "sum"
+    )
+    tail = poisson.sf(counts - 1, rows * rate)
+    return pd.Series(norm.isf(tail), index=counts.index)
+
+
+@timed()
+@disk_cached()
+def flag_anomalies(stats, threshold=3.5, min_rows=10, generation=None):
+    """Marca os dias anômalos de cada segmento em todo o histórico.
+
+    Retorna uma linha por (dia, segmento, métrica) sinalizada, com o valor e
+    o z-score. Com menos de `min_rows` linhas (no dia, para a completude; num
+    dia típico do segmento, para o volume) a variação é ruído e não entra na
+    comparação. Violações de consistência
+    (retidas ou pedidos humanos acima do total) são sempre sinalizadas.
+    Com a `generation` da base de `stats`, o resultado fica no cache de
+    resultados em disco.
+    """
+    counts = stats.set_index(QUALITY_KEYS)
+    rates = quality_rates(counts)
+    groups = [rates.index.get_level_values(key) for key in SEGMENT_KEYS]
+    small = rates["rows"] < min_rows
+    small_segment = rates["rows"].groupby(groups).transform("median") < min_rows
+
+    scores = {}
+    for metric, direction in ROBUST_METRICS.items():
+        values = rates[metric].mask(small_segment if metric == "rows" else small)
+        z = robust_z(values, groups)
+        scores[metric] = (z, z.abs() if direction == 0 else z * direction)
+    for metric, count in RARE_EVENTS.items():
+        z = control_z(counts[count], counts["rows"], groups)
+        scores[metric] = (z, z)
+
+    flagged = []
+    for metric, (z, signed) in scores.items():
+        hits = signed > threshold
+        flagged.append(
+            pd.DataFrame(
+                {"metric": metric, "value": rates[metric][hits], "z": z[hits]}
+            )
+        )
+    for metric in CONSISTENCY_CHECKS:
+        hits = rates[metric] > 0
+        flagged.append(
+            pd.DataFrame({"metric": metric, "value": rates[metric][hits], "z": np.inf})
+        )
+    return pd.concat(flagged).reset_index().sort_values(QUALITY_KEYS, ignore_index=True)
@@ -0,0 +1,352 @@
+"""Backends de consulta: filtros e agregações usados pelas páginas.
+
+As páginas descrevem *o que* querem (um `Filters` + dimensões de agrupamento)
+e recebem de volta DataFrames pequenos, já agregados. Dois backends
+implementam a mesma interface:
+
+- `PandasBackend`: opera sobre o DataFrame em memória (padrão);
+- `DuckDBBackend`: executa as mesmas operações em SQL num DuckDB embutido
+  sobre a base particionada por mês (`dataset.py`), sem precisar manter a
+  base inteira na RAM;
+- `PolarsBackend` (em `polars_backend.py`): planos preguiçosos do Polars
+  sobre as mesmas partições, com os group-bys em todos os núcleos.
+
+Nos backends sobre Parquet, só as partições que cruzam o intervalo de datas
+do filtro são lidas; no pandas, a base fica ordenada por data e o intervalo
+vira um recorte contíguo, sem percorrer o resto do histórico.
+
+O backend é escolhido pela variável de ambiente `QUERY_BACKEND`
+(`pandas`, `duckdb` ou `polars`).
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.data_loader import (
+    DIMENSIONS,
+    MEASURES,
+    CACHE_DIR,
+    build_indexes,
+    get_snapshot,
+)
+from pages.utils.dataset import (
+    DATASET_DIR,
+    arrow_table,
+    is_current,
+    manifest_indexes,
+    partition_files,
+    read_manifest,
+    write_dataset,
+)
+from pages.utils.file_lock import file_lock
+from pages.utils.timing import span
+
+QUERY_BACKEND = os.environ.get("QUERY_BACKEND", "pandas")
+
+RATES = ["retention_rate", "human_request_rate", "efficiency_score"]
+# medidas de que cada taxa depende em `add_rates`
+RATE_MEASURES = {
+    "retention_rate": ["sessions_total", "session_retained"],
+    "human_request_rate": ["sessions_total", "sessions_human_assistance"],
+    "efficiency_score": [
+        "sessions_total",
+        "session_retained",
+        "sessions_human_assistance",
+    ],
+}
+# linhas por lote em `iter_batches`
+BATCH_ROWS = 100_000
+
+
+@dataclass(frozen=True)
+class Filters:
+    """Estado dos filtros de uma página.
+
+    As datas são inclusivas (o dia final inteiro entra no intervalo) e cada
+    dimensão vazia significa "sem filtro".
+    """
+
+    start_date: object = None
+    end_date: object = None
+    bot: tuple = ()
+    tech: tuple = ()
+    font: tuple = ()
+    topic: tuple = ()
+    subject: tuple = ()
+
+    def date_bounds(self):
+        """Retorna (início, fim exclusivo) como Timestamps, ou None quando aberto."""
+        start = None if self.start_date is None else pd.Timestamp(self.start_date)
+        end = (
+            None
+            if self.end_date is None
+            else pd.Timestamp(self.end_date).normalize() + pd.Timedelta(days=1)
+        )
+        return start, end
+
+
+def add_rates(df, rates):
+    """Acrescenta as taxas derivadas pedidas (NaN quando não há sessões)."""
+    total = df["sessions_total"].where(df["sessions_total"] != 0)
+    retention = lambda: df["session_retained"] / total
+    human = lambda: df["sessions_human_assistance"] / total
+    columns = {
+        "retention_rate": retention,
+        "human_request_rate": human,
+        "efficiency_score": lambda: retention() - human(),
+    }
+    for rate in rates:
+        df[rate] = columns[rate]()
+    return df
+
+
+# ==========================================================
+# BACKEND PANDAS
+# ==========================================================
+class PandasBackend:
+    name = "pandas"
+
+    def __init__(self, df, indexes=None):
+        # ordenada por data, o filtro de datas vira um recorte por busca binária
+        if not df["date"].is_monotonic_increasing:
+            df = df.sort_values("date", kind="stable", ignore_index=True)
+        self.df = df
+        self._dates = df["date"].to_numpy()
+        self._indexes = indexes
+
+    def indexes(self):
+        if self._indexes is None:
+            self._indexes = build_indexes(self.df)
+        return self._indexes
+
+    def _date_slice(self, filters):
+        start, end = filters.date_bounds()
+        lo = 0 if start is None else self._dates.searchsorted(start.to_datetime64())
+        hi = (
+            len(self._dates)
+            if end is None
+            else self._dates.searchsorted(end.to_datetime64())
+        )
+        return self.df.iloc[lo:hi]
+
+    @staticmethod
+    def _mask(df, filters):
+        mask = np.ones(len(df), dtype=bool)
+        for dim in DIMENSIONS:
+            values = getattr(filters, dim)
+            if values:
+                mask &= df[dim].isin(values).to_numpy()
+        return mask
+
+    def filter(self, filters):
+        """Retorna as linhas que passam nos filtros."""
+        with span("filter"):
+            df = self._date_slice(filters)
+            return df[self._mask(df, filters)]
+
+    def iter_batches(self, filters, batch_size=BATCH_ROWS):
+        """Percorre as linhas filtradas em tabelas Arrow de até `batch_size` linhas.
+
+        A seleção inteira nunca é copiada. Sempre entrega ao menos um lote
+        (vazio se nada passar nos filtros), para que quem grava conheça as
+        colunas.
+        """
+        df = self._date_slice(filters)
+        for lo in range(0, max(len(df), 1), batch_size):
+            chunk = df.iloc[lo : lo + batch_size]
+            yield arrow_table(chunk[self._mask(chunk, filters)])
+
+    def aggregate(self, filters, by=(), measures=MEASURES, rates=(), dropna=True):
+        """Soma as medidas por `by` (lista vazia = total geral) e calcula as taxas.
+
+        Com `dropna=False`, linhas com chave nula formam um grupo próprio
+        (ao final da ordenação) em vez de ficarem de fora.
+        """
+        by, measures = list(by), list(measures)
+        with span("aggregate", backend=self.name, by=",".join(by)):
+            df = self.filter(filters)
+            if by:
+                result = df.groupby(by, as_index=False, observed=True, dropna=dropna)[
+                    measures
+                ].sum()
+                # chaves como texto, como nos outros backends
+                categorical = [
+                    col
+                    for col in by
+                    if isinstance(result[col].dtype, pd.CategoricalDtype)
+                ]
+                result = result.astype(dict.fromkeys(categorical, object))
+            else:
+                result = pd.DataFrame({m: [df[m].sum()] for m in measures})
+            return add_rates(result, rates)
+
+
+# ==========================================================
+# BACKEND DUCKDB
+# ==========================================================
+class DuckDBBackend:
+    name = "duckdb"
+
+    def __init__(self, dataset_dir=DATASET_DIR):
+        import duckdb
+
+        self._con = duckdb.connect(":memory:")
+        # tudo é local: nunca tenta baixar extensões
+        self._con.execute("SET autoinstall_known_extensions = false")
+        self._con.execute("SET autoload_known_extensions = false")
+        self._dir = dataset_dir
+        self._manifest = read_manifest(dataset_dir)
+        self._indexes = manifest_indexes(self._manifest)
+        self._types = None
+
+    def _query(self, sql, params=()):
+        # um cursor por consulta: conexões DuckDB não são seguras entre threads
+        return self._con.cursor().execute(sql, list(params)).df()
+
+    def _source(self, filters=None):
+        """`read_parquet` só das partições que cruzam o intervalo de datas."""
+        start, end = (None, None) if filters is None else filters.date_bounds()
+        files = partition_files(self._manifest, self._dir, start, end)
+        paths = ", ".join("'" + f.replace("'", "''") + "'" for f in files)
+        return f"read_parquet([{paths}], hive_partitioning = false) AS sessions"
+
+    def _where(self, filters, extra=()):
+        clauses, params = list(extra), []
+        start, end = filters.date_bounds()
+        if start is not None:
+            clauses.append('"date" >= ?')
+            params.append(start)
+        if end is not None:
+            clauses.append('"date" < ?')
+            params.append(end)
+        for dim in DIMENSIONS:
+            values = getattr(filters, dim)
+            if values:
+                placeholders = ", ".join("?" * len(values))
+                clauses.append(f'"{dim}" IN ({placeholders})')
+                params.extend(values)
+        sql = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return sql, params
+
+    def indexes(self):
+        return self._indexes
+
+    def filter(self, filters):
+        where, params = self._where(filters)
+        with span("filter", backend=self.name):
+            return self._query(f"SELECT * FROM {self._source(filters)}{where}", params)
+
+    def iter_batches(self, filters, batch_size=BATCH_ROWS):
+        import pyarrow as pa
+
+        where, params = self._where(filters)
+        sql = f"SELECT * FROM {self._source(filters)}{where}"
+        # relação preguiçosa: o resultado vem em lotes Arrow, sem ser materializado
+        relation = self._con.cursor().sql(sql, params=params)
+        # `to_arrow_reader` substitui `fetch_arrow_reader` no DuckDB 1.4+
+        to_reader = getattr(relation, "to_arrow_reader", None)
+        reader = (to_reader or relation.fetch_arrow_reader)(batch_size)
+        empty = True
+        for batch in reader:
+            empty = False
+            yield pa.Table.from_batches([batch])
+        if empty:
+            yield reader.schema.empty_table()
+
+    def aggregate(self, filters, by=(), measures=MEASURES, rates=(), dropna=True):
+        by, measures = list(by), list(measures)
+        # como no pandas, linhas com chave de agrupamento nula ficam de fora
+        not_null = [f'"{col}" IS NOT NULL' for col in by] if dropna else []
+        where, params = self._where(filters, not_null)
+        keys = ", ".join(f'"{col}"' for col in by)
+        sums = ", ".join(
+            f'CAST(COALESCE(SUM("{m}"), 0) AS {self._sum_type(m)}) AS "{m}"'
+            for m in measures
+        )
+        source = self._source(filters)
+        sql = f"SELECT {keys + ', ' if by else ''}{sums} FROM {source}{where}"
+        if by:
+            sql += f" GROUP BY {keys} ORDER BY {keys}"
+
+        total = 'NULLIF("sessions_total", 0)'
+        retention = f'CAST("session_retained" AS DOUBLE) / {total}'
+        human = f'CAST("sessions_human_assistance" AS DOUBLE) / {total}'
+        expressions = {
+            "retention_rate": retention,
+            "human_request_rate": human,
+            "efficiency_score": f"{retention} - {human}",
+        }
+        if rates:
+            rate_sql = ", ".join(f"{expressions[rate]} AS {rate}" for rate in rates)
+            sql = f"SELECT *, {rate_sql} FROM ({sql}) AS agg"
+            if by:
+                sql += f" ORDER BY {keys}"
+        with span("aggregate", backend=self.name, by=",".join(by)):
+            return self._query(sql, params)
+
+    def _sum_type(self, column):
+        """Mantém somas inteiras como inteiros, como o pandas faz."""
+        if self._types is None:
+            described = self._query(f"DESCRIBE SELECT * FROM {self._source()}")
+            self._types = dict(
+                zip(described["column_name"], described["column_type"])
+            )
+        integer = self._types[column] in {"TINYINT", "SMALLINT", "INTEGER", "BIGINT"}
+        return "BIGINT" if integer else "DOUBLE"
+
+
+# ==========================================================
+# SELEÇÃO DO BACKEND
+# ==========================================================
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def build_backend(name, snapshot):
+    """Cria o backend `name` sobre a versão da base descrita por `snapshot`.
+
+    O backend guarda a geração em `generation`, que identifica os dados nas
+    chaves do cache de resultados (`result_cache.py`).
+    """
+    if name == "pandas":
+        backend = PandasBackend(snapshot["df"], snapshot["indexes"])
+    elif name in ("duckdb", "polars"):
+        # vários workers: a base particionada é gravada por um só
+        with file_lock(CACHE_DIR / "dataset.lock"):
+            if not is_current(read_manifest(), snapshot["generation"]):
+                write_dataset(snapshot["df"], generation=snapshot["generation"])
+        if name == "duckdb":
+            backend = DuckDBBackend()
+        else:
+            from pages.utils.polars_backend import PolarsBackend
+
+            backend = PolarsBackend(DATASET_DIR)
+    else:
+        raise ValueError(f"Backend de consulta desconhecido: {name!r}")
+    backend.generation = snapshot["generation"]
+    return backend
+
+
+def backend_for(snapshot, name=None):
+    """Retorna o backend de `snapshot`, criando-o uma única vez por geração."""
+    key = (name or QUERY_BACKEND, snapshot["generation"])
+    with _backends_lock:
+        if key not in _backends:
+            _backends[key] = build_backend(key[0], snapshot)
+        return _backends[key]
+
+
+def release_backends(generation):
+    """Descarta os backends de outras gerações (após a troca do snapshot)."""
+    with _backends_lock:
+        for key in [key for key in _backends if key[1] != generation]:
+            del _backends[key]
+
+
+def get_backend(name=None):
+    """Retorna o backend configurado para o snapshot publicado no processo."""
+    return backend_for(get_snapshot(), name)
@@ -0,0 +1,96 @@
+"""Recarregamento a quente da base, sem reiniciar o servidor.
+
+Uma thread em segundo plano verifica periodicamente a geração da base
+(`dataset_generation`: planilha + incrementos ingeridos). Quando ela muda,
+fora do caminho das requisições:
+
+1. carrega o snapshot novo (o gravado pela ingestão/prewarm ou, se não
+   houver, monta a partir da planilha);
+2. prepara o backend de consulta e, com `PREWARM_FORECAST`, a projeção;
+3. publica o snapshot com uma única troca de referência e apaga do cache de
+   resultados (`result_cache.py`) as entradas das gerações anteriores.
+
+Reruns já em andamento terminam sobre o snapshot antigo; os seguintes usam o
+novo. Os backends da geração antiga são descartados e a memória dela é
+liberada quando o último rerun que a referencia termina.
+
+`RELOAD_INTERVAL` define o intervalo em segundos (padrão 5; 0 desliga).
+"""
+
+import gc
+import logging
+import os
+import threading
+import time
+
+from pages.utils.data_loader import (
+    dataset_generation,
+    get_snapshot,
+    load_snapshot,
+    publish_snapshot,
+)
+from pages.utils.incremental import release_stale
+from pages.utils.prewarm import PREWARM_FORECAST, write_status
+from pages.utils.query import backend_for, release_backends
+from pages.utils.result_cache import purge_stale
+
+RELOAD_INTERVAL = float(os.environ.get("RELOAD_INTERVAL", "5"))
+
+logger = logging.getLogger(__name__)
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def reload_if_changed(forecast=PREWARM_FORECAST):
+    """Publica um snapshot novo se a base mudou. Retorna True se houve troca."""
+    current = get_snapshot()
+    if dataset_generation() == current["generation"]:
+        return False
+
+    start = time.perf_counter()
+    snapshot = load_snapshot()
+    backend_for(snapshot).indexes()
+    if forecast:
+        from pages.utils.forecast import daily_series, get_projection
+
+        get_projection(daily_series(snapshot["daily"]), snapshot["generation"])
+
+    publish_snapshot(snapshot)
+    release_backends(snapshot["generation"])
+    release_stale(snapshot["generation"])
+    purge_stale(snapshot["generation"])
+    write_status(
+        "ready", rows=len(snapshot["df"]), reloaded_from=current["generation"]
+    )
+
+    # o DataFrame antigo pode ter ciclos de referência: libera já o que der
+    del current
+    gc.collect()
+    logger.info(
+        "Base recarregada: geração %s em %.2f s",
+        snapshot["generation"],
+        time.perf_counter() - start,
+    )
+    return True
+
+
+def _watch(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            reload_if_changed()
+        except Exception:
+            # arquivo ainda sendo copiado, planilha inválida...: tenta de novo depois
+            logger.exception("Falha ao recarregar a base; mantendo a versão atual")
+
+
+def start_watcher(interval=RELOAD_INTERVAL):
+    """Inicia, uma única vez por processo, a thread que observa a base."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None and interval > 0:
+            _watcher = threading.Thread(
+                target=_watch, args=(interval,), name="dataset-reload", daemon=True
+            )
+            _watcher.start()
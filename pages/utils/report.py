@@ -0,0 +1,355 @@
+"""Relatório mensal em lote das páginas do painel, sem o Streamlit.
+
+Gera, para cada mês e cada segmento pedidos, os KPIs e os gráficos das
+páginas de visão geral, agosto (tópicos), comparação de tecnologias e funil,
+além das projeções da página 3 (uma vez por pacote: a projeção é da base
+inteira). Os números e as figuras vêm das mesmas funções que as páginas usam
+(`query`, `funnel`, `charts`), então o relatório mostra o que o painel
+mostraria com os mesmos filtros.
+
+Cada relatório (mês × segmento) é montado num processo do pool, que carrega
+o snapshot do disco uma vez e grava as figuras como HTML estático (e PNG, se
+o `kaleido` estiver instalado). O processo principal junta tudo num único
+`index.html` autocontido e num `.zip` com os PNGs:
+
+    python -m pages.utils.report --months 2025-07,2025-08
+    python -m pages.utils.report --by bot,tech --png --workers 4
+"""
+
+import argparse
+import html
+import itertools
+import multiprocessing
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from pages.utils.charts import (
+    daily_sessions_chart,
+    efficiency_bar_chart,
+    funnel_chart,
+    funnel_rates_chart,
+    performance_chart,
+    performance_frame,
+    projection_chart,
+    retention_rate_chart,
+    topic_retention_chart,
+)
+from pages.utils.data_loader import ROOT, get_snapshot
+from pages.utils.funnel import daily_funnel, funnel_cube, rollup
+from pages.utils.query import RATES, Filters, get_backend
+
+REPORT_DIR = ROOT / "reports"
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", "0")) or os.cpu_count()
+# dimensões que podem abrir os relatórios em segmentos
+SEGMENT_DIMENSIONS = ["bot", "tech", "font", "topic"]
+
+PAGE_STYLE = """
+body { font-family: sans-serif; margin: 2rem auto; max-width: 1100px; }
+nav li { margin: 0.2rem 0; }
+section.report { border-top: 2px solid #ddd; margin-top: 3rem; }
+table.kpis td { padding: 0.3rem 1.5rem 0.3rem 0; }
+table.kpis td:last-child { font-weight: bold; }
+.empty { color: #888; }
+"""
+
+
+# ==========================================================
+# TRABALHOS
+# ==========================================================
+def month_bounds(month):
+    """Primeiro e último dia de `month` (AAAA-MM)."""
+    period = pd.Period(month, freq="M")
+    return period.start_time.date(), period.end_time.date()
+
+
+def report_jobs(indexes, months, by=()):
+    """Um relatório por mês para a base inteira e para cada segmento de `by`.
+
+    Os segmentos são as combinações dos valores das dimensões de `by`.
+    """
+    options = [indexes["options"][dim] for dim in by]
+    segments = [{}] + [dict(zip(by, combo)) for combo in itertools.product(*options)]
+    return [
+        {"month": month, "segment": segment} for month in months for segment in segments
+    ]
+
+
+def job_title(job):
+    if job.get("projection"):
+        return "Projeção até dezembro de 2025"
+    segment = " · ".join(map(str, job["segment"].values())) or "Base completa"
+    return f"{job['month']} — {segment}"
+
+
+def job_slug(job):
+    return re.sub(r"\W+", "-", job_title(job).lower()).strip("-")
+
+
+# ==========================================================
+# CONTEÚDO DE CADA RELATÓRIO
+# ==========================================================
+def month_report(backend, month, segment):
+    """KPIs e figuras de um mês × segmento, ou None se não houver sessões."""
+    start, end = month_bounds(month)
+    filters = Filters(
+        start_date=start,
+        end_date=end,
+        **{dim: (value,) for dim, value in segment.items()},
+    )
+    df_daily = backend.aggregate(
+        filters, by=["date"], rates=["retention_rate", "human_request_rate"]
+    )
+    if df_daily.empty:
+        return None
+
+    # visão geral e funil: o funil geral é a soma do cubo, como na página 9
+    funnel = rollup(funnel_cube(backend, filters)).iloc[0]
+    kpis = {
+        "Sessões Totais": f"{funnel['sessions_total']:,.0f}".replace(",", "."),
+        "Taxa de Retenção": f"{funnel['retention_rate']:.1%}",
+        "Taxa de Pedido Humano": f"{funnel['human_request_rate']:.1%}",
+        "Taxa de Sessões Não Resolvidas": f"{funnel['loss_rate']:.1%}",
+    }
+    figures = [
+        daily_sessions_chart(df_daily),
+        retention_rate_chart(df_daily),
+    ]
+
+    # tópicos de maior volume (página de agosto)
+    df_topics = (
+        backend.aggregate(
+            filters, by=["topic"], rates=["retention_rate", "human_request_rate"]
+        )
+        .sort_values("sessions_total", ascending=False)
+        .head(10)
+    )
+    figures.append(topic_retention_chart(df_topics))
+
+    # comparativo entre bots, tecnologias e canais
+    summaries = {
+        column: backend.aggregate(filters, by=[column], rates=RATES)
+        for column in ("bot", "tech", "font")
+    }
+    figures += [
+        efficiency_bar_chart(
+            summaries["bot"], "bot", "Bots — Volume e Eficiência", "Bot"
+        ),
+        efficiency_bar_chart(
+            summaries["tech"],
+            "tech",
+            "Tecnologias — Volume e Eficiência",
+            "Tecnologia",
+        ),
+        efficiency_bar_chart(
+            summaries["font"], "font", "Canais — Volume e Eficiência", "Fonte"
+        ),
+        performance_chart(performance_frame(*summaries.values())),
+    ]
+
+    figures += [
+        funnel_chart(
+            funnel["sessions_total"],
+            funnel["session_retained"],
+            funnel["loss_count"],
+            title="Fluxo de Sessões: Totais → Retidas → Não Resolvidas",
+        ),
+        funnel_rates_chart(daily_funnel(backend, filters)),
+    ]
+    return kpis, figures
+
+
+def projection_report(snapshot):
+    """KPIs e figuras da página de projeção."""
+    from pages.utils.forecast import daily_series, get_projection
+
+    df_daily = daily_series(snapshot["daily"])
+    df_future = get_projection(df_daily, snapshot["generation"])
+    last_sessions = f"{df_daily['sessions_total'].iloc[-1]:,.0f}".replace(",", ".")
+    kpis = {
+        "Último valor de sessões": last_sessions,
+        "Retenção atual": f"{df_daily['retention_rate'].iloc[-1]:.1%}",
+        "Retenção projetada (Dez/25)": f"{df_future['retention_rate'].iloc[-1]:.1%}",
+    }
+    figures = [
+        projection_chart(
+            df_daily,
+            df_future,
+            "retention_rate",
+            title="Taxa de Retenção — Histórico e Projeção Diária",
+            yaxis_title="Taxa de Retenção",
+        ),
+        projection_chart(
+            df_daily,
+            df_future,
+            "loss_rate",
+            title="Taxa de Sessões Não Resolvidas — Histórico e Projeção Diária",
+            yaxis_title="Taxa de Perda (Loss)",
+        ),
+        projection_chart(
+            df_daily,
+            df_future,
+            "sessions_total",
+            title="Volume Diário de Sessões — Histórico vs Projeção",
+            yaxis_title="Sessões Totais",
+        ),
+    ]
+    return kpis, figures
+
+
+# ==========================================================
+# RENDERIZAÇÃO (NOS WORKERS)
+# ==========================================================
+def render_job(job, png_dir=None):
+    """Monta um relatório e retorna o trecho HTML (e grava os PNGs pedidos)."""
+    if job.get("projection"):
+        content = projection_report(get_snapshot())
+    else:
+        content = month_report(get_backend(), job["month"], job["segment"])
+
+    slug = job_slug(job)
+    title = html.escape(job_title(job))
+    parts = [f'<section class="report" id="{slug}"><h2>{title}</h2>']
+    if content is None:
+        parts.append('<p class="empty">Sem sessões neste mês e segmento.</p>')
+        return "".join(parts) + "</section>"
+
+    kpis, figures = content
+    parts.append('<table class="kpis">')
+    parts += [
+        f"<tr><td>{name}</td><td>{value}</td></tr>" for name, value in kpis.items()
+    ]
+    parts.append("</table>")
+    for number, fig in enumerate(figures, start=1):
+        fig.update_layout(template="plotly_white")
+        parts.append(fig.to_html(full_html=False, include_plotlyjs=False))
+        if png_dir is not None:
+            fig.write_image(Path(png_dir) / f"{slug}-{number:02d}.png", width=1100)
+    parts.append("</section>")
+    return "".join(parts)
+
+
+def _render(args):
+    return render_job(*args)
+
+
+def render_all(jobs, png_dir=None, workers=REPORT_WORKERS):
+    """Renderiza os relatórios em paralelo, na ordem de `jobs`."""
+    tasks = [(job, png_dir) for job in jobs]
+    workers = min(workers, len(tasks))
+    if workers <= 1:
+        return [_render(task) for task in tasks]
+    # "spawn", como em `load_data`; cada worker lê o snapshot salvo uma vez
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(_render, tasks))
+
+
+# ==========================================================
+# PACOTE
+# ==========================================================
+def write_bundle(jobs, sections, out_dir, plotlyjs="inline"):
+    """Grava o `index.html` com sumário e todas as seções, e retorna o caminho."""
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+    if plotlyjs == "cdn":
+        version = get_plotlyjs_version()
+        script = f'<script src="https://cdn.plot.ly/plotly-{version}.min.js"></script>'
+    else:
+        # uma única cópia do plotly.js para todas as figuras do pacote
+        script = f"<script>{get_plotlyjs()}</script>"
+    toc = "".join(
+        f'<li><a href="#{job_slug(job)}">{html.escape(job_title(job))}</a></li>'
+        for job in jobs
+    )
+    page = (
+        '<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">'
+        f"<title>Relatório do painel de chatbots</title><style>{PAGE_STYLE}</style>"
+        f"{script}</head><body><h1>📊 Relatório do painel de chatbots</h1>"
+        f"<nav><ul>{toc}</ul></nav>{''.join(sections)}</body></html>"
+    )
+    path = Path(out_dir) / "index.html"
+    path.write_text(page, encoding="utf-8")
+    return path
+
+
+def build_report(
+    months,
+    by=(),
+    out=REPORT_DIR,
+    png=False,
+    projection=True,
+    plotlyjs="inline",
+    workers=REPORT_WORKERS,
+):
+    """Gera o pacote completo e retorna o `.zip` e o número de relatórios."""
+    # garante o snapshot salvo antes de abrir os workers, que o leem do disco
+    jobs = report_jobs(get_snapshot()["indexes"], months, by)
+    if projection:
+        jobs.insert(0, {"projection": True})
+
+    out_dir = Path(out) / f"relatorio-{time.strftime('%Y%m%d-%H%M%S')}"
+    png_dir = out_dir / "png" if png else None
+    (png_dir or out_dir).mkdir(parents=True, exist_ok=True)
+
+    sections = render_all(jobs, png_dir, workers)
+    write_bundle(jobs, sections, out_dir, plotlyjs)
+    return Path(shutil.make_archive(str(out_dir), "zip", out_dir)), len(jobs)
+
+
+# ==========================================================
+# LINHA DE COMANDO
+# ==========================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--months",
+        type=lambda value: value.split(","),
+        help="meses AAAA-MM separados por vírgula (padrão: o último mês da base)",
+    )
+    parser.add_argument(
+        "--by",
+        type=lambda value: value.split(",") if value else [],
+        default=[],
+        help=f"dimensões dos segmentos, entre {', '.join(SEGMENT_DIMENSIONS)}",
+    )
+    parser.add_argument("--out", type=Path, default=REPORT_DIR)
+    parser.add_argument("--workers", type=int, default=REPORT_WORKERS)
+    parser.add_argument("--png", action="store_true", help="grava PNGs (kaleido)")
+    parser.add_argument("--cdn", action="store_true", help="plotly.js via CDN")
+    parser.add_argument("--no-projection", action="store_true")
+    args = parser.parse_args()
+
+    unknown = set(args.by) - set(SEGMENT_DIMENSIONS)
+    if unknown:
+        parser.error(f"dimensões desconhecidas: {', '.join(sorted(unknown))}")
+    if args.png:
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            parser.error("--png requer o kaleido: pip install '.[report]'")
+    months = args.months
+    if not months:
+        last_day = get_snapshot()["indexes"]["date_range"][1]
+        months = [pd.Timestamp(last_day).strftime("%Y-%m")]
+
+    start = time.perf_counter()
+    path, count = build_report(
+        months,
+        args.by,
+        args.out,
+        png=args.png,
+        projection=not args.no_projection,
+        plotlyjs="cdn" if args.cdn else "inline",
+        workers=args.workers,
+    )
+    print(f"{count} relatórios em {path} ({time.perf_counter() - start:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
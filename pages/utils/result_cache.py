@@ -0,0 +1,280 @@
+"""Cache de resultados em disco, compartilhado entre processos e reinícios.
+
+Os caches do Streamlit vivem na memória de um processo: somem a cada
+reinício e cada worker (`serve.py`) refaz os mesmos cálculos. Os resultados
+mais caros — a projeção da página 3, os resumos por tópico e assunto e o
+perfil de qualidade — são iguais para todos que usam os mesmos filtros, então
+ficam num SQLite em `.cache/results.sqlite` (`RESULT_CACHE_PATH`), com um só
+decorador:
+
+    @disk_cached()
+    def topic_summary(backend, filters): ...
+
+- a chave é o hash do nome da função, da geração da base e dos argumentos:
+  `Filters` e valores simples pelo conteúdo, DataFrames pelo hash das linhas
+  e backends pelo nome e pela geração. A geração é a do parâmetro
+  `generation`, se a função tiver um, ou a do backend recebido, junto com
+  o formato do snapshot (`SNAPSHOT_FORMAT`, que muda também com as regras
+  da quarentena): a mesma planilha com outras linhas na base. Sem geração
+  (um backend dos benchmarks, `generation=None`) ou com argumentos de outro
+  tipo, a chamada vai direto à função;
+- cada entrada vale `ttl` segundos (`RESULT_CACHE_TTL`, padrão 1 dia; None no
+  decorador = até a base mudar), e o total fica abaixo de
+  `RESULT_CACHE_MAX_MB`, descartando as menos usadas recentemente;
+- a gravação é uma transação do SQLite: um leitor nunca vê entrada pela
+  metade. Numa falta, o cálculo é feito sob uma trava de arquivo, então só
+  um processo calcula e os outros leem o resultado;
+- quando a base muda, `purge_stale` apaga as entradas das outras gerações
+  (chamado pelo recarregamento e pelo prewarm).
+
+Se o SQLite falhar, a função é chamada direto. Cada leitura devolve uma
+cópia nova do resultado, que o chamador pode alterar à vontade.
+"""
+
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, is_dataclass
+from datetime import date
+from functools import wraps
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.data_loader import CACHE_DIR, SNAPSHOT_FORMAT
+from pages.utils.file_lock import file_lock
+
+RESULT_CACHE_PATH = Path(
+    os.environ.get("RESULT_CACHE_PATH", CACHE_DIR / "results.sqlite")
+)
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", "86400"))
+RESULT_CACHE_MAX_MB = float(os.environ.get("RESULT_CACHE_MAX_MB", "256"))
+# travas de cálculo por prefixo da chave (e não um arquivo por entrada)
+LOCK_STRIPES = 64
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_MISS = object()
+
+
+class Uncacheable(TypeError):
+    """Argumento sem representação estável entre processos."""
+
+
+# ==========================================================
+# CHAVES
+# ==========================================================
+def token(value):
+    """Representação estável (entre processos) de um argumento."""
+    if value is None or isinstance(value, (str, bool, int, float, date)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        rows = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        schema = (
+            [(str(c), str(t)) for c, t in value.dtypes.items()]
+            if isinstance(value, pd.DataFrame)
+            else [(str(value.name), str(value.dtype))]
+        )
+        return ("frame", hashlib.sha256(rows.tobytes()).hexdigest(), schema)
+    if is_dataclass(value) and not isinstance(value, type):
+        return (type(value).__name__, token(asdict(value)))
+    if isinstance(value, dict):
+        return ("dict", sorted((str(k), token(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(token(item) for item in value)
+    # backends de consulta: o conteúdo é o da geração da base
+    if getattr(value, "generation", None) is not None and hasattr(value, "name"):
+        return ("backend", value.name, value.generation)
+    raise Uncacheable(type(value).__name__)
+
+
+def cache_generation(generation):
+    """Geração como gravada no cache: a da base e o formato do snapshot.
+
+    Um formato novo (as regras da quarentena, por exemplo) muda as linhas da
+    base sem mudar a planilha: as entradas antigas deixam de casar, e
+    `purge_stale` as apaga.
+    """
+    return f"{generation}@v{SNAPSHOT_FORMAT}"
+
+
+def generation_of(arguments):
+    """Geração da base a que os argumentos (já nomeados) se referem."""
+    if isinstance(arguments.get("generation"), str):
+        return cache_generation(arguments["generation"])
+    for value in arguments.values():
+        if getattr(value, "generation", None) is not None and hasattr(value, "name"):
+            return cache_generation(value.generation)
+    raise Uncacheable("sem geração da base")
+
+
+# ==========================================================
+# ARMAZENAMENTO
+# ==========================================================
+def _connection():
+    """Conexão SQLite desta thread (o módulo sqlite3 não as compartilha)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != RESULT_CACHE_PATH:
+        RESULT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(RESULT_CACHE_PATH, timeout=30, isolation_level=None)
+        # WAL: leitores de outros processos não esperam as gravações
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                generation TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                size INTEGER NOT NULL,
+                value BLOB NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)"
+        )
+        _local.conn, _local.path = conn, RESULT_CACHE_PATH
+    return conn
+
+
+def _read(key, ttl):
+    try:
+        return get(key, ttl)
+    except sqlite3.Error:
+        logger.exception("Falha ao ler o cache de resultados")
+        return _MISS
+
+
+def _write(key, name, generation, value):
+    try:
+        put(key, name, generation, value)
+    except sqlite3.Error:
+        logger.exception("Falha ao gravar no cache de resultados")
+
+
+def get(key, ttl):
+    """Valor guardado em `key`, ou `_MISS` se não houver ou tiver vencido."""
+    conn = _connection()
+    row = conn.execute(
+        "SELECT value, created FROM results WHERE key = ?", (key,)
+    ).fetchone()
+    if row is None:
+        return _MISS
+    now = time.time()
+    if ttl is not None and now - row[1] > ttl:
+        conn.execute("DELETE FROM results WHERE key = ?", (key,))
+        return _MISS
+    conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+    return pickle.loads(row[0])
+
+
+def put(key, name, generation, value):
+    """Grava `value` e descarta as entradas menos usadas acima do limite."""
+    blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    now = time.time()
+    conn = _connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, name, generation, now, now, len(blob), blob),
+        )
+        (total,) = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        excess = total - RESULT_CACHE_MAX_MB * 1024**2
+        if excess > 0:
+            evict(conn, excess, keep=key)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def evict(conn, excess, keep):
+    """Apaga as entradas de acesso mais antigo até liberar `excess` bytes."""
+    freed, doomed = 0, []
+    for key, size in conn.execute(
+        "SELECT key, size FROM results WHERE key != ? ORDER BY accessed", (keep,)
+    ):
+        if freed >= excess:
+            break
+        doomed.append((key,))
+        freed += size
+    conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+
+def purge_stale(generation):
+    """Apaga as entradas de outras gerações da base ou formatos do snapshot."""
+    try:
+        cursor = _connection().execute(
+            "DELETE FROM results WHERE generation != ?", (cache_generation(generation),)
+        )
+        return cursor.rowcount
+    except sqlite3.Error:
+        logger.exception("Falha ao limpar o cache de resultados")
+        return 0
+
+
+def stats():
+    """Entradas e bytes por função: [{função, entradas, bytes}]."""
+    rows = _connection().execute(
+        "SELECT name, COUNT(*), SUM(size) FROM results GROUP BY name ORDER BY name"
+    ).fetchall()
+    return pd.DataFrame(rows, columns=["função", "entradas", "bytes"])
+
+
+# ==========================================================
+# DECORADOR
+# ==========================================================
+def disk_cached(ttl=RESULT_CACHE_TTL, version=1):
+    """Guarda os resultados da função no cache em disco.
+
+    `ttl` em segundos (None = até a base mudar); incremente `version` quando
+    o resultado da função mudar sem que os argumentos mudem.
+    """
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # f(a, b=1) e f(a) com o padrão b=1 têm a mesma chave
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            try:
+                generation = generation_of(bound.arguments)
+                parts = (name, version, generation, token(bound.arguments))
+            except Uncacheable:
+                return func(*args, **kwargs)
+            # repr e não pickle: o pickle depende da identidade dos objetos
+            key = hashlib.sha256(repr(parts).encode()).hexdigest()
+
+            value = _read(key, ttl)
+            if value is not _MISS:
+                return value
+            # só um processo calcula; os outros esperam e leem o resultado
+            stripe = int(key[:8], 16) % LOCK_STRIPES
+            with file_lock(RESULT_CACHE_PATH.parent / "locks" / f"{stripe}.lock"):
+                value = _read(key, ttl)
+                if value is _MISS:
+                    value = func(*args, **kwargs)
+                    _write(key, name, generation, value)
+            return value
+
+        return wrapper
+
+    return decorator
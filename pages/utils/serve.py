@@ -0,0 +1,255 @@
+"""Vários processos do Streamlit atrás de um balanceador local, com sessões fixas.
+
+Um processo do Streamlit roda os reruns de todas as sessões num único
+interpretador: um rerun pesado (a projeção da página 3, por exemplo) atrasa
+as interações de todos os outros usuários. Com `WORKERS=N`, este módulo sobe
+N processos do Streamlit em portas internas (`WORKER_PORT`, `WORKER_PORT+1`,
+...) e um proxy reverso em asyncio, sem dependências, na porta pública
+(`SERVE_PORT`):
+
+    WORKERS=4 python -m pages.utils.serve
+
+- sessões fixas: a primeira resposta a um navegador grava o cookie
+  `st_worker` com o worker escolhido (o de menos conexões abertas), e as
+  requisições seguintes vão para o mesmo processo: o websocket da sessão e
+  os downloads e uploads, que só existem no processo que os criou;
+- um worker que morre é reiniciado; enquanto isso, as conexões novas vão
+  para os outros (o navegador reconecta e abre uma sessão nova);
+- o trabalho caro é feito uma vez e compartilhado pelo disco: o snapshot
+  mapeado (`SNAPSHOT_STORE=arrow`, o padrão aqui), a base particionada e a
+  projeção são montados por um só processo (`file_lock.py`) e lidos pelos
+  demais. O segredo dos cookies do Streamlit também é o mesmo em todos.
+
+Com `WORKERS=1` (padrão), o Streamlit roda direto na porta pública, como
+antes, sem o proxy.
+"""
+
+import asyncio
+import logging
+import os
+import secrets
+import signal
+import sys
+import time
+from pathlib import Path
+
+# o mesmo ROOT de data_loader, sem importar o pandas no processo do proxy
+ROOT = Path(__file__).resolve().parents[2]
+WORKERS = int(os.environ.get("WORKERS", "1"))
+SERVE_ADDRESS = os.environ.get("SERVE_ADDRESS", "0.0.0.0")
+SERVE_PORT = int(
+    os.environ.get("SERVE_PORT", os.environ.get("STREAMLIT_SERVER_PORT", "8501"))
+)
+WORKER_PORT = int(os.environ.get("WORKER_PORT", SERVE_PORT + 1))
+
+COOKIE = "st_worker"
+# espera antes de reiniciar um worker e de voltar a tentar um que recusou conexão
+RETRY_S = 1.0
+COPY_BYTES = 64 * 1024
+UNAVAILABLE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Length: 0\r\nRetry-After: 1\r\nConnection: close\r\n\r\n"
+)
+
+logger = logging.getLogger(__name__)
+
+
+def streamlit_command(port, address):
+    return [
+        sys.executable,
+        "-m",
+        "streamlit",
+        "run",
+        str(ROOT / "app.py"),
+        f"--server.port={port}",
+        f"--server.address={address}",
+        "--server.headless=true",
+    ]
+
+
+def worker_env():
+    """Ambiente dos workers: snapshot compartilhado e o mesmo segredo de cookies."""
+    env = dict(os.environ)
+    env.setdefault("SNAPSHOT_STORE", "arrow")
+    # cookies assinados (XSRF) de um worker valem nos outros
+    env.setdefault("STREAMLIT_SERVER_COOKIE_SECRET", secrets.token_hex(32))
+    return env
+
+
+# ==========================================================
+# WORKERS
+# ==========================================================
+class Worker:
+    """Um processo do Streamlit numa porta interna."""
+
+    def __init__(self, index, port):
+        self.index = index
+        self.port = port
+        self.process = None
+        self.connections = 0
+        self.down_until = 0.0
+
+    def available(self):
+        return (
+            self.process is not None
+            and self.process.returncode is None
+            and time.monotonic() >= self.down_until
+        )
+
+    async def supervise(self, env):
+        """Mantém o processo no ar, reiniciando-o quando ele termina."""
+        while True:
+            self.process = await asyncio.create_subprocess_exec(
+                *streamlit_command(self.port, "127.0.0.1"), cwd=ROOT, env=env
+            )
+            code = await self.process.wait()
+            logger.warning("Worker %d saiu (código %s); reiniciando", self.index, code)
+            await asyncio.sleep(RETRY_S)
+
+    async def stop(self):
+        if self.process is not None and self.process.returncode is None:
+            self.process.terminate()
+            await self.process.wait()
+
+
+# ==========================================================
+# PROXY
+# ==========================================================
+def pinned_worker(head):
+    """Índice do worker gravado no cookie da requisição, ou None."""
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() != b"cookie":
+            continue
+        for item in value.split(b";"):
+            key, _, index = item.strip().partition(b"=")
+            if key == COOKIE.encode() and index.isdigit():
+                return int(index)
+    return None
+
+
+def with_cookie(head, index):
+    """Acrescenta ao cabeçalho da resposta o cookie que fixa o worker."""
+    cookie = f"Set-Cookie: {COOKIE}={index}; Path=/; HttpOnly; SameSite=Lax\r\n"
+    # `head` termina na linha em branco (\r\n\r\n)
+    return head[:-2] + cookie.encode() + b"\r\n"
+
+
+async def pipe(reader, writer):
+    try:
+        while data := await reader.read(COPY_BYTES):
+            writer.write(data)
+            await writer.drain()
+    except OSError:
+        pass
+
+
+class Proxy:
+    """Repassa cada conexão ao worker fixado pelo cookie (ou ao mais livre)."""
+
+    def __init__(self, workers):
+        self.workers = workers
+
+    def choose(self, pinned, exclude):
+        """Retorna (worker, se o cookie deve ser gravado) ou (None, True)."""
+        if pinned is not None and pinned < len(self.workers):
+            worker = self.workers[pinned]
+            if worker.available() and pinned not in exclude:
+                return worker, False
+        candidates = [
+            w for w in self.workers if w.available() and w.index not in exclude
+        ]
+        if not candidates:
+            return None, True
+        return min(candidates, key=lambda w: w.connections), True
+
+    async def connect(self, pinned):
+        """Conecta a um worker; os que recusarem ficam de fora por um tempo."""
+        tried = set()
+        while True:
+            worker, assign = self.choose(pinned, tried)
+            if worker is None:
+                return None, None, True
+            try:
+                upstream = await asyncio.open_connection("127.0.0.1", worker.port)
+                return worker, upstream, assign
+            except OSError:
+                # ainda subindo ou acabou de morrer
+                worker.down_until = time.monotonic() + RETRY_S
+                tried.add(worker.index)
+
+    async def handle(self, client_reader, client_writer):
+        try:
+            head = await client_reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+            client_writer.close()
+            return
+
+        worker, upstream, assign = await self.connect(pinned_worker(head))
+        if worker is None:
+            client_writer.write(UNAVAILABLE)
+            client_writer.close()
+            return
+
+        upstream_reader, upstream_writer = upstream
+        worker.connections += 1
+        tasks = []
+        try:
+            upstream_writer.write(head)
+            # o corpo (uploads) segue antes da resposta, que pode depender dele
+            tasks.append(asyncio.create_task(pipe(client_reader, upstream_writer)))
+            if assign:
+                response = await upstream_reader.readuntil(b"\r\n\r\n")
+                client_writer.write(with_cookie(response, worker.index))
+            tasks.append(asyncio.create_task(pipe(upstream_reader, client_writer)))
+            # a conexão acaba quando qualquer um dos lados fecha
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+            pass
+        finally:
+            worker.connections -= 1
+            for task in tasks:
+                task.cancel()
+            upstream_writer.close()
+            client_writer.close()
+
+
+# ==========================================================
+# INICIALIZAÇÃO
+# ==========================================================
+async def serve(workers=WORKERS, address=SERVE_ADDRESS, port=SERVE_PORT):
+    """Sobe os workers e o proxy; termina tudo com SIGINT/SIGTERM."""
+    env = worker_env()
+    pool = [Worker(i, WORKER_PORT + i) for i in range(workers)]
+    supervisors = [asyncio.create_task(worker.supervise(env)) for worker in pool]
+    server = await asyncio.start_server(Proxy(pool).handle, address, port)
+    logger.info(
+        "Proxy em %s:%d com %d workers (portas %d-%d)",
+        address,
+        port,
+        workers,
+        WORKER_PORT,
+        WORKER_PORT + workers - 1,
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    async with server:
+        await stop.wait()
+    for task in supervisors:
+        task.cancel()
+    await asyncio.gather(*(worker.stop() for worker in pool))
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if WORKERS <= 1:
+        os.chdir(ROOT)
+        os.execv(sys.executable, streamlit_command(SERVE_PORT, SERVE_ADDRESS))
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
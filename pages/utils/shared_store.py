@@ -0,0 +1,107 @@
+"""Snapshot em Arrow IPC mapeado em memória, compartilhado entre processos.
+
+Com `SNAPSHOT_STORE=arrow`, o snapshot deixa de ser um pickle que cada
+processo desserializa na própria memória: os DataFrames (base, rollup
+diário e estatísticas de qualidade) são gravados uma vez em arquivos Arrow
+IPC sem compressão, em `.cache/shared/<geração>/`, e cada worker os abre com
+`mmap` só para leitura. As colunas viram arrays numpy apontando direto para
+o arquivo, então:
+
+- as páginas físicas da base são do cache de arquivos do sistema e ficam
+  compartilhadas entre todos os workers (o RSS de cada um as inclui, o PSS
+  as divide);
+- abrir o snapshot não lê nem copia dados, só mapeia: o worker sobe na hora.
+
+Cada DataFrame vai num único lote (record batch): com vários lotes o pandas
+teria de concatenar, ou seja, copiar, as colunas. Os arrays mapeados são
+somente leitura; quem precisar alterar uma coluna deve copiá-la antes.
+
+Cada geração fica no seu diretório, gravado por inteiro ao lado e renomeado
+no fim; as anteriores são apagadas. Um worker que ainda usa uma geração
+apagada continua lendo dela: o arquivo só some de fato quando o último
+mapeamento é fechado.
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+
+import pyarrow as pa
+
+from pages.utils.data_loader import CACHE_DIR, SNAPSHOT_FORMAT
+
+STORE_DIR = CACHE_DIR / "shared"
+FRAMES = ("df", "daily", "quality")
+
+
+def store_path(generation):
+    """Diretório dos arquivos de uma geração da base."""
+    digest = hashlib.sha1(generation.encode()).hexdigest()[:16]
+    return STORE_DIR / f"v{SNAPSHOT_FORMAT}-{digest}"
+
+
+def write_frame(df, path):
+    """Grava o DataFrame em Arrow IPC, num único lote e sem compressão."""
+    table = pa.Table.from_pandas(df).combine_chunks()
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+
+
+def map_frame(path):
+    """Abre o arquivo com mmap e o converte em DataFrame sem copiar as colunas."""
+    with pa.memory_map(str(path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    # um bloco por coluna: é o que permite ao pandas usar os buffers do arquivo
+    return table.to_pandas(split_blocks=True)
+
+
+def write_store(snapshot):
+    """Grava o snapshot no armazenamento compartilhado e apaga as outras gerações.
+
+    Se outro processo gravou a mesma geração antes, a cópia dele é mantida.
+    """
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    final = store_path(snapshot["generation"])
+    tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=STORE_DIR))
+    # mkdtemp cria o diretório só para o dono; os workers podem ser outro usuário
+    tmp.chmod(0o755)
+    try:
+        for name in FRAMES:
+            write_frame(snapshot[name], tmp / f"{name}.arrow")
+        meta = {
+            key: value for key, value in snapshot.items() if key not in FRAMES
+        }
+        with open(tmp / "meta.pkl", "wb") as f:
+            pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp, final)
+    except OSError:
+        if not (final / "meta.pkl").exists():
+            raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    prune_store(keep=final)
+    return final
+
+
+def read_store(generation):
+    """Mapeia o snapshot da geração, ou None se ele ainda não foi gravado."""
+    path = store_path(generation)
+    try:
+        with open(path / "meta.pkl", "rb") as f:
+            meta = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    if meta.get("format") != SNAPSHOT_FORMAT or meta.get("generation") != generation:
+        return None
+    return {**meta, **{name: map_frame(path / f"{name}.arrow") for name in FRAMES}}
+
+
+def prune_store(keep):
+    """Apaga as gerações diferentes de `keep` (gravações em andamento ficam)."""
+    for path in STORE_DIR.iterdir():
+        if path != keep and path.is_dir() and not path.name.startswith(".tmp-"):
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,39 @@
+"""Agregações das páginas, compartilhadas entre sessões e workers.
+
+Muitos analistas abrem as mesmas visões (um bot, uma tecnologia, os últimos
+30 dias), e cada sessão refazia as mesmas agregações. O resultado depende só
+da geração da base e dos filtros, que a barra lateral entrega em forma
+canônica (`filters.py`: os valores de cada dimensão em ordem alfabética, as
+datas como dias). Com `cached_aggregate`, ele fica no cache de resultados em
+disco (`result_cache.py`): uma visão popular é calculada uma vez por geração
+e lida pelas outras sessões e pelos outros workers. Numa falta, a troca de
+um valor num filtro de múltipla escolha é respondida pelas parciais da
+consulta anterior (`incremental.py`), sem refiltrar a base.
+"""
+
+from pages.utils.incremental import incremental_aggregate
+from pages.utils.data_loader import MEASURES
+from pages.utils.query import RATES
+from pages.utils.result_cache import disk_cached
+from pages.utils.timing import timed
+
+TOPIC_RATES = ["retention_rate", "human_request_rate"]
+
+
+@timed()
+@disk_cached()
+def cached_aggregate(backend, filters, by=(), measures=MEASURES, rates=(), dropna=True):
+    """`backend.aggregate` com o resultado no cache de resultados."""
+    return incremental_aggregate(
+        backend, filters, by=by, measures=measures, rates=rates, dropna=dropna
+    )
+
+
+def topic_summary(backend, filters):
+    """Volume, retenção e pedidos de atendimento humano por tópico."""
+    return cached_aggregate(backend, filters, by=["topic"], rates=TOPIC_RATES)
+
+
+def subject_summary(backend, filters):
+    """Volume e taxas (com a eficiência) por tópico e assunto."""
+    return cached_aggregate(backend, filters, by=["topic", "subject"], rates=RATES)
@@ -0,0 +1,317 @@
+"""Medição das etapas de cada rerun (carga, filtros, agregações, gráficos).
+
+Ligada com `TIMING=1`. Cada página marca o início do rerun com
+`start_rerun(__file__)` e termina com `debug_panel()`, que mostra os tempos
+num painel da barra lateral e acrescenta uma linha ao log JSONL
+(`TIMING_LOG`, padrão `.cache/timing.jsonl`) com a sessão e a página.
+
+As etapas são marcadas com `span` (gerenciador de contexto) ou `timed`
+(decorador):
+
+    with span("groupby", by=by):
+        ...
+
+    @timed()
+    def daily_sessions_chart(df): ...
+
+Desligada, `timed` devolve a própria função e `span` devolve um objeto que
+não faz nada: o custo é uma chamada de função por etapa. Fora de um rerun
+(API, prewarm, scripts), os spans também não registram nada.
+
+Os mesmos dois pontos abrem e fecham a captura de perfil sob demanda
+(`profiling.py`), e `annotate` junta ao registro do rerun o estado da página
+(os filtros, por exemplo), que vai para o log e para o relatório do perfil.
+
+As seções que rodam sozinhas quando um widget delas muda usam `fragment` no
+lugar de `st.fragment`: no rerun da página, a seção é uma etapa dele; no
+rerun parcial, ela é medida como um rerun próprio, com o nome do fragmento.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+from pages.utils.memory import touch_session
+from pages.utils.profiling import finish_capture, start_capture
+
+TIMING_ENABLED = os.environ.get("TIMING", "0") == "1"
+TIMING_LOG = os.environ.get("TIMING_LOG")
+
+_local = threading.local()
+_log_lock = threading.Lock()
+_chart_timer_installed = False
+
+
+# ==========================================================
+# SPANS
+# ==========================================================
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, rerun, name, detail):
+        self.rerun = rerun
+        self.name = name
+        self.detail = detail
+
+    def __enter__(self):
+        self.depth = self.rerun["depth"]
+        self.rerun["depth"] += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        rerun = self.rerun
+        rerun["depth"] -= 1
+        record = {
+            "name": self.name,
+            "start_ms": round((self.start - rerun["start"]) * 1000, 3),
+            "ms": round((end - self.start) * 1000, 3),
+            "depth": self.depth,
+        }
+        if self.detail:
+            record["detail"] = {key: str(value) for key, value in self.detail.items()}
+        rerun["spans"].append(record)
+        return False
+
+
+def span(name, **detail):
+    """Mede o bloco `with` como a etapa `name` do rerun atual."""
+    if not TIMING_ENABLED:
+        return _NULL_SPAN
+    rerun = getattr(_local, "rerun", None)
+    if rerun is None:
+        return _NULL_SPAN
+    return _Span(rerun, name, detail)
+
+
+def timed(name=None):
+    """Decorador: mede cada chamada da função como uma etapa."""
+
+    def decorator(func):
+        if not TIMING_ENABLED:
+            return func
+        label = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# ==========================================================
+# RERUN
+# ==========================================================
+def _install_chart_timer():
+    """Mede `st.plotly_chart` (serialização da figura e envio ao navegador).
+
+    A serialização acontece dentro do Streamlit; o método é embrulhado uma
+    vez por processo, só com a medição ligada.
+    """
+    global _chart_timer_installed
+    if _chart_timer_installed:
+        return
+    import streamlit as st
+    from streamlit.delta_generator import DeltaGenerator
+
+    original = DeltaGenerator.plotly_chart
+
+    @wraps(original)
+    def plotly_chart(self, *args, **kwargs):
+        with span("st.plotly_chart"):
+            return original(self, *args, **kwargs)
+
+    DeltaGenerator.plotly_chart = plotly_chart
+    # `st.plotly_chart` é um método já vinculado ao container principal
+    st.plotly_chart = plotly_chart.__get__(st.plotly_chart.__self__)
+    _chart_timer_installed = True
+
+
+def start_rerun(page, fragment=None):
+    """Começa a medir (e, se pedido, a perfilar) o rerun da página `page`.
+
+    `page` é o `__file__` do script da página; `fragment`, o nome do
+    fragmento num rerun parcial. A atividade da sessão é sempre registrada
+    (`memory.py` libera os downloads das sessões ociosas).
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        touch_session(ctx.session_id, Path(page).stem)
+
+    # um rerun interrompido (st.stop, exceção) é descartado aqui
+    stale = getattr(_local, "rerun", None)
+    if stale is not None and stale["capture"] is not None:
+        stale["capture"].stop()
+    _local.rerun = None
+
+    capture = start_capture(page)
+    if not TIMING_ENABLED and capture is None:
+        return
+    import streamlit as st
+
+    if TIMING_ENABLED:
+        _install_chart_timer()
+    _local.rerun = {
+        "page": Path(page).stem,
+        "fragment": fragment,
+        "session": ctx.session_id if ctx is not None else None,
+        "start": time.perf_counter(),
+        "depth": 0,
+        "spans": [],
+        "info": {"query": st.query_params.to_dict()},
+        "capture": capture,
+    }
+
+
+def annotate(**info):
+    """Junta `info` ao registro do rerun atual (sem efeito fora de um)."""
+    rerun = getattr(_local, "rerun", None)
+    if rerun is not None:
+        rerun["info"].update(info)
+
+
+def finish_rerun():
+    """Encerra o rerun atual e retorna o registro (ou None se não houver)."""
+    rerun = getattr(_local, "rerun", None)
+    if rerun is None:
+        return None
+    _local.rerun = None
+    return {
+        "time": datetime.now().isoformat(timespec="milliseconds"),
+        "session": rerun["session"],
+        "page": rerun["page"],
+        "fragment": rerun["fragment"],
+        "total_ms": round((time.perf_counter() - rerun["start"]) * 1000, 3),
+        "spans": sorted(rerun["spans"], key=lambda record: record["start_ms"]),
+        # anotações como dados simples (os filtros são um dataclass)
+        "info": {
+            key: asdict(value) if is_dataclass(value) else value
+            for key, value in rerun["info"].items()
+        },
+        "capture": rerun["capture"],
+    }
+
+
+def log_path():
+    if TIMING_LOG:
+        return Path(TIMING_LOG)
+    from pages.utils.data_loader import CACHE_DIR
+
+    return CACHE_DIR / "timing.jsonl"
+
+
+def append_log(record):
+    """Acrescenta o registro de um rerun ao log JSONL."""
+    path = log_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    entry = {key: value for key, value in record.items() if key != "capture"}
+    line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+    # uma escrita por linha, com trava: as sessões rodam em threads
+    with _log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+def debug_panel():
+    """Encerra o rerun: grava o perfil e o log e mostra os tempos na sidebar."""
+    record = finish_rerun()
+    if record is None:
+        return
+    import pandas as pd
+    import streamlit as st
+
+    if record["capture"] is not None:
+        report = finish_capture(record["capture"], record)
+        st.sidebar.caption(f"🔬 Perfil deste rerun salvo em `{report}`")
+    if not TIMING_ENABLED:
+        return
+    append_log(record)
+
+    def label(record):
+        detail = " ".join(f"{k}={v}" for k, v in record.get("detail", {}).items())
+        return "· " * record["depth"] + f"{record['name']} {detail}".strip()
+
+    with st.sidebar.expander(f"⏱️ Tempos do rerun: {record['total_ms']:,.0f} ms"):
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "Etapa": [label(s) for s in record["spans"]],
+                    "ms": [s["ms"] for s in record["spans"]],
+                }
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.caption(f"Sessão {record['session']} · log em `{log_path()}`")
+
+
+# ==========================================================
+# FRAGMENTOS
+# ==========================================================
+def _fragment_rerun():
+    """Se o script em execução roda só fragmentos (e não a página inteira)."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx is not None and bool(ctx.fragment_ids_this_run)
+
+
+def finish_fragment():
+    """Encerra o rerun parcial: grava o perfil e o log e mostra o tempo.
+
+    A barra lateral não pode ser escrita de dentro de um fragmento, então o
+    tempo aparece no fim do próprio fragmento.
+    """
+    record = finish_rerun()
+    if record is None:
+        return
+    import streamlit as st
+
+    if record["capture"] is not None:
+        report = finish_capture(record["capture"], record)
+        st.caption(f"🔬 Perfil deste rerun parcial salvo em `{report}`")
+    if TIMING_ENABLED:
+        append_log(record)
+        st.caption(f"⏱️ Rerun parcial: {record['total_ms']:,.0f} ms")
+
+
+def fragment(func):
+    """`st.fragment` com os reruns parciais medidos como os da página.
+
+    Os argumentos são as dependências da seção: num rerun parcial, o
+    Streamlit chama a função de novo com os do último rerun da página.
+    """
+    import streamlit as st
+
+    page = func.__globals__.get("__file__", func.__module__)
+
+    @wraps(func)
+    def section(*args, **kwargs):
+        if not _fragment_rerun():
+            with span(f"fragmento {func.__name__}"):
+                return func(*args, **kwargs)
+        start_rerun(page, fragment=func.__name__)
+        result = func(*args, **kwargs)
+        finish_fragment()
+        return result
+
+    return st.fragment(section)